@@ -1,33 +1,210 @@
-"""The MultiSport integration."""
+"""The MultiSport integration.
+
+Only constants and Home Assistant core helpers are imported with the
+package. The client library, the coordinator and everything they pull in
+are imported in the executor once an entry actually sets up, so an idle
+integration adds next to nothing to Home Assistant's startup.
+"""
 
 from __future__ import annotations
 
+import asyncio
 import logging
-from datetime import timedelta
-from typing import cast  # Re-import cast
+from datetime import date, timedelta
+from typing import TYPE_CHECKING, cast  # Re-import cast
 
+import voluptuous as vol
 from homeassistant.config_entries import ConfigEntry
 from homeassistant.const import CONF_PASSWORD, CONF_USERNAME
-from homeassistant.core import HomeAssistant, ServiceCall
-from homeassistant.exceptions import ConfigEntryNotReady
-
-from multisport_py import MultisportClient  # Re-import MultisportClient
+from homeassistant.core import HomeAssistant, ServiceCall, callback
+from homeassistant.exceptions import ServiceValidationError
+from homeassistant.helpers import config_validation as cv
+from homeassistant.helpers import device_registry as dr
+from homeassistant.helpers.event import async_track_time_change
+from homeassistant.helpers.importlib import async_import_module
+from homeassistant.helpers.typing import ConfigType
+from homeassistant.util import dt as dt_util
 
-from .api import MultisportApi
 from .const import (
+    ATTR_CARD_ID,
+    ATTR_END_DATE,
+    ATTR_ENTRY_ID,
+    ATTR_PSTATS,
+    ATTR_START_DATE,
+    CONF_DOMAIN_REQUEST_BUDGET,
+    CONF_HISTORY_DAYS,
+    CONF_MAX_CONCURRENT_REQUESTS,
+    CONF_MAX_UPDATE_INTERVAL,
+    CONF_MIN_UPDATE_INTERVAL,
+    CONF_POLLING_MODE,
+    CONF_REQUEST_BUDGET,
     CONF_UPDATE_INTERVAL,
+    DEFAULT_DOMAIN_REQUEST_BUDGET,
+    DEFAULT_HISTORY_DAYS,
+    DEFAULT_MAX_CONCURRENT_REQUESTS,
+    DEFAULT_MAX_UPDATE_INTERVAL,
+    DEFAULT_MIN_UPDATE_INTERVAL,
+    DEFAULT_POLLING_MODE,
+    DEFAULT_REQUEST_BUDGET,
     DEFAULT_UPDATE_INTERVAL,
     DOMAIN,
     PLATFORMS,
     SERVICE_FORCE_UPDATE,
+    SERVICE_IMPORT_HISTORY,
+    SERVICE_PROFILE_REFRESH,
 )
-from .coordinator import MultisportDataUpdateCoordinator
+
+if TYPE_CHECKING:
+    from .coordinator import MultisportDataUpdateCoordinator
 
 _LOGGER = logging.getLogger(__name__)
 
+CONFIG_SCHEMA = cv.config_entry_only_config_schema(DOMAIN)
+
+FORCE_UPDATE_SCHEMA = vol.Schema(
+    {
+        vol.Optional(ATTR_ENTRY_ID): cv.string,
+        vol.Optional(ATTR_CARD_ID): cv.string,
+    }
+)
+
+IMPORT_HISTORY_SCHEMA = vol.Schema(
+    {
+        vol.Optional(ATTR_ENTRY_ID): cv.string,
+        vol.Optional(ATTR_CARD_ID): cv.string,
+        vol.Required(ATTR_START_DATE): cv.date,
+        vol.Optional(ATTR_END_DATE): cv.date,
+    }
+)
+
+PROFILE_REFRESH_SCHEMA = vol.Schema(
+    {
+        vol.Optional(ATTR_ENTRY_ID): cv.string,
+        vol.Optional(ATTR_PSTATS, default=False): cv.boolean,
+    }
+)
+
+
+async def async_setup(hass: HomeAssistant, config: ConfigType) -> bool:
+    """Set up the MultiSport services, shared by all config entries."""
+
+    def _coordinators(call: ServiceCall) -> list[MultisportDataUpdateCoordinator]:
+        """Return the coordinators of the accounts a service call targets."""
+        coordinators: dict[str, MultisportDataUpdateCoordinator] = hass.data.get(
+            DOMAIN, {}
+        )
+        if (entry_id := call.data.get(ATTR_ENTRY_ID)) is None:
+            return list(coordinators.values())
+        if entry_id not in coordinators:
+            raise ServiceValidationError(
+                translation_domain=DOMAIN,
+                translation_key="entry_not_loaded",
+                translation_placeholders={"entry_id": entry_id},
+            )
+        return [coordinators[entry_id]]
+
+    def _card_owners(
+        coordinators: list[MultisportDataUpdateCoordinator], card_id: str
+    ) -> list[MultisportDataUpdateCoordinator]:
+        """Return the coordinators of the accounts holding a card."""
+        owners = [
+            coordinator
+            for coordinator in coordinators
+            if coordinator.data and card_id in coordinator.data
+        ]
+        if not owners:
+            raise ServiceValidationError(
+                translation_domain=DOMAIN,
+                translation_key="unknown_card",
+                translation_placeholders={"card_id": card_id},
+            )
+        return owners
+
+    async def async_force_update(call: ServiceCall) -> None:
+        """Handle the service call to force an update."""
+        _LOGGER.info("Service 'multisport.force_update' called")
+        coordinators = _coordinators(call)
+
+        if (card_id := call.data.get(ATTR_CARD_ID)) is None:
+            # Requests are debounced, a burst of calls makes one refresh
+            await asyncio.gather(
+                *(
+                    coordinator.async_request_topology_refresh()
+                    for coordinator in coordinators
+                )
+            )
+            return
+
+        await asyncio.gather(
+            *(
+                coordinator.async_refresh_card(card_id)
+                for coordinator in _card_owners(coordinators, card_id)
+            )
+        )
+
+    async def async_import_history(call: ServiceCall) -> None:
+        """Handle the service call to import the visit history of a date range."""
+        start: date = call.data[ATTR_START_DATE]
+        end: date = call.data.get(ATTR_END_DATE, dt_util.now().date())
+        if start > end:
+            raise ServiceValidationError(
+                translation_domain=DOMAIN,
+                translation_key="invalid_date_range",
+                translation_placeholders={"start": str(start), "end": str(end)},
+            )
+        coordinators = _coordinators(call)
+        if (card_id := call.data.get(ATTR_CARD_ID)) is not None:
+            coordinators = _card_owners(coordinators, card_id)
+
+        # Imports run in the background, progress is reported by a sensor
+        for coordinator in coordinators:
+            card_ids = [card_id] if card_id else list(coordinator.data or {})
+            await coordinator.async_import_history(card_ids, start, end)
+
+    async def async_profile_refresh(call: ServiceCall) -> None:
+        """Handle the service call to profile a refresh of each account."""
+        coordinators = _coordinators(call)
+        await async_import_module(hass, f"{__name__}.profiler")
+        from . import profiler
+
+        for coordinator in coordinators:
+            await profiler.async_profile_refresh(
+                hass, coordinator, call.data[ATTR_PSTATS]
+            )
+
+    hass.services.async_register(
+        DOMAIN,
+        SERVICE_FORCE_UPDATE,
+        async_force_update,
+        schema=FORCE_UPDATE_SCHEMA,
+    )
+    hass.services.async_register(
+        DOMAIN,
+        SERVICE_IMPORT_HISTORY,
+        async_import_history,
+        schema=IMPORT_HISTORY_SCHEMA,
+    )
+    hass.services.async_register(
+        DOMAIN,
+        SERVICE_PROFILE_REFRESH,
+        async_profile_refresh,
+        schema=PROFILE_REFRESH_SCHEMA,
+    )
+    return True
+
+
+async def _async_import_runtime(hass: HomeAssistant) -> None:
+    """Import the modules config entries run on, off the event loop."""
+    # The coordinator imports the API wrapper, the client and the history
+    await async_import_module(hass, f"{__name__}.coordinator")
+
 
 async def async_setup_entry(hass: HomeAssistant, entry: ConfigEntry) -> bool:
     """Set up MultiSport from a config entry."""
+    await _async_import_runtime(hass)
+    from .api import MultisportApi
+    from .coordinator import MultisportDataUpdateCoordinator
+
     hass.data.setdefault(DOMAIN, {})
 
     # --- API and Coordinator Setup ---
@@ -35,67 +212,177 @@ async def async_setup_entry(hass: HomeAssistant, entry: ConfigEntry) -> bool:
         hass,
         username=entry.data[CONF_USERNAME],
         password=entry.data[CONF_PASSWORD],
+        entry_id=entry.entry_id,
+        request_budget=entry.options.get(CONF_REQUEST_BUDGET, DEFAULT_REQUEST_BUDGET),
     )
 
-    if not await api.async_authenticate():
-        raise ConfigEntryNotReady("Failed to authenticate with MultiSport.")
-
     update_interval_minutes = entry.options.get(
         CONF_UPDATE_INTERVAL, DEFAULT_UPDATE_INTERVAL.seconds / 60
     )
     update_interval = timedelta(minutes=update_interval_minutes)
 
-    # Cast api.client to MultisportClient because mypy thinks it could be None
     coordinator = MultisportDataUpdateCoordinator(
         hass,
-        client=cast(MultisportClient, api.client),
+        api=api,
         entry=entry,
         update_interval=update_interval,
     )
 
-    await coordinator.async_config_entry_first_refresh()
+    # Entities are created right away from the last good data, if there is any,
+    # while authentication and the real refresh run in the background.
+    restored = await coordinator.async_restore_snapshot()
+    if not restored:
+        await coordinator.async_config_entry_first_refresh()
     hass.data[DOMAIN][entry.entry_id] = coordinator
+    _async_stagger_entries(hass)
+    _async_apply_domain_budget(hass)
 
     # --- Options Listener ---
     entry.async_on_unload(entry.add_update_listener(async_update_options))
 
     # --- Platform Setup ---
+    # Platforms add the entities of new cards as they show up, the devices
+    # of cards gone from the account are removed here
     await hass.config_entries.async_forward_entry_setups(entry, PLATFORMS)
-
-    # --- Service Registration ---
-    async def async_force_update(call: ServiceCall) -> None:
-        """Handle the service call to force an update."""
-        _LOGGER.info("Service 'multisport.force_update' called")
-        await coordinator.async_request_refresh()
-
-    hass.services.async_register(
-        DOMAIN,
-        SERVICE_FORCE_UPDATE,
-        async_force_update,
+    _async_track_vanished_cards(hass, entry, coordinator)
+    # Values relative to the current day roll over at local midnight, from
+    # the stored visits and without polling
+    entry.async_on_unload(
+        async_track_time_change(
+            hass, coordinator.async_roll_over_day, hour=0, minute=0, second=0
+        )
     )
 
+    # A history import interrupted by the last shutdown resumes once logged in
+    if restored:
+        entry.async_create_background_task(
+            hass, _async_warm_start(coordinator), f"{DOMAIN} {entry.title} warm refresh"
+        )
+    else:
+        coordinator.async_resume_history_import()
+
     return True
 
 
+async def _async_warm_start(coordinator: MultisportDataUpdateCoordinator) -> None:
+    """Refresh restored data, then resume any pending history import."""
+    await coordinator.async_refresh()
+    coordinator.async_resume_history_import()
+
+
 async def async_unload_entry(hass: HomeAssistant, entry: ConfigEntry) -> bool:
     """Unload a config entry."""
     # Unload platforms
     unload_ok = await hass.config_entries.async_unload_platforms(entry, PLATFORMS)
 
     if unload_ok:
-        # Get the coordinator from hass.data and close the client session
+        # Get the coordinator from hass.data and release its client
         coordinator: MultisportDataUpdateCoordinator = hass.data[DOMAIN].pop(
             entry.entry_id
         )
-        if coordinator.client:
-            await coordinator.client.close()
-
-        # Remove the service
-        hass.services.async_remove(DOMAIN, SERVICE_FORCE_UPDATE)
+        await coordinator.api.async_close()
+        _async_stagger_entries(hass)
+        _async_apply_domain_budget(hass)
 
     return cast(bool, unload_ok)  # Cast to bool to satisfy mypy
 
 
+@callback
+def _async_track_vanished_cards(
+    hass: HomeAssistant,
+    entry: ConfigEntry,
+    coordinator: MultisportDataUpdateCoordinator,
+) -> None:
+    """Remove the devices, and with them the entities, of vanished cards."""
+    device_registry = dr.async_get(hass)
+    card_ids: set[str] | None = None
+
+    @callback
+    def _async_retire_vanished_cards() -> None:
+        nonlocal card_ids
+        current = set(coordinator.data or {})
+        if current == card_ids:
+            return
+        card_ids = current
+        for device in dr.async_entries_for_config_entry(
+            device_registry, entry.entry_id
+        ):
+            if not _is_vanished_card(entry, coordinator, device):
+                continue
+            _LOGGER.info(
+                "Removing MultiSport card %s, gone from the account", device.name
+            )
+            device_registry.async_update_device(
+                device.id, remove_config_entry_id=entry.entry_id
+            )
+
+    _async_retire_vanished_cards()
+    entry.async_on_unload(coordinator.async_add_listener(_async_retire_vanished_cards))
+
+
+def _is_vanished_card(
+    entry: ConfigEntry,
+    coordinator: MultisportDataUpdateCoordinator,
+    device: dr.DeviceEntry,
+) -> bool:
+    """Return True if a device is a card no longer on the account."""
+    identifiers = {
+        identifier for domain, identifier in device.identifiers if domain == DOMAIN
+    }
+    # The account device is identified by the entry
+    return entry.entry_id not in identifiers and not identifiers & set(
+        coordinator.data or {}
+    )
+
+
+async def async_remove_config_entry_device(
+    hass: HomeAssistant, entry: ConfigEntry, device: dr.DeviceEntry
+) -> bool:
+    """Allow removing the device of a card no longer on the account."""
+    coordinator = hass.data.get(DOMAIN, {}).get(entry.entry_id)
+    return coordinator is not None and _is_vanished_card(entry, coordinator, device)
+
+
+@callback
+def _async_stagger_entries(hass: HomeAssistant) -> None:
+    """Spread the refreshes of all loaded entries evenly over their interval."""
+    coordinators: list[MultisportDataUpdateCoordinator] = [
+        hass.data[DOMAIN][entry_id] for entry_id in sorted(hass.data[DOMAIN])
+    ]
+    for index, coordinator in enumerate(coordinators):
+        # A single account keeps polling relative to its own start
+        coordinator.phase = index / len(coordinators) if len(coordinators) > 1 else None
+
+
+@callback
+def _async_apply_domain_budget(hass: HomeAssistant) -> None:
+    """Limit the requests of all accounts to the lowest domain-wide budget set."""
+    coordinators: list[MultisportDataUpdateCoordinator] = list(
+        hass.data[DOMAIN].values()
+    )
+    if not coordinators:
+        return
+    # The budget is shared, through the session of all accounts
+    coordinators[0].api.scheduler.domain.limit = min(
+        coordinator.entry.options.get(
+            CONF_DOMAIN_REQUEST_BUDGET, DEFAULT_DOMAIN_REQUEST_BUDGET
+        )
+        for coordinator in coordinators
+    )
+
+
+async def async_remove_entry(hass: HomeAssistant, entry: ConfigEntry) -> None:
+    """Remove persisted data of a deleted config entry."""
+    await _async_import_runtime(hass)
+    from .api import async_get_token_store
+    from .coordinator import async_get_snapshot_store
+    from .history import HistorySync
+
+    await HistorySync(hass, entry.entry_id).async_remove()
+    await async_get_snapshot_store(hass, entry.entry_id).async_remove()
+    await async_get_token_store(hass, entry.entry_id).async_remove()
+
+
 async def async_update_options(hass: HomeAssistant, entry: ConfigEntry) -> None:
     """Handle options update."""
     _LOGGER.debug("Handling MultiSport options update")
@@ -103,7 +390,34 @@ async def async_update_options(hass: HomeAssistant, entry: ConfigEntry) -> None:
     update_interval_minutes = entry.options.get(
         CONF_UPDATE_INTERVAL, DEFAULT_UPDATE_INTERVAL.seconds / 60
     )
-    coordinator.update_interval = timedelta(minutes=update_interval_minutes)
+    coordinator.poll_interval = timedelta(minutes=update_interval_minutes)
+    coordinator.update_interval = coordinator.poll_interval
     _LOGGER.info(
         "MultiSport update interval set to %s minutes", update_interval_minutes
     )
+    coordinator.max_concurrent_requests = entry.options.get(
+        CONF_MAX_CONCURRENT_REQUESTS, DEFAULT_MAX_CONCURRENT_REQUESTS
+    )
+    coordinator.history_days = entry.options.get(
+        CONF_HISTORY_DAYS, DEFAULT_HISTORY_DAYS
+    )
+    # In adaptive mode the fixed interval only applies until the next refresh
+    coordinator.polling_mode = entry.options.get(
+        CONF_POLLING_MODE, DEFAULT_POLLING_MODE
+    )
+    coordinator.scheduler.set_bounds(
+        timedelta(
+            minutes=entry.options.get(
+                CONF_MIN_UPDATE_INTERVAL, DEFAULT_MIN_UPDATE_INTERVAL
+            )
+        ),
+        timedelta(
+            minutes=entry.options.get(
+                CONF_MAX_UPDATE_INTERVAL, DEFAULT_MAX_UPDATE_INTERVAL
+            )
+        ),
+    )
+    coordinator.api.scheduler.account.limit = entry.options.get(
+        CONF_REQUEST_BUDGET, DEFAULT_REQUEST_BUDGET
+    )
+    _async_apply_domain_budget(hass)
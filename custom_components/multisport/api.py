@@ -2,9 +2,16 @@
 
 from __future__ import annotations
 
+import asyncio
+import hashlib
+import json
 import logging
+from functools import partial
+from typing import Any, Awaitable, Callable, Dict
 
-from homeassistant.core import HomeAssistant
+from homeassistant.core import HomeAssistant, callback
+from homeassistant.helpers.httpx_client import create_async_httpx_client
+from homeassistant.helpers.storage import Store
 
 from multisport_py import (
     AuthenticationError,
@@ -12,49 +19,271 @@ from multisport_py import (
     MultisportError,
 )
 
+from .budget import RequestBudget, RequestScheduler, async_admit_request
+from .const import DEFAULT_DOMAIN_REQUEST_BUDGET, DEFAULT_REQUEST_BUDGET, DOMAIN
+from .devtools import async_setup_client
+from .metrics import INSTRUMENTED_CALLS, ApiStats
+from .resilience import RESILIENT_CALLS, CircuitBreakers
+
 _LOGGER = logging.getLogger(__name__)
 
+DATA_SESSION = f"{DOMAIN}_session"
+DATA_FLOW_APIS = f"{DOMAIN}_flow_apis"
+
+TOKEN_STORAGE_VERSION = 1
+TOKEN_SAVE_DELAY = 10  # seconds
+
+
+def payload_digest(payload: Any) -> str:
+    """Return a stable fingerprint of a decoded API response."""
+    return hashlib.blake2b(
+        json.dumps(payload, sort_keys=True, default=str).encode(), digest_size=8
+    ).hexdigest()
+
+
+def async_get_token_store(hass: HomeAssistant, entry_id: str) -> Store:
+    """Return the store holding the session tokens of an entry."""
+    # Private stores are only readable by the Home Assistant user
+    return Store(hass, TOKEN_STORAGE_VERSION, f"{DOMAIN}.{entry_id}.auth", private=True)
+
+
+class MultisportSession:
+    """HTTP client shared by the MultiSport clients of all config entries.
+
+    Keep-alive connections and the TLS setup are reused across accounts.
+    The login flow keeps its state in cookies, so logins are serialized and
+    the cookie jar is cleared around each of them; API requests carry a
+    bearer token and run concurrently. An outage affects every account, so
+    the circuit breakers of the endpoints are shared as well.
+    """
+
+    def __init__(self, hass: HomeAssistant) -> None:
+        """Initialize the session, closed by Home Assistant on shutdown."""
+        # Every request is counted against the budgets of its account
+        self.http_client = create_async_httpx_client(
+            hass, event_hooks={"request": [async_admit_request]}
+        )
+        self.breakers = CircuitBreakers()
+        self.budget = RequestBudget(DEFAULT_DOMAIN_REQUEST_BUDGET)
+        self.login_lock = asyncio.Lock()
+        self._reauth_locks: Dict[str, asyncio.Lock] = {}
+
+    async def async_login(self, login: Callable[[], Awaitable[Any]]) -> None:
+        """Run the login of one client, isolated from the other accounts."""
+        async with self.login_lock:
+            self.http_client.cookies.clear()
+            try:
+                await login()
+            finally:
+                self.http_client.cookies.clear()
+
+    async def async_reauthenticate(
+        self, client: MultisportClient, reauthenticate: Callable[[], Awaitable[Any]]
+    ) -> None:
+        """Refresh or renew the session of an account, once for all callers.
+
+        Requests failing together on an expired token all end up here; the
+        first one renews the session and the others, finding the token
+        changed once they get the lock, retry with it instead of hitting the
+        login endpoint again.
+        """
+        token = client.access_token
+        lock = self._reauth_locks.setdefault(client.username, asyncio.Lock())
+        async with lock:
+            if client.access_token != token:
+                return
+            await reauthenticate()
+
+
+@callback
+def async_get_session(hass: HomeAssistant) -> MultisportSession:
+    """Return the session shared by all MultiSport config entries."""
+    if (session := hass.data.get(DATA_SESSION)) is None:
+        session = hass.data[DATA_SESSION] = MultisportSession(hass)
+    return session
+
+
+@callback
+def async_hand_off_api(hass: HomeAssistant, api: MultisportApi) -> None:
+    """Keep an API authenticated by the config flow for the new entry."""
+    hass.data.setdefault(DATA_FLOW_APIS, {})[api.username] = api
+
+
+@callback
+def async_take_api(hass: HomeAssistant, username: str) -> MultisportApi | None:
+    """Return the API handed off by the config flow, if any."""
+    apis: Dict[str, MultisportApi] = hass.data.get(DATA_FLOW_APIS, {})
+    return apis.pop(username, None)
+
 
 class MultisportApi:
     """A wrapper for the MultisportClient to handle blocking calls and authentication."""
 
-    def __init__(self, hass: HomeAssistant, username: str, password: str) -> None:
-        """Initialize the API wrapper."""
+    def __init__(
+        self,
+        hass: HomeAssistant,
+        username: str,
+        password: str,
+        entry_id: str | None = None,
+        request_budget: int = DEFAULT_REQUEST_BUDGET,
+    ) -> None:
+        """Initialize the API wrapper.
+
+        With an entry id, the session tokens are persisted for that entry.
+        """
         self._hass = hass
         self._username = username
         self._password = password
+        self._token_store = (
+            async_get_token_store(hass, entry_id) if entry_id is not None else None
+        )
+        self._saved_tokens: tuple[str | None, str | None] | None = None
         self.client: MultisportClient | None = None
+        self.stats = ApiStats()
+        self.scheduler = RequestScheduler(
+            RequestBudget(request_budget), async_get_session(hass).budget
+        )
+
+    @property
+    def username(self) -> str:
+        """Return the username of the account."""
+        return self._username
+
+    @property
+    def breakers(self) -> CircuitBreakers:
+        """Return the circuit breakers of the endpoints, shared by all entries."""
+        return async_get_session(self._hass).breakers
 
     async def async_authenticate(self) -> bool:
         """
         Authenticate with the MultiSport API.
 
-        This handles the blocking instantiation of the client and the async login.
+        A client already authenticated by the config flow or the tokens of a
+        previous run are reused; a password login is only done without them.
+        A rejected token is refreshed, or replaced by a password login, by
+        the client itself on the first request.
         Returns True on success, False on failure.
         """
-        _LOGGER.debug("Authenticating with MultiSport API")
         try:
-            # The constructor of MultisportClient might be blocking.
-            self.client = await self._hass.async_add_executor_job(
-                self._blocking_create_client
-            )
-
-            # The login method is async, so we can await it directly.
-            await self.client.login()
-
+            await self.async_login()
         except (AuthenticationError, MultisportError) as exc:
             _LOGGER.error("Failed to authenticate with MultiSport: %s", exc)
-            if self.client:
-                await self.client.close()
             return False
         except Exception:
             _LOGGER.exception("Unexpected error during authentication")
-            if self.client:
-                await self.client.close()
             return False
 
         return True
 
+    async def async_login(self) -> None:
+        """Authenticate, raising the client's error on failure."""
+        _LOGGER.debug("Authenticating with MultiSport API")
+        try:
+            if (flow_api := async_take_api(self._hass, self._username)) is not None:
+                _LOGGER.debug("Using the session of the MultiSport config flow")
+                self.client = flow_api.client
+                self.stats = flow_api.stats
+                # The calls of the client count against the flow's budget
+                flow_api.scheduler.account.limit = self.scheduler.account.limit
+                self.scheduler = flow_api.scheduler
+            else:
+                self.client = await self._async_create_client()
+                if not await self._async_restore_tokens(self.client):
+                    # The login method is async, so we can await it directly.
+                    await self.client.login()
+        except BaseException:
+            await self._async_discard_client()
+            raise
+
+        self.async_save_tokens()
+
+    async def async_reauthenticate(self) -> None:
+        """Log in again with the password, once for concurrent callers."""
+        if self.client is None:
+            self.client = await self._async_create_client()
+        await self.client.login()
+        self.async_save_tokens()
+
+    async def async_close(self) -> None:
+        """Forget the client, the shared session stays open for other entries."""
+        if self._token_store is not None and self.client is not None:
+            # Written right away, a reload reads the store before a delayed save
+            await self._token_store.async_save(self._tokens_to_save())
+        self.client = None
+
+    @callback
+    def async_save_tokens(self) -> None:
+        """Persist the session tokens if they changed since last saved."""
+        if self._token_store is None or self.client is None:
+            return
+        tokens = (self.client.access_token, self.client.refresh_token)
+        if tokens == self._saved_tokens:
+            return
+        self._saved_tokens = tokens
+        self._token_store.async_delay_save(self._tokens_to_save, TOKEN_SAVE_DELAY)
+
+    def _tokens_to_save(self) -> Dict[str, Any]:
+        """Return the session tokens in their storage format."""
+        client = self.client
+        return {
+            "username": self._username,
+            "access_token": client.access_token if client else None,
+            "refresh_token": client.refresh_token if client else None,
+        }
+
+    async def _async_restore_tokens(self, client: MultisportClient) -> bool:
+        """Load the tokens persisted by a previous run into a client."""
+        if self._token_store is None:
+            return False
+        stored = await self._token_store.async_load()
+        if (
+            not stored
+            or stored.get("username") != self._username
+            or not stored.get("access_token")
+        ):
+            return False
+        _LOGGER.debug("Reusing the persisted MultiSport session")
+        client.access_token = stored["access_token"]
+        client.refresh_token = stored.get("refresh_token")
+        self._saved_tokens = (client.access_token, client.refresh_token)
+        return True
+
+    async def _async_discard_client(self) -> None:
+        """Forget a client that failed to authenticate."""
+        self.client = None
+
+    async def _async_create_client(self) -> MultisportClient:
+        """Create a client that uses the domain-wide shared session."""
+        # The constructor of MultisportClient might be blocking.
+        client = await self._hass.async_add_executor_job(self._blocking_create_client)
+        # Replace the client's own connection pool with the shared one
+        await client.close()
+        session = async_get_session(self._hass)
+        client.http_client = session.http_client
+        # Also covers the token refreshes and re-logins the client does when
+        # a request is rejected
+        client.login = self.scheduler.track(  # type: ignore[method-assign]
+            partial(
+                session.async_reauthenticate,
+                client,
+                partial(session.async_login, client.login),
+            )
+        )
+        client._refresh_access_token = self.scheduler.track(  # type: ignore[method-assign]
+            partial(session.async_reauthenticate, client, client._refresh_access_token)
+        )
+        async_setup_client(self._hass, client, self._username)
+        for name in INSTRUMENTED_CALLS:
+            setattr(client, name, self.stats.instrument(name, getattr(client, name)))
+        # Outside the instrumentation, so every retry is measured
+        for name in RESILIENT_CALLS:
+            setattr(client, name, session.breakers.guard(name, getattr(client, name)))
+        # Outside the retries, a call is deferred as a whole, while each of
+        # its requests is counted as it is sent
+        for name in RESILIENT_CALLS:
+            setattr(client, name, self.scheduler.guard(name, getattr(client, name)))
+        return client
+
     def _blocking_create_client(self) -> MultisportClient:
         """Create the MultisportClient instance in a blocking-safe way."""
         return MultisportClient(username=self._username, password=self._password)
@@ -3,17 +3,18 @@
 from __future__ import annotations
 
 import logging
-from typing import List, Optional, cast
+from typing import List
 
 from homeassistant.components.binary_sensor import BinarySensorEntity
 from homeassistant.config_entries import ConfigEntry
 from homeassistant.core import HomeAssistant
 from homeassistant.helpers.entity import DeviceInfo
 from homeassistant.helpers.entity_platform import AddEntitiesCallback
-from homeassistant.helpers.update_coordinator import CoordinatorEntity
 
 from .const import DOMAIN
 from .coordinator import MultisportDataUpdateCoordinator
+from .entity import MultisportCardEntity, async_add_card_entities
+from .model import CardSnapshot
 
 _LOGGER = logging.getLogger(__name__)
 
@@ -26,62 +27,24 @@ async def async_setup_entry(
     """Set up the binary sensor platform."""
     coordinator: MultisportDataUpdateCoordinator = hass.data[DOMAIN][entry.entry_id]
 
-    entities: List[BinarySensorEntity] = []
-    # Create binary sensors for each MultiSport card
-    for card_id, card_data in coordinator.data.items():
-        card_holder_name = (
-            f"{card_data['holder_first_name']} {card_data['holder_last_name']}"
-        )
-        device_name = f"MultiSport {card_holder_name}"
-
-        device_info = DeviceInfo(
-            identifiers={(DOMAIN, card_id)},
-            name=device_name,
-            manufacturer="MultiSport",
-            model="Card",
-            configuration_url="https://app.kartamultisport.pl/",
-            suggested_area="Gym",
-        )
-
-        entities.append(
+    def _create_card_binary_sensors(
+        card: CardSnapshot, device_info: DeviceInfo
+    ) -> List[BinarySensorEntity]:
+        """Create the binary sensors of a card."""
+        return [
             MultisportUsedTodayBinarySensor(
-                coordinator, card_id, device_info, card_holder_name
+                coordinator, card.card_id, device_info, card.holder_name
             )
-        )
+        ]
 
-    async_add_entities(entities)
+    async_add_card_entities(
+        coordinator, entry, async_add_entities, _create_card_binary_sensors
+    )
 
 
-class MultisportBaseBinarySensor(CoordinatorEntity, BinarySensorEntity):
+class MultisportBaseBinarySensor(MultisportCardEntity, BinarySensorEntity):
     """Base class for MultiSport binary sensors."""
 
-    def __init__(
-        self,
-        coordinator: MultisportDataUpdateCoordinator,
-        card_id: str,
-        device_info: DeviceInfo,
-        card_holder_name: str,
-    ) -> None:
-        """Initialize the binary sensor."""
-        super().__init__(coordinator)
-        self._card_id = card_id
-        self._device_info = device_info
-        self._card_holder_name = card_holder_name
-        self._attr_has_entity_name = True
-
-    @property
-    def device_info(self) -> DeviceInfo:
-        """Return the device info."""
-        return self._device_info
-
-    @property
-    def available(self) -> bool:
-        """Return True if entity is available."""
-        return (
-            self.coordinator.last_update_success
-            and self._card_id in self.coordinator.data
-        )
-
 
 class MultisportUsedTodayBinarySensor(MultisportBaseBinarySensor):
     """Binary sensor for whether a MultiSport card was used today."""
@@ -103,5 +66,5 @@ class MultisportUsedTodayBinarySensor(MultisportBaseBinarySensor):
     @property
     def is_on(self) -> bool | None:
         """Return True if the binary sensor is on."""
-        card_data = self.coordinator.data.get(self._card_id, {})
-        return cast(Optional[bool], card_data.get("used_today"))
+        card = self.card
+        return card.used_today if card else None
@@ -0,0 +1,180 @@
+"""Hourly request budgets in front of the MultiSport client calls."""
+
+from __future__ import annotations
+
+import logging
+import time
+from collections import deque
+from contextvars import ContextVar
+from functools import wraps
+from typing import TYPE_CHECKING, Any, Awaitable, Callable, Coroutine, Dict, TypeVar
+
+from multisport_py import MultisportError
+
+if TYPE_CHECKING:
+    import httpx
+
+_LOGGER = logging.getLogger(__name__)
+
+_WINDOW = 3600.0  # seconds
+
+# Lower values go first. Card limits feed the main sensors, the history
+# only has to catch up eventually and the card list rarely changes.
+PRIORITY_LIMITS = 0
+PRIORITY_HISTORY = 1
+PRIORITY_TOPOLOGY = 2
+PRIORITY_IMPORT = 3
+
+CALL_PRIORITIES = {
+    "get_card_limits": PRIORITY_LIMITS,
+    "get_card_history": PRIORITY_HISTORY,
+    "get_user_info": PRIORITY_TOPOLOGY,
+    "get_authorized_users": PRIORITY_TOPOLOGY,
+    "get_relations": PRIORITY_TOPOLOGY,
+}
+
+# Share of a budget kept for higher priorities, calls are deferred once
+# less than that is left
+_RESERVES = {
+    PRIORITY_LIMITS: 0.0,
+    PRIORITY_HISTORY: 0.1,
+    PRIORITY_TOPOLOGY: 0.2,
+    PRIORITY_IMPORT: 0.5,
+}
+
+_T = TypeVar("_T")
+
+# Scheduler of the account whose client call is running, and the priority
+# the requests of the call are admitted at
+_CALLER: ContextVar[tuple[RequestScheduler, int] | None] = ContextVar(
+    "multisport_request_caller", default=None
+)
+
+
+class RequestDeferredError(MultisportError):
+    """Raised instead of a call the request budget cannot afford."""
+
+
+class RequestBudget:
+    """Number of requests allowed in any sliding hour."""
+
+    __slots__ = ("_calls", "deferred", "limit")
+
+    def __init__(self, limit: int) -> None:
+        """Initialize an unused budget."""
+        self.limit = limit
+        self.deferred = 0
+        self._calls: deque[float] = deque()
+
+    @property
+    def remaining(self) -> int:
+        """Return the number of requests left in the current hour."""
+        calls = self._calls
+        expired = time.monotonic() - _WINDOW
+        while calls and calls[0] <= expired:
+            calls.popleft()
+        return max(0, self.limit - len(calls))
+
+    def allows(self, priority: int) -> bool:
+        """Return True if a call of a priority fits in the budget."""
+        return self.remaining > self.limit * _RESERVES[priority]
+
+    def record(self) -> None:
+        """Count a request."""
+        self._calls.append(time.monotonic())
+
+    def as_dict(self) -> Dict[str, Any]:
+        """Return the budget for diagnostics."""
+        return {
+            "limit": self.limit,
+            "remaining": self.remaining,
+            "deferred": self.deferred,
+        }
+
+
+class RequestScheduler:
+    """Admit the calls of an account against its budget and the domain's."""
+
+    def __init__(self, account: RequestBudget, domain: RequestBudget) -> None:
+        """Initialize the scheduler."""
+        self.account = account
+        self.domain = domain
+
+    @property
+    def remaining(self) -> int:
+        """Return the number of requests the account can still make this hour."""
+        return min(self.account.remaining, self.domain.remaining)
+
+    def check(self, priority: int, name: str) -> None:
+        """Raise RequestDeferredError if a call cannot be afforded."""
+        for budget in (self.account, self.domain):
+            if not budget.allows(priority):
+                budget.deferred += 1
+                raise RequestDeferredError(
+                    f"{name} deferred, {budget.remaining} of {budget.limit} "
+                    "hourly requests left"
+                )
+
+    def admit(self, priority: int, name: str) -> None:
+        """Count a call, or raise RequestDeferredError if it cannot be afforded."""
+        self.check(priority, name)
+        self.account.record()
+        self.domain.record()
+
+    def guard(
+        self, name: str, call: Callable[..., Awaitable[_T]]
+    ) -> Callable[..., Awaitable[_T]]:
+        """Wrap a client call with the budgets, at the priority of its endpoint.
+
+        The call is deferred as a whole if it cannot be afforded, each HTTP
+        request it makes is then admitted by async_admit_request.
+        """
+        priority = CALL_PRIORITIES[name]
+
+        @wraps(call)
+        async def _budgeted(*args: Any, **kwargs: Any) -> _T:
+            self.check(priority, name)
+            token = _CALLER.set((self, priority))
+            try:
+                return await call(*args, **kwargs)
+            finally:
+                _CALLER.reset(token)
+
+        return _budgeted
+
+    def track(
+        self, call: Callable[..., Awaitable[_T]]
+    ) -> Callable[..., Coroutine[Any, Any, _T]]:
+        """Wrap a login or token refresh, so its requests count too.
+
+        Made for a call, they are admitted at the priority of that call, on
+        their own at the highest priority.
+        """
+
+        @wraps(call)
+        async def _tracked(*args: Any, **kwargs: Any) -> _T:
+            if _CALLER.get() is not None:
+                return await call(*args, **kwargs)
+            token = _CALLER.set((self, PRIORITY_LIMITS))
+            try:
+                return await call(*args, **kwargs)
+            finally:
+                _CALLER.reset(token)
+
+        return _tracked
+
+    def as_dict(self) -> Dict[str, Any]:
+        """Return both budgets for diagnostics."""
+        return {"account": self.account.as_dict(), "domain": self.domain.as_dict()}
+
+
+async def async_admit_request(request: httpx.Request) -> None:
+    """Count an HTTP request against the budgets of the account sending it.
+
+    A request hook of the shared HTTP client, so retries, redirects, token
+    refreshes and logins are all counted.
+    """
+    if (caller := _CALLER.get()) is None:
+        return
+    scheduler, priority = caller
+    scheduler.admit(priority, f"{request.method} {request.url.path}")
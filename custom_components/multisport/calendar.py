@@ -0,0 +1,111 @@
+"""Calendar platform for MultiSport integration."""
+
+from __future__ import annotations
+
+import datetime
+import logging
+from typing import List
+
+from homeassistant.components.calendar import CalendarEntity, CalendarEvent
+from homeassistant.config_entries import ConfigEntry
+from homeassistant.core import HomeAssistant
+from homeassistant.helpers.entity import DeviceInfo
+from homeassistant.helpers.entity_platform import AddEntitiesCallback
+from homeassistant.util import dt as dt_util
+
+from .const import DOMAIN
+from .coordinator import MultisportDataUpdateCoordinator
+from .entity import MultisportCardEntity, async_add_card_entities
+from .model import CardSnapshot
+from .visits import Visit, to_timestamp
+
+_LOGGER = logging.getLogger(__name__)
+
+# The API only records check-ins, each visit is shown as lasting this long
+VISIT_DURATION = datetime.timedelta(hours=1)
+
+
+async def async_setup_entry(
+    hass: HomeAssistant,
+    entry: ConfigEntry,
+    async_add_entities: AddEntitiesCallback,
+) -> None:
+    """Set up the calendar platform."""
+    coordinator: MultisportDataUpdateCoordinator = hass.data[DOMAIN][entry.entry_id]
+
+    def _create_card_calendars(
+        card: CardSnapshot, device_info: DeviceInfo
+    ) -> List[CalendarEntity]:
+        """Create the calendar of a card."""
+        return [
+            MultisportVisitsCalendar(
+                coordinator, card.card_id, device_info, card.holder_name
+            )
+        ]
+
+    async_add_card_entities(
+        coordinator, entry, async_add_entities, _create_card_calendars
+    )
+
+
+class MultisportVisitsCalendar(MultisportCardEntity, CalendarEntity):
+    """Calendar of the visits of a MultiSport card.
+
+    Events are read from the card's visit store, whose timestamps are kept
+    sorted, so a range of any length costs two bisections plus the visits
+    it returns. All visits last VISIT_DURATION, so the visits overlapping a
+    range are those starting no earlier than VISIT_DURATION before it.
+    """
+
+    _attr_icon = "mdi:calendar-check"
+    _attr_translation_key = "visits"
+
+    def __init__(
+        self,
+        coordinator: MultisportDataUpdateCoordinator,
+        card_id: str,
+        device_info: DeviceInfo,
+        card_holder_name: str,
+    ) -> None:
+        """Initialize the calendar."""
+        super().__init__(coordinator, card_id, device_info, card_holder_name)
+        self._attr_unique_id = f"{card_id}_visits"
+
+    @property
+    def event(self) -> CalendarEvent | None:
+        """Return the visit in progress, if any."""
+        latest = self.coordinator.history.visits(self._card_id).latest()
+        if latest is None:
+            return None
+        event = self._visit_event(latest)
+        if event.end_datetime_local <= dt_util.now():
+            return None
+        return event
+
+    async def async_get_events(
+        self,
+        hass: HomeAssistant,
+        start_date: datetime.datetime,
+        end_date: datetime.datetime,
+    ) -> list[CalendarEvent]:
+        """Return the visits overlapping a range."""
+        # Visits are stored in naive local time
+        start = dt_util.as_local(start_date).replace(tzinfo=None)
+        end = dt_util.as_local(end_date).replace(tzinfo=None)
+        visits = self.coordinator.history.visits(self._card_id)
+        return [
+            self._visit_event(visit)
+            for visit in visits.visits_between(start - VISIT_DURATION, end)
+            if visit.timestamp + VISIT_DURATION > start
+        ]
+
+    def _visit_event(self, visit: Visit) -> CalendarEvent:
+        """Return the event of a visit."""
+        start = visit.timestamp.replace(tzinfo=dt_util.get_default_time_zone())
+        return CalendarEvent(
+            start=start,
+            end=start + VISIT_DURATION,
+            summary=visit.facility or "MultiSport",
+            description=visit.registration_method,
+            uid=f"{self._card_id}_{to_timestamp(visit.timestamp)}_{visit.facility}",
+        )
@@ -3,7 +3,7 @@
 from __future__ import annotations
 
 import logging
-from typing import Any
+from typing import TYPE_CHECKING, Any, Mapping
 
 import voluptuous as vol
 from homeassistant import config_entries
@@ -12,9 +12,31 @@ from homeassistant.core import HomeAssistant
 from homeassistant.core import callback
 from homeassistant.config_entries import ConfigFlowResult
 from homeassistant.exceptions import HomeAssistantError
+from homeassistant.helpers.importlib import async_import_module
+
+from .const import (
+    CONF_DOMAIN_REQUEST_BUDGET,
+    CONF_HISTORY_DAYS,
+    CONF_MAX_CONCURRENT_REQUESTS,
+    CONF_MAX_UPDATE_INTERVAL,
+    CONF_MIN_UPDATE_INTERVAL,
+    CONF_POLLING_MODE,
+    CONF_REQUEST_BUDGET,
+    CONF_UPDATE_INTERVAL,
+    DEFAULT_DOMAIN_REQUEST_BUDGET,
+    DEFAULT_HISTORY_DAYS,
+    DEFAULT_MAX_CONCURRENT_REQUESTS,
+    DEFAULT_MAX_UPDATE_INTERVAL,
+    DEFAULT_MIN_UPDATE_INTERVAL,
+    DEFAULT_POLLING_MODE,
+    DEFAULT_REQUEST_BUDGET,
+    DEFAULT_UPDATE_INTERVAL,
+    DOMAIN,
+    POLLING_MODES,
+)
 
-from .api import MultisportApi
-from .const import CONF_UPDATE_INTERVAL, DEFAULT_UPDATE_INTERVAL, DOMAIN
+if TYPE_CHECKING:
+    from .api import MultisportApi
 
 _LOGGER = logging.getLogger(__name__)
 
@@ -25,9 +47,15 @@ STEP_USER_DATA_SCHEMA = vol.Schema(
     }
 )
 
+STEP_REAUTH_DATA_SCHEMA = vol.Schema({vol.Required(CONF_PASSWORD): str})
+
 
 async def validate_input(hass: HomeAssistant, data: dict[str, Any]) -> dict[str, Any]:
     """Validate the user input allows us to connect."""
+    # The client library is only loaded once a flow actually logs in
+    await async_import_module(hass, f"{__package__}.api")
+    from .api import MultisportApi
+
     api = MultisportApi(
         hass, username=data[CONF_USERNAME], password=data[CONF_PASSWORD]
     )
@@ -35,7 +63,14 @@ async def validate_input(hass: HomeAssistant, data: dict[str, Any]) -> dict[str,
         raise CannotConnect
 
     # Return info that you want to store in the config entry.
-    return {"title": data[CONF_USERNAME]}
+    return {"title": data[CONF_USERNAME], "api": api}
+
+
+def _hand_off_api(hass: HomeAssistant, api: MultisportApi) -> None:
+    """Keep the session of a validated login for the entry."""
+    from .api import async_hand_off_api  # Loaded by validate_input
+
+    async_hand_off_api(hass, api)
 
 
 class ConfigFlow(config_entries.ConfigFlow, domain=DOMAIN):
@@ -67,12 +102,51 @@ class ConfigFlow(config_entries.ConfigFlow, domain=DOMAIN):
             else:
                 await self.async_set_unique_id(user_input[CONF_USERNAME])
                 self._abort_if_unique_id_configured()
+                # The new entry starts with this session instead of logging in
+                if (api := info.get("api")) is not None:
+                    _hand_off_api(self.hass, api)
                 return self.async_create_entry(title=info["title"], data=user_input)
 
         return self.async_show_form(
             step_id="user", data_schema=STEP_USER_DATA_SCHEMA, errors=errors
         )
 
+    async def async_step_reauth(
+        self, entry_data: Mapping[str, Any]
+    ) -> ConfigFlowResult:
+        """Handle a session the MultiSport API keeps rejecting."""
+        return await self.async_step_reauth_confirm()
+
+    async def async_step_reauth_confirm(
+        self, user_input: dict[str, Any] | None = None
+    ) -> ConfigFlowResult:
+        """Ask for the password of the account again."""
+        errors: dict[str, str] = {}
+        reauth_entry = self._get_reauth_entry()
+        if user_input is not None:
+            data = {**reauth_entry.data, CONF_PASSWORD: user_input[CONF_PASSWORD]}
+            try:
+                info = await validate_input(self.hass, data)
+            except CannotConnect:
+                errors["base"] = "cannot_connect"
+            except Exception:  # pylint: disable=broad-except
+                _LOGGER.exception("Unexpected exception")
+                errors["base"] = "unknown"
+            else:
+                if (api := info.get("api")) is not None:
+                    _hand_off_api(self.hass, api)
+                return self.async_update_reload_and_abort(
+                    reauth_entry,
+                    data_updates={CONF_PASSWORD: user_input[CONF_PASSWORD]},
+                )
+
+        return self.async_show_form(
+            step_id="reauth_confirm",
+            data_schema=STEP_REAUTH_DATA_SCHEMA,
+            description_placeholders={"username": reauth_entry.data[CONF_USERNAME]},
+            errors=errors,
+        )
+
 
 class OptionsFlow(config_entries.OptionsFlow):
     """Handle an options flow for MultiSport."""
@@ -98,6 +172,49 @@ class OptionsFlow(config_entries.OptionsFlow):
                             CONF_UPDATE_INTERVAL, DEFAULT_UPDATE_INTERVAL.seconds / 60
                         ),
                     ): int,
+                    vol.Optional(
+                        CONF_MAX_CONCURRENT_REQUESTS,
+                        default=self.config_entry.options.get(
+                            CONF_MAX_CONCURRENT_REQUESTS,
+                            DEFAULT_MAX_CONCURRENT_REQUESTS,
+                        ),
+                    ): vol.All(int, vol.Range(min=1, max=16)),
+                    vol.Optional(
+                        CONF_HISTORY_DAYS,
+                        default=self.config_entry.options.get(
+                            CONF_HISTORY_DAYS, DEFAULT_HISTORY_DAYS
+                        ),
+                    ): vol.All(int, vol.Range(min=1, max=3650)),
+                    vol.Optional(
+                        CONF_POLLING_MODE,
+                        default=self.config_entry.options.get(
+                            CONF_POLLING_MODE, DEFAULT_POLLING_MODE
+                        ),
+                    ): vol.In(POLLING_MODES),
+                    vol.Optional(
+                        CONF_MIN_UPDATE_INTERVAL,
+                        default=self.config_entry.options.get(
+                            CONF_MIN_UPDATE_INTERVAL, DEFAULT_MIN_UPDATE_INTERVAL
+                        ),
+                    ): vol.All(int, vol.Range(min=5)),
+                    vol.Optional(
+                        CONF_MAX_UPDATE_INTERVAL,
+                        default=self.config_entry.options.get(
+                            CONF_MAX_UPDATE_INTERVAL, DEFAULT_MAX_UPDATE_INTERVAL
+                        ),
+                    ): vol.All(int, vol.Range(min=5)),
+                    vol.Optional(
+                        CONF_REQUEST_BUDGET,
+                        default=self.config_entry.options.get(
+                            CONF_REQUEST_BUDGET, DEFAULT_REQUEST_BUDGET
+                        ),
+                    ): vol.All(int, vol.Range(min=10)),
+                    vol.Optional(
+                        CONF_DOMAIN_REQUEST_BUDGET,
+                        default=self.config_entry.options.get(
+                            CONF_DOMAIN_REQUEST_BUDGET, DEFAULT_DOMAIN_REQUEST_BUDGET
+                        ),
+                    ): vol.All(int, vol.Range(min=10)),
                 }
             ),
         )
@@ -4,11 +4,43 @@ from datetime import timedelta
 from homeassistant.const import Platform
 
 DOMAIN = "multisport"
-PLATFORMS: list[Platform] = [Platform.SENSOR, Platform.BINARY_SENSOR]
+PLATFORMS: list[Platform] = [Platform.SENSOR, Platform.BINARY_SENSOR, Platform.CALENDAR]
 
 # Configuration constants
 CONF_UPDATE_INTERVAL = "update_interval"
 DEFAULT_UPDATE_INTERVAL = timedelta(hours=1)
+CONF_MAX_CONCURRENT_REQUESTS = "max_concurrent_requests"
+DEFAULT_MAX_CONCURRENT_REQUESTS = 4
+CONF_HISTORY_DAYS = "history_days"
+DEFAULT_HISTORY_DAYS = 30
+CONF_POLLING_MODE = "polling_mode"
+POLLING_MODE_FIXED = "fixed"
+POLLING_MODE_ADAPTIVE = "adaptive"
+POLLING_MODES = [POLLING_MODE_FIXED, POLLING_MODE_ADAPTIVE]
+DEFAULT_POLLING_MODE = POLLING_MODE_FIXED
+CONF_MIN_UPDATE_INTERVAL = "min_update_interval"
+DEFAULT_MIN_UPDATE_INTERVAL = 15  # minutes
+CONF_MAX_UPDATE_INTERVAL = "max_update_interval"
+DEFAULT_MAX_UPDATE_INTERVAL = 180  # minutes
+# Requests allowed per hour, for the account and for all accounts together.
+# The lowest domain-wide budget set on any account applies.
+CONF_REQUEST_BUDGET = "request_budget"
+DEFAULT_REQUEST_BUDGET = 300
+CONF_DOMAIN_REQUEST_BUDGET = "domain_request_budget"
+DEFAULT_DOMAIN_REQUEST_BUDGET = 1000
+
+# The card list of an account is refreshed on a slower tier than card data
+TOPOLOGY_UPDATE_INTERVAL = timedelta(days=1)
+
+# Fired once for each new visit of a card
+EVENT_VISIT = f"{DOMAIN}_visit"
 
 # Services
 SERVICE_FORCE_UPDATE = "force_update"
+SERVICE_IMPORT_HISTORY = "import_history"
+SERVICE_PROFILE_REFRESH = "profile_refresh"
+ATTR_CARD_ID = "card_id"
+ATTR_ENTRY_ID = "entry_id"
+ATTR_START_DATE = "start_date"
+ATTR_END_DATE = "end_date"
+ATTR_PSTATS = "pstats"
@@ -2,177 +2,248 @@
 
 from __future__ import annotations
 
+import asyncio
 import datetime
 import logging
-from typing import Any, Dict, List
+import time
+from typing import Any, Dict, List, cast
 
+import httpx
 from homeassistant.config_entries import ConfigEntry
-from homeassistant.core import HomeAssistant
+from homeassistant.core import CALLBACK_TYPE, HomeAssistant, callback
+from homeassistant.exceptions import ConfigEntryAuthFailed, HomeAssistantError
+from homeassistant.helpers.event import async_call_later
+from homeassistant.helpers.storage import Store
 from homeassistant.helpers.update_coordinator import DataUpdateCoordinator, UpdateFailed
 
-from .const import DOMAIN
+from .api import MultisportApi, payload_digest
+from .budget import PRIORITY_IMPORT, RequestDeferredError
+
+from .const import (
+    CONF_HISTORY_DAYS,
+    CONF_MAX_CONCURRENT_REQUESTS,
+    CONF_MAX_UPDATE_INTERVAL,
+    CONF_MIN_UPDATE_INTERVAL,
+    CONF_POLLING_MODE,
+    DEFAULT_HISTORY_DAYS,
+    DEFAULT_MAX_CONCURRENT_REQUESTS,
+    DEFAULT_MAX_UPDATE_INTERVAL,
+    DEFAULT_MIN_UPDATE_INTERVAL,
+    DEFAULT_POLLING_MODE,
+    DOMAIN,
+    EVENT_VISIT,
+    POLLING_MODE_ADAPTIVE,
+    TOPOLOGY_UPDATE_INTERVAL,
+)
+from .history import HistorySync, month_bounds
+from .model import CardSnapshot
+from .scheduler import AdaptivePollScheduler
+from .statistics import VisitStatistics
+from .visits import VisitIngest
 from homeassistant.util import dt as dt_util
 from multisport_py import AuthenticationError, MultisportClient, MultisportError
 
 _LOGGER = logging.getLogger(__name__)
 
+SNAPSHOT_STORAGE_VERSION = 1
+SNAPSHOT_SAVE_DELAY = 30  # seconds
+
+# Delay before a history import deferred by the request budget tries again
+IMPORT_DEFERRED_RETRY_DELAY = 900  # seconds
+
+# Card list refreshes in a row a card must be missing from before it is
+# dropped, an empty or partial list can be a passing glitch of the API
+CARD_RETIRE_REFRESHES = 3
+
 
-class MultisportDataUpdateCoordinator(DataUpdateCoordinator[Dict[str, Any]]):
+def async_get_snapshot_store(hass: HomeAssistant, entry_id: str) -> Store:
+    """Return the store holding the last good coordinator data of an entry."""
+    return Store(hass, SNAPSHOT_STORAGE_VERSION, f"{DOMAIN}.{entry_id}.snapshot")
+
+
+class MultisportDataUpdateCoordinator(DataUpdateCoordinator[Dict[str, CardSnapshot]]):
     """Class to manage fetching MultiSport data."""
 
     def __init__(
         self,
         hass: HomeAssistant,
-        client: MultisportClient,
+        api: MultisportApi,
         entry: ConfigEntry,
         update_interval: datetime.timedelta,
     ) -> None:
         """Initialize."""
-        self.client = client
+        self.api = api
         self.entry = entry
         self._last_updated_time: datetime.datetime | None = None
-        super().__init__(hass, _LOGGER, name=DOMAIN, update_interval=update_interval)
+        self._snapshot_store = async_get_snapshot_store(hass, entry.entry_id)
+        self._data_restored = False
+        self.max_concurrent_requests: int = entry.options.get(
+            CONF_MAX_CONCURRENT_REQUESTS, DEFAULT_MAX_CONCURRENT_REQUESTS
+        )
+        self.history_days: int = entry.options.get(
+            CONF_HISTORY_DAYS, DEFAULT_HISTORY_DAYS
+        )
+        self.history = HistorySync(hass, entry.entry_id)
+        self.statistics = VisitStatistics(hass)
+        self.polling_mode: str = entry.options.get(
+            CONF_POLLING_MODE, DEFAULT_POLLING_MODE
+        )
+        self.scheduler = AdaptivePollScheduler(
+            datetime.timedelta(
+                minutes=entry.options.get(
+                    CONF_MIN_UPDATE_INTERVAL, DEFAULT_MIN_UPDATE_INTERVAL
+                )
+            ),
+            datetime.timedelta(
+                minutes=entry.options.get(
+                    CONF_MAX_UPDATE_INTERVAL, DEFAULT_MAX_UPDATE_INTERVAL
+                )
+            ),
+        )
+        # Interval of the fixed polling mode, and the fraction of it by which
+        # this entry's refreshes are offset from the other entries'
+        self.poll_interval = update_interval
+        self.phase: float | None = None
+        self.topology_interval = TOPOLOGY_UPDATE_INTERVAL
+        self._topology: List[Dict[str, Any]] | None = None
+        self._topology_updated: datetime.datetime | None = None
+        # Card list refreshes in a row each known card was missing from
+        self._missing_cards: Dict[str, int] = {}
+        # Fingerprint of each card's processed data and when it last changed
+        self._fingerprints: Dict[str, str] = {}
+        self._changed_at: Dict[str, datetime.datetime] = {}
+        # Digests of the responses each card's current data was built from
+        self._card_digests: Dict[str, tuple[str, str, datetime.date]] = {}
+        # In-flight refreshes of single cards, shared by concurrent callers
+        self._card_refreshes: Dict[str, asyncio.Task[None]] = {}
+        # Whether a history import runs in the background, and why it last stopped
+        self.backfill_running = False
+        self.backfill_error: str | None = None
+        # Pending retry of a history import deferred by the request budget
+        self._import_retry_unsub: CALLBACK_TYPE | None = None
+        entry.async_on_unload(self._async_cancel_import_retry)
+        super().__init__(
+            hass,
+            _LOGGER,
+            config_entry=entry,
+            name=DOMAIN,
+            update_interval=update_interval,
+        )
+
+    @property
+    def client(self) -> MultisportClient | None:
+        """Return the authenticated client, if any."""
+        return self.api.client
 
     @property
     def last_updated_time(self) -> datetime.datetime | None:
         """Return the last successful update time."""
         return self._last_updated_time
 
-    async def _async_update_data(self) -> Dict[str, Any]:
+    @property
+    def data_restored(self) -> bool:
+        """Return True while data comes from the persisted snapshot."""
+        return self._data_restored
+
+    @property
+    def polling_interval(self) -> datetime.timedelta:
+        """Return the nominal polling interval, before staggering."""
+        if self.polling_mode == POLLING_MODE_ADAPTIVE:
+            return self.scheduler.interval
+        return self.poll_interval
+
+    def card_fingerprint(self, card_id: str) -> str | None:
+        """Return the fingerprint of a card's current data."""
+        return self._fingerprints.get(card_id)
+
+    def card_changed_at(self, card_id: str) -> datetime.datetime | None:
+        """Return when the data of a card last changed."""
+        return self._changed_at.get(card_id)
+
+    async def async_restore_snapshot(self) -> bool:
+        """Load the last good data persisted by a previous run.
+
+        Returns True if a snapshot was restored.
+        """
+        snapshot = await self._snapshot_store.async_load()
+        if not snapshot or not snapshot.get("data"):
+            return False
+
+        self.data = {
+            card_id: CardSnapshot.from_dict(card)
+            for card_id, card in snapshot["data"].items()
+        }
+        self._last_updated_time = dt_util.parse_datetime(snapshot["updated"])
+        if snapshot.get("topology") is not None:
+            self._topology = snapshot["topology"]
+            self._topology_updated = dt_util.parse_datetime(
+                snapshot["topology_updated"]
+            )
+        for card_id, changed in snapshot.get("changed", {}).items():
+            self._fingerprints[card_id] = changed["fingerprint"]
+            self._changed_at[card_id] = cast(
+                datetime.datetime, dt_util.parse_datetime(changed["at"])
+            )
+        self._update_fingerprints(
+            self.data, cast(datetime.datetime, self._last_updated_time)
+        )
+        # The snapshot may be from an earlier day, the values relative to the
+        # day are derived again from the stored visits
+        await self.history.async_load()
+        today = dt_util.now().date()
+        self.data = {
+            card_id: (
+                self._derive_for_day(card, today)
+                if self.history.visits(card_id).latest() is not None
+                else card
+            )
+            for card_id, card in self.data.items()
+        }
+        self._update_fingerprints(self.data, dt_util.utcnow())
+        self._data_restored = True
+        _LOGGER.debug(
+            "Restored MultiSport snapshot from %s with %s cards",
+            snapshot["updated"],
+            len(self.data),
+        )
+        return True
+
+    async def _async_update_data(self) -> Dict[str, CardSnapshot]:
         """Update data via MultiSport API."""
-        data: Dict[str, Any] = {}
+        started = time.perf_counter()
         try:
-            # Login should already be handled by config_flow, but ensure it's active
-            # Or re-login if token expired (MultisportClient should handle refresh)
-            # For simplicity now, we assume client is logged in or can re-login.
-
-            # Fetch main user info to get the main product ID
-            user_info = await self.client.get_user_info()
-            main_product_id = None
-            if user_info and user_info.get("ms_products"):
-                main_product_id = user_info["ms_products"][0]
-
-            if not main_product_id:
-                raise MultisportError("Could not retrieve main MultiSport product ID.")
-
-            # Fetch authorized users (contains main product and potentially hints for relations)
-            authorized_users_data = await self.client.get_authorized_users()
-
-            # Fetch relations (companion cards)
-            relations_data = await self.client.get_relations()
-
-            # Consolidate all cards
-            all_cards: List[Dict[str, Any]] = []
-
-            # Add main card from authorized_users_data if available
-            if authorized_users_data and authorized_users_data.get("products"):
-                for product in authorized_users_data["products"]:
-                    if product.get("id") == str(
-                        main_product_id
-                    ):  # Ensure it's the main product
-                        all_cards.append(
-                            {
-                                "id": product["id"],
-                                "holder_first_name": product["holder"]["firstName"],
-                                "holder_last_name": product["holder"]["lastName"],
-                                "is_main": True,
-                                "product_type": product.get("productType"),
-                                # ... other relevant fields
-                            }
-                        )
-                        break  # Only expect one main card here
-
-            # Add related cards from relations_data
-            if relations_data and relations_data.get("items"):
-                for item in relations_data["items"]:
-                    # Relations might contain different types of items, filter for cards if needed
-                    # Assuming items here directly represent cards with similar structure for holder
-                    all_cards.append(
-                        {
-                            "id": item["id"],  # Assuming relations also have an ID
-                            "holder_first_name": item["holder"]["firstName"],
-                            "holder_last_name": item["holder"]["lastName"],
-                            "is_main": False,
-                            # ... other relevant fields from relation item
-                        }
-                    )
-
-            if not all_cards:
-                _LOGGER.warning("No MultiSport cards found for the account.")
-                # Maybe raise UpdateFailed if no cards are expected ever? For now, empty data is fine.
-                data = {}  # Set data to empty explicitly
-            else:
-                # For each card, fetch limits and history
-                for card in all_cards:
-                    card_id = card["id"]
-
-                    # Fetch limits
-                    limits = await self.client.get_card_limits(card_id)
-                    card["remaining_visits"] = limits.get("remainingVisits")
-
-                    # Fetch history (e.g., last 30 days)
-                    today = datetime.date.today()
-                    thirty_days_ago = today - datetime.timedelta(days=30)
-                    history = await self.client.get_card_history(
-                        card_id,
-                        date_from=thirty_days_ago.isoformat(),
-                        date_to=today.isoformat(),
-                    )
-                    card["history"] = history  # Store full history
-
-                    # Extract last visit details
-                    card["last_visit"] = None
-                    if history:
-                        # History is a list of monthly summaries, each with a 'visits' list
-                        # Find the latest visit across all monthly summaries
-                        latest_visit_date = None
-                        latest_visit_details = None
-                        for monthly_summary in history:
-                            for visit in monthly_summary.get("visits", []):
-                                visit_date_str = visit["date"]  # e.g., "DD-MM-YYYY"
-                                visit_time_str = visit["time"]  # e.g., "HH:MM"
-                                try:
-                                    # Convert to datetime object for comparison
-                                    visit_datetime_str = (
-                                        f"{visit_date_str} {visit_time_str}"
-                                    )
-                                    current_visit_datetime = datetime.datetime.strptime(
-                                        visit_datetime_str, "%d-%m-%Y %H:%M"
-                                    )
-                                    if (
-                                        latest_visit_date is None
-                                        or current_visit_datetime > latest_visit_date
-                                    ):
-                                        latest_visit_date = current_visit_datetime
-                                        latest_visit_details = visit
-                                except ValueError:
-                                    _LOGGER.warning(
-                                        "Could not parse visit date/time: %s %s",
-                                        visit_date_str,
-                                        visit_time_str,
-                                    )
-
-                        if latest_visit_details:
-                            card["last_visit"] = latest_visit_details
-                            # Add a flag if visit was today
-                            if latest_visit_date and latest_visit_date.date() == today:
-                                card["used_today"] = True
-                            else:
-                                card["used_today"] = False
-                        else:
-                            card["used_today"] = False
-                    else:
-                        card["used_today"] = False
-
-                    data[card_id] = card  # Store processed card data keyed by card_id
+            try:
+                data = await self._async_fetch_data()
+            except AuthenticationError as exc:
+                # Still rejected after the client's own token refresh. Log in
+                # again, once for all concurrent callers, and retry once.
+                _LOGGER.debug("MultiSport session rejected, logging in: %s", exc)
+                await self.api.async_reauthenticate()
+                data = await self._async_fetch_data()
 
             self._last_updated_time = (
                 dt_util.utcnow()
             )  # Set last updated time on success
+            self._update_fingerprints(data, self._last_updated_time)
+            # Tokens may have been refreshed by the client during the update
+            self.api.async_save_tokens()
+            self._data_restored = False
+            if self.polling_mode == POLLING_MODE_ADAPTIVE:
+                self._schedule_adaptive(data)
+            else:
+                self.update_interval = self._staggered_interval(self._last_updated_time)
+            self.entry.async_create_background_task(
+                self.hass,
+                self._async_import_statistics(data),
+                f"{DOMAIN} {self.entry.title} visit statistics",
+            )
+            self._snapshot_store.async_delay_save(
+                lambda: self._snapshot_to_save(data), SNAPSHOT_SAVE_DELAY
+            )
 
         except AuthenticationError as exc:
-            raise UpdateFailed(
-                "Authentication failed. Please re-configure the integration."
+            raise ConfigEntryAuthFailed(
+                "Authentication failed. Please re-authenticate the integration."
             ) from exc
         except MultisportError as exc:
             raise UpdateFailed(
@@ -181,5 +252,512 @@ class MultisportDataUpdateCoordinator(DataUpdateCoordinator[Dict[str, Any]]):
         except Exception as exc:  # Catch any other unexpected errors
             _LOGGER.exception("Unexpected error when updating MultiSport data")
             raise UpdateFailed(f"Unexpected error: {exc}") from exc
+        finally:
+            self.api.stats.record_refresh((time.perf_counter() - started) * 1000)
+
+        return data
+
+    async def _async_fetch_data(self) -> Dict[str, CardSnapshot]:
+        """Fetch the card list, if due, and the data of every card."""
+        # Authentication is deferred to the first refresh so a warm start
+        # does not have to wait for it.
+        if self.api.client is None:
+            await self.api.async_login()
+        client = cast(MultisportClient, self.api.client)
+
+        # The card list rarely changes, it is refreshed on its own slow tier
+        if self._topology_expired():
+            try:
+                self._topology = self._retain_missing_cards(
+                    await self._async_fetch_topology(client)
+                )
+                self._topology_updated = dt_util.utcnow()
+            except RequestDeferredError:
+                if self._topology is None:
+                    raise
+                _LOGGER.debug("Card list refresh deferred, keeping the known cards")
+        all_cards = list(self._topology or [])
+
+        if not all_cards:
+            _LOGGER.warning("No MultiSport cards found for the account.")
+            # Maybe raise UpdateFailed if no cards are expected ever? For now,
+            # empty data is fine.
+            return {}
 
+        data = await self._async_fetch_cards(all_cards)
+        self.history.async_retain({card["id"] for card in all_cards})
         return data
+
+    def _retain_missing_cards(
+        self, topology: List[Dict[str, Any]]
+    ) -> List[Dict[str, Any]]:
+        """Keep the known cards missing from a fetched list until they stay missing.
+
+        Cards, their devices and their entity customizations are only
+        dropped once absent from CARD_RETIRE_REFRESHES lists in a row.
+        """
+        fetched = {card["id"] for card in topology}
+        missing_cards: Dict[str, int] = {}
+        retained = []
+        for card in self._topology or []:
+            if (card_id := card["id"]) in fetched:
+                continue
+            missing = self._missing_cards.get(card_id, 0) + 1
+            if missing < CARD_RETIRE_REFRESHES:
+                _LOGGER.debug("Card %s missing from the card list, kept", card_id)
+                missing_cards[card_id] = missing
+                retained.append(card)
+        self._missing_cards = missing_cards
+        return [*topology, *retained]
+
+    def _topology_expired(self) -> bool:
+        """Return True if the card list has to be fetched again."""
+        return (
+            self._topology is None
+            or self._topology_updated is None
+            or dt_util.utcnow() - self._topology_updated >= self.topology_interval
+        )
+
+    async def async_request_topology_refresh(self) -> None:
+        """Refresh the card list together with the per-card data."""
+        self._topology_updated = None
+        await self.async_request_refresh()
+
+    async def async_refresh_card(self, card_id: str) -> None:
+        """Refresh the limits and history of a single card.
+
+        Calls made while a refresh of the same card is in flight wait for it
+        instead of starting another one.
+        """
+        if (task := self._card_refreshes.get(card_id)) is None:
+            task = self._card_refreshes[card_id] = self.entry.async_create_task(
+                self.hass,
+                self._async_refresh_card(card_id),
+                f"{DOMAIN} {self.entry.title} card refresh",
+            )
+            task.add_done_callback(lambda _: self._card_refreshes.pop(card_id, None))
+        await asyncio.shield(task)
+
+    async def _async_refresh_card(self, card_id: str) -> None:
+        """Fetch one card and merge it into the current data."""
+        card = next(
+            (card for card in self._topology or [] if card["id"] == card_id), None
+        )
+        if card is None or not self.data:
+            raise HomeAssistantError(f"Unknown MultiSport card {card_id}")
+        try:
+            if self.api.client is None:
+                await self.api.async_login()
+            try:
+                snapshot = await self._async_fetch_card(card)
+            except AuthenticationError:
+                await self.api.async_reauthenticate()
+                snapshot = await self._async_fetch_card(card)
+        except AuthenticationError as exc:
+            self.entry.async_start_reauth(self.hass)
+            raise HomeAssistantError(
+                "Authentication failed. Please re-authenticate the integration."
+            ) from exc
+        except (MultisportError, httpx.HTTPError) as exc:
+            raise HomeAssistantError(
+                f"Error communicating with MultiSport API: {exc}"
+            ) from exc
+
+        self.api.async_save_tokens()
+        self._async_publish({**self.data, card_id: snapshot})
+
+    async def async_import_history(
+        self, card_ids: List[str], start: datetime.date, end: datetime.date
+    ) -> None:
+        """Queue the import of the history of cards between two dates."""
+        await self.history.async_load()
+        for card_id in card_ids:
+            self.history.async_queue_backfill(card_id, start, end)
+        self.async_resume_history_import()
+        self.async_update_listeners()
+
+    @callback
+    def async_resume_history_import(self) -> None:
+        """Import the months requested and not imported yet, in the background."""
+        if self.backfill_running:
+            return
+        self.backfill_running = True
+        self.backfill_error = None
+        self.entry.async_create_background_task(
+            self.hass,
+            self._async_import_history(),
+            f"{DOMAIN} {self.entry.title} history import",
+        )
+
+    async def _async_import_history(self) -> None:
+        """Import pending months card by card, until none are left."""
+        await self.history.async_load()
+        if not self.history.pending_backfills(dt_util.now().date()):
+            self.backfill_running = False
+            return
+        try:
+            while pending := self.history.pending_backfills(dt_util.now().date()):
+                if self.api.client is None:
+                    await self.api.async_login()
+                card_id, keys = next(iter(pending.items()))
+                await self._async_backfill_card(card_id, keys)
+        except RequestDeferredError as exc:
+            _LOGGER.debug("MultiSport history import deferred: %s", exc)
+            self.backfill_error = str(exc)
+            self._async_cancel_import_retry()
+            self._import_retry_unsub = async_call_later(
+                self.hass,
+                IMPORT_DEFERRED_RETRY_DELAY,
+                self._async_resume_deferred_import,
+            )
+        except (MultisportError, httpx.HTTPError) as exc:
+            # The imported months are kept, the rest follow on the next start
+            # or import request
+            _LOGGER.warning("MultiSport history import paused: %s", exc)
+            self.backfill_error = str(exc)
+        finally:
+            self.backfill_running = False
+            self.async_update_listeners()
+
+    async def _async_backfill_card(self, card_id: str, keys: List[str]) -> None:
+        """Import months of a card, then update what is derived from its visits."""
+        try:
+            await self.history.async_backfill(
+                card_id,
+                keys,
+                self._async_fetch_import,
+                dt_util.now().date(),
+                self.async_update_listeners,
+            )
+        finally:
+            # Also for the months imported before a failure
+            self._async_update_analytics(card_id)
+            if self.data and (card := self.data.get(card_id)) is not None:
+                self.entry.async_create_background_task(
+                    self.hass,
+                    self.statistics.async_reimport(
+                        card_id,
+                        card.holder_name,
+                        self.history.visits(card_id),
+                        month_bounds(min(keys))[0],
+                    ),
+                    f"{DOMAIN} {self.entry.title} visit statistics",
+                )
+
+    @callback
+    def _async_resume_deferred_import(self, _now: datetime.datetime) -> None:
+        """Resume a history import deferred by the request budget."""
+        self._import_retry_unsub = None
+        self.async_resume_history_import()
+
+    @callback
+    def _async_cancel_import_retry(self) -> None:
+        """Cancel the pending retry of a deferred history import."""
+        if self._import_retry_unsub is not None:
+            self._import_retry_unsub()
+            self._import_retry_unsub = None
+
+    @callback
+    def _async_update_analytics(self, card_id: str) -> None:
+        """Rebuild what is derived from the visits of a card after an import."""
+        if not self.data or (card := self.data.get(card_id)) is None:
+            return
+        self._async_publish(
+            {**self.data, card_id: self._derive_for_day(card, dt_util.now().date())}
+        )
+
+    @callback
+    def async_roll_over_day(self, now: datetime.datetime | None = None) -> None:
+        """Re-evaluate the values relative to the current day for every card.
+
+        Whether a card was used today and its weekly and monthly counts
+        only depend on the stored visits and the local date, so a new day
+        needs no request.
+        """
+        if not self.data:
+            return
+        today = dt_util.now().date()
+        self._async_publish(
+            {
+                card_id: self._derive_for_day(card, today)
+                for card_id, card in self.data.items()
+            }
+        )
+
+    @callback
+    def _async_publish(self, data: Dict[str, CardSnapshot]) -> None:
+        """Set data updated outside a full refresh, keeping the polling schedule.
+
+        Like a refresh, the fingerprints entities write their state on are
+        updated and the snapshot is saved.
+        """
+        self._update_fingerprints(data, dt_util.utcnow())
+        self.data = data
+        # Not through async_set_updated_data, the schedule of full refreshes
+        # is left alone
+        self.async_update_listeners()
+        self._snapshot_store.async_delay_save(
+            lambda: self._snapshot_to_save(data), SNAPSHOT_SAVE_DELAY
+        )
+
+    def _derive_for_day(self, card: CardSnapshot, today: datetime.date) -> CardSnapshot:
+        """Return a card with the values derived from its visits afresh."""
+        card_id = card.card_id
+        latest = self.history.visits(card_id).latest()
+        return card.with_visits(
+            latest,
+            used_today=latest is not None and latest.timestamp.date() == today,
+            analytics=self.history.aggregates(card_id).summary(today),
+        )
+
+    async def _async_fetch_topology(
+        self, client: MultisportClient
+    ) -> List[Dict[str, Any]]:
+        """Fetch the main card and its companion cards."""
+        # Fetch main user info to get the main product ID
+        user_info = await client.get_user_info()
+        main_product_id = None
+        if user_info and user_info.get("ms_products"):
+            main_product_id = user_info["ms_products"][0]
+
+        if not main_product_id:
+            raise MultisportError("Could not retrieve main MultiSport product ID.")
+
+        # Fetch authorized users (contains main product and potentially hints
+        # for relations) and relations (companion cards). Neither depends on
+        # the other. When one fails, the other is cancelled rather than left
+        # running against the request budget.
+        tasks = (
+            asyncio.ensure_future(client.get_authorized_users()),
+            asyncio.ensure_future(client.get_relations()),
+        )
+        try:
+            authorized_users_data, relations_data = await asyncio.gather(*tasks)
+        except BaseException:
+            for task in tasks:
+                task.cancel()
+            raise
+
+        # Consolidate all cards
+        all_cards: List[Dict[str, Any]] = []
+
+        # Add main card from authorized_users_data if available
+        if authorized_users_data and authorized_users_data.get("products"):
+            for product in authorized_users_data["products"]:
+                if product.get("id") == str(
+                    main_product_id
+                ):  # Ensure it's the main product
+                    all_cards.append(
+                        {
+                            "id": product["id"],
+                            "holder_first_name": product["holder"]["firstName"],
+                            "holder_last_name": product["holder"]["lastName"],
+                            "is_main": True,
+                            "product_type": product.get("productType"),
+                            # ... other relevant fields
+                        }
+                    )
+                    break  # Only expect one main card here
+
+        # Add related cards from relations_data
+        if relations_data and relations_data.get("items"):
+            for item in relations_data["items"]:
+                # Relations might contain different types of items, filter for
+                # cards if needed. Assuming items here directly represent cards
+                # with similar structure for holder
+                all_cards.append(
+                    {
+                        "id": item["id"],  # Assuming relations also have an ID
+                        "holder_first_name": item["holder"]["firstName"],
+                        "holder_last_name": item["holder"]["lastName"],
+                        "is_main": False,
+                        # ... other relevant fields from relation item
+                    }
+                )
+
+        return all_cards
+
+    async def _async_import_statistics(self, data: Dict[str, CardSnapshot]) -> None:
+        """Append the visits of all cards to the long-term statistics."""
+        for card_id, card in data.items():
+            await self.statistics.async_update(
+                card_id,
+                card.holder_name,
+                self.history.visits(card_id),
+            )
+
+    def _schedule_adaptive(self, data: Dict[str, CardSnapshot]) -> None:
+        """Derive the next polling interval from the visits of all cards."""
+        # Visit timestamps are naive local times
+        now = dt_util.now().replace(tzinfo=None)
+        window_start = now - datetime.timedelta(days=self.history_days)
+        self.scheduler.learn(
+            visit.timestamp
+            for card_id in data
+            for visit in self.history.visits(card_id).visits_between(window_start, now)
+        )
+        self.update_interval = self.scheduler.next_interval(now)
+        _LOGGER.debug("Next MultiSport update in %s", self.update_interval)
+
+    def _staggered_interval(self, now: datetime.datetime) -> datetime.timedelta:
+        """Return the delay to this entry's refresh slot nearest one interval on.
+
+        Slots are aligned to the wall clock and offset by the entry's phase,
+        so entries sharing an interval poll evenly spread instead of in a
+        burst, and stay spread across restarts.
+        """
+        if self.phase is None:
+            return self.poll_interval
+        period = self.poll_interval.total_seconds()
+        target = now.timestamp() + period
+        drift = (target - self.phase * period) % period
+        if drift >= period / 2:
+            drift -= period
+        return datetime.timedelta(seconds=period - drift)
+
+    def _update_fingerprints(
+        self, data: Dict[str, CardSnapshot], now: datetime.datetime
+    ) -> None:
+        """Fingerprint the data of each card, noting which ones changed."""
+        for card_id, card in data.items():
+            fingerprint = payload_digest(card.as_dict())
+            if self._fingerprints.get(card_id) != fingerprint:
+                self._fingerprints[card_id] = fingerprint
+                self._changed_at[card_id] = now
+        for card_id in set(self._fingerprints) - set(data):
+            del self._fingerprints[card_id]
+            del self._changed_at[card_id]
+
+    def _snapshot_to_save(self, data: Dict[str, CardSnapshot]) -> Dict[str, Any]:
+        """Return the data to persist."""
+        return {
+            "updated": cast(datetime.datetime, self._last_updated_time).isoformat(),
+            "topology": self._topology,
+            "topology_updated": (
+                self._topology_updated.isoformat() if self._topology_updated else None
+            ),
+            "changed": {
+                card_id: {
+                    "fingerprint": fingerprint,
+                    "at": self._changed_at[card_id].isoformat(),
+                }
+                for card_id, fingerprint in self._fingerprints.items()
+            },
+            "data": {card_id: card.as_dict() for card_id, card in data.items()},
+        }
+
+    async def _async_fetch_cards(
+        self, all_cards: List[Dict[str, Any]]
+    ) -> Dict[str, CardSnapshot]:
+        """Fetch limits and history for all cards, a bounded number at a time."""
+        semaphore = asyncio.Semaphore(max(1, self.max_concurrent_requests))
+
+        async def _async_fetch_limited(card: Dict[str, Any]) -> CardSnapshot:
+            async with semaphore:
+                return await self._async_fetch_card(card)
+
+        results = await asyncio.gather(
+            *(_async_fetch_limited(card) for card in all_cards),
+            return_exceptions=True,
+        )
+
+        data: Dict[str, CardSnapshot] = {}
+        errors: List[BaseException] = []
+        for card, result in zip(all_cards, results):
+            card_id = card["id"]
+            if not isinstance(result, BaseException):
+                data[card_id] = result  # Store processed card data keyed by card_id
+                continue
+
+            # An expired session affects every card, let the caller handle it
+            if isinstance(result, AuthenticationError):
+                raise result
+            if not isinstance(result, Exception):
+                raise result
+
+            errors.append(result)
+            _LOGGER.warning("Failed to update MultiSport card %s: %s", card_id, result)
+            # Keep the last known data for this card rather than dropping it
+            if self.data and card_id in self.data:
+                data[card_id] = self.data[card_id]
+
+        if errors and len(errors) == len(all_cards):
+            raise errors[0]
+
+        return data
+
+    async def _async_fetch_card(self, card: Dict[str, Any]) -> CardSnapshot:
+        """Fetch limits and history for a single card."""
+        card_id = card["id"]
+        client = cast(MultisportClient, self.client)
+
+        # Fetch limits
+        limits = await client.get_card_limits(card_id)
+
+        # Fetch history of the configured window, only months that can still change
+        today = dt_util.now().date()
+        try:
+            ingest = await self.history.async_sync(
+                card_id, self._async_fetch_history, today, self.history_days
+            )
+        except RequestDeferredError as exc:
+            # The stored visits stand in until the budget allows a sync
+            _LOGGER.debug("History of card %s not synced: %s", card_id, exc)
+            ingest = VisitIngest(self.history.visits(card_id), today)
+        # Right away, the visits are stored and would not be new on a retry
+        self._fire_visit_events(card, ingest)
+
+        # Same responses on the same day, the card would be rebuilt identically
+        digests = (payload_digest(card), payload_digest(limits), today)
+        if (
+            not ingest.new_visits
+            and self._card_digests.get(card_id) == digests
+            and self.data
+            and card_id in self.data
+        ):
+            return self.data[card_id]
+        self._card_digests[card_id] = digests
+
+        return CardSnapshot.build(
+            card,
+            remaining_visits=limits.get("remainingVisits"),
+            latest=ingest.latest,
+            used_today=ingest.used_today,
+            analytics=self.history.aggregates(card_id).summary(today),
+        )
+
+    def _fire_visit_events(self, card: Dict[str, Any], ingest: VisitIngest) -> None:
+        """Fire an event for each visit newer than the last one seen.
+
+        The last seen visit is the latest persisted one, so visits already
+        reported before a restart are not reported again.
+        """
+        time_zone = dt_util.get_default_time_zone()
+        for visit in ingest.visits_since_previous():
+            self.hass.bus.async_fire(
+                EVENT_VISIT,
+                {
+                    "entry_id": self.entry.entry_id,
+                    "card_id": card["id"],
+                    "holder": f"{card['holder_first_name']} {card['holder_last_name']}",
+                    "facility": visit.facility,
+                    "timestamp": visit.timestamp.replace(tzinfo=time_zone).isoformat(),
+                    "registration_method": visit.registration_method,
+                },
+            )
+
+    async def _async_fetch_import(
+        self, card_id: str, date_from: str, date_to: str
+    ) -> List[Dict[str, Any]]:
+        """Fetch a month of a history import, only with budget to spare."""
+        self.api.scheduler.check(PRIORITY_IMPORT, "history import")
+        return await self._async_fetch_history(card_id, date_from, date_to)
+
+    async def _async_fetch_history(
+        self, card_id: str, date_from: str, date_to: str
+    ) -> List[Dict[str, Any]]:
+        """Fetch the history of a card between two ISO dates."""
+        client = cast(MultisportClient, self.client)
+        return await client.get_card_history(
+            card_id, date_from=date_from, date_to=date_to
+        )
@@ -0,0 +1,176 @@
+"""Developer tooling for the MultiSport integration.
+
+Configured through environment variables of the Home Assistant process, so
+none of it shows up in the UI:
+
+MULTISPORT_BASE_URL
+    Send every request to a local stand-in of the MultiSport API, such as
+    tests/fake_server.py, instead of the real service.
+MULTISPORT_RECORD
+    Path of a JSON file every API response is recorded to.
+MULTISPORT_REPLAY
+    Path of a recorded JSON file whose responses are served instead of
+    calling the API; no request leaves Home Assistant.
+"""
+
+from __future__ import annotations
+
+import asyncio
+import hashlib
+import json
+import logging
+import os
+from functools import wraps
+from typing import Any, Awaitable, Callable, Coroutine, Dict, cast
+
+from homeassistant.core import HomeAssistant, callback
+from homeassistant.helpers.json import save_json
+from homeassistant.util.json import load_json
+
+from multisport_py import MultisportClient, MultisportError
+
+from .const import DOMAIN
+
+_LOGGER = logging.getLogger(__name__)
+
+ENV_BASE_URL = "MULTISPORT_BASE_URL"
+ENV_RECORD = "MULTISPORT_RECORD"
+ENV_REPLAY = "MULTISPORT_REPLAY"
+
+DATA_CASSETTE = f"{DOMAIN}_cassette"
+
+# Decoded responses by account, call and arguments
+CassetteResponses = Dict[str, Dict[str, Dict[str, Any]]]
+
+# Client calls whose responses are recorded and replayed
+RECORDED_CALLS = (
+    "get_user_info",
+    "get_authorized_users",
+    "get_relations",
+    "get_card_limits",
+    "get_card_history",
+)
+
+
+class ResponseCassette:
+    """Responses of the client calls, recorded to or replayed from a file.
+
+    Responses are keyed by account, call and arguments. A replayed call
+    whose exact arguments were not recorded, such as a history request
+    made on a later day, gets the last response recorded for the same
+    call and card.
+    """
+
+    def __init__(self, hass: HomeAssistant, path: str, replay: bool) -> None:
+        """Initialize the cassette."""
+        self._hass = hass
+        self._path = path
+        self.replay = replay
+        self._responses: CassetteResponses | None = None
+        self._load_lock = asyncio.Lock()
+        self._save_lock = asyncio.Lock()
+
+    def attach(self, client: MultisportClient, username: str) -> None:
+        """Record or replay the calls of a client."""
+        account = _account_key(username)
+        for name in RECORDED_CALLS:
+            setattr(client, name, self._wrap(account, name, getattr(client, name)))
+        if self.replay:
+            login = _replay_login(client)
+            client.login = login  # type: ignore[method-assign]
+            client._refresh_access_token = login  # type: ignore[method-assign]
+
+    def _wrap(
+        self, account: str, name: str, call: Callable[..., Awaitable[Any]]
+    ) -> Callable[..., Awaitable[Any]]:
+        @wraps(call)
+        async def _call(*args: Any, **kwargs: Any) -> Any:
+            responses = (
+                (await self._async_responses())
+                .setdefault(account, {})
+                .setdefault(name, {})
+            )
+            key = json.dumps([*args, *sorted(kwargs.items())])
+            if self.replay:
+                return _replay(responses, name, key, args)
+
+            result = await call(*args, **kwargs)
+            responses[key] = result
+            await self._async_save()
+            return result
+
+        return _call
+
+    async def _async_responses(self) -> CassetteResponses:
+        """Return the recorded responses, loaded once."""
+        async with self._load_lock:
+            if self._responses is None:
+                loaded = await self._hass.async_add_executor_job(load_json, self._path)
+                self._responses = (
+                    cast(CassetteResponses, loaded) if isinstance(loaded, dict) else {}
+                )
+            return self._responses
+
+    async def _async_save(self) -> None:
+        """Write the recorded responses to the file."""
+        async with self._save_lock:
+            data = json.loads(json.dumps(self._responses))
+            await self._hass.async_add_executor_job(save_json, self._path, data)
+
+
+def _replay_login(
+    client: MultisportClient,
+) -> Callable[[], Coroutine[Any, Any, None]]:
+    """Return a login that only sets the placeholder tokens of a replay."""
+
+    async def _login() -> None:
+        client.access_token = client.refresh_token = "replay"
+
+    return _login
+
+
+def _replay(
+    responses: Dict[str, Any], name: str, key: str, args: tuple[Any, ...]
+) -> Any:
+    """Return the recorded response of a call."""
+    if key in responses:
+        return responses[key]
+    prefix = json.dumps(list(args[:1]))[:-1]
+    for recorded in reversed(list(responses)):
+        if recorded.startswith(prefix):
+            _LOGGER.debug("Replaying %s %s for %s", name, recorded, key)
+            return responses[recorded]
+    raise MultisportError(f"No recorded response of {name} {key}")
+
+
+def _account_key(username: str) -> str:
+    """Return the key of an account in the cassette, without the username."""
+    return hashlib.blake2b(username.encode(), digest_size=8).hexdigest()
+
+
+@callback
+def async_get_cassette(hass: HomeAssistant) -> ResponseCassette | None:
+    """Return the cassette configured for this process, if any."""
+    if DATA_CASSETTE not in hass.data:
+        cassette = None
+        if path := os.environ.get(ENV_REPLAY):
+            _LOGGER.warning("Replaying MultiSport responses from %s", path)
+            cassette = ResponseCassette(hass, path, replay=True)
+        elif path := os.environ.get(ENV_RECORD):
+            _LOGGER.warning("Recording MultiSport responses to %s", path)
+            cassette = ResponseCassette(hass, path, replay=False)
+        hass.data[DATA_CASSETTE] = cassette
+    return cast(ResponseCassette | None, hass.data[DATA_CASSETTE])
+
+
+@callback
+def async_setup_client(
+    hass: HomeAssistant, client: MultisportClient, username: str
+) -> None:
+    """Apply the developer tooling configured for this process to a client."""
+    if base_url := os.environ.get(ENV_BASE_URL):
+        base_url = base_url.rstrip("/")
+        client.AUTH_BASE_URL = f"{base_url}/realms/sso/"
+        client.API_BASE_URL = f"{base_url}/"
+    if (cassette := async_get_cassette(hass)) is not None:
+        cassette.attach(client, username)
@@ -0,0 +1,57 @@
+"""Diagnostics support for the MultiSport integration."""
+
+from __future__ import annotations
+
+from typing import TYPE_CHECKING, Any, Dict
+
+from homeassistant.components.diagnostics import async_redact_data
+from homeassistant.config_entries import ConfigEntry
+from homeassistant.const import CONF_PASSWORD, CONF_USERNAME
+from homeassistant.core import HomeAssistant
+
+from .const import DOMAIN
+
+if TYPE_CHECKING:
+    from .coordinator import MultisportDataUpdateCoordinator
+
+TO_REDACT = {
+    CONF_PASSWORD,
+    CONF_USERNAME,
+    "id",
+    "holder_first_name",
+    "holder_last_name",
+    "title",
+    "unique_id",
+}
+
+
+async def async_get_config_entry_diagnostics(
+    hass: HomeAssistant, entry: ConfigEntry
+) -> Dict[str, Any]:
+    """Return diagnostics for a config entry."""
+    coordinator: MultisportDataUpdateCoordinator = hass.data[DOMAIN][entry.entry_id]
+    last_updated = coordinator.last_updated_time
+    return {
+        "entry": async_redact_data(entry.as_dict(), TO_REDACT),
+        "api": coordinator.api.stats.as_dict(),
+        "circuit_breakers": coordinator.api.breakers.as_dict(),
+        "request_budget": coordinator.api.scheduler.as_dict(),
+        "coordinator": {
+            "last_update_success": coordinator.last_update_success,
+            "last_updated": last_updated.isoformat() if last_updated else None,
+            "data_restored": coordinator.data_restored,
+            "polling_mode": coordinator.polling_mode,
+            "polling_interval": coordinator.polling_interval.total_seconds(),
+            "update_interval": (
+                coordinator.update_interval.total_seconds()
+                if coordinator.update_interval
+                else None
+            ),
+            "phase": coordinator.phase,
+            # Card ids identify the holder, cards are listed in order instead
+            "cards": [
+                async_redact_data(card.as_dict(), TO_REDACT)
+                for card in (coordinator.data or {}).values()
+            ],
+        },
+    }
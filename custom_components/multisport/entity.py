@@ -0,0 +1,137 @@
+"""Base entity for the MultiSport integration."""
+
+from __future__ import annotations
+
+from typing import Callable, Hashable, Iterable
+
+from homeassistant.config_entries import ConfigEntry
+from homeassistant.core import callback
+from homeassistant.helpers.device_registry import DeviceEntryType
+from homeassistant.helpers.entity import DeviceInfo, Entity
+from homeassistant.helpers.entity_platform import AddEntitiesCallback
+from homeassistant.helpers.update_coordinator import CoordinatorEntity
+
+from .const import DOMAIN
+from .coordinator import MultisportDataUpdateCoordinator
+from .model import CardSnapshot
+
+
+def card_device_info(card: CardSnapshot) -> DeviceInfo:
+    """Return the device of a card."""
+    return DeviceInfo(
+        identifiers={(DOMAIN, card.card_id)},
+        name=f"MultiSport {card.holder_name}",
+        manufacturer="MultiSport",
+        model="Card",
+        configuration_url="https://app.kartamultisport.pl/",
+        suggested_area="Gym",
+    )
+
+
+@callback
+def async_add_card_entities(
+    coordinator: MultisportDataUpdateCoordinator,
+    entry: ConfigEntry,
+    async_add_entities: AddEntitiesCallback,
+    create_entities: Callable[[CardSnapshot, DeviceInfo], Iterable[Entity]],
+) -> None:
+    """Add the entities of each card now and whenever a new card shows up.
+
+    Cards that vanish are forgotten, their devices are removed with their
+    entities by the integration, so a card coming back is added again.
+    """
+    added: set[str] = set()
+
+    @callback
+    def _async_add_new_cards() -> None:
+        cards = coordinator.data or {}
+        added.intersection_update(cards)
+        entities: list[Entity] = []
+        for card_id, card in cards.items():
+            if card_id not in added:
+                added.add(card_id)
+                entities.extend(create_entities(card, card_device_info(card)))
+        if entities:
+            async_add_entities(entities)
+
+    _async_add_new_cards()
+    entry.async_on_unload(coordinator.async_add_listener(_async_add_new_cards))
+
+
+class MultisportCardEntity(CoordinatorEntity[MultisportDataUpdateCoordinator]):
+    """Base class for entities of a single MultiSport card.
+
+    State is only written when the card's processed data (or the entity's
+    availability) changed since the last write, so polls that bring
+    nothing new cost no state machine or recorder work.
+    """
+
+    def __init__(
+        self,
+        coordinator: MultisportDataUpdateCoordinator,
+        card_id: str,
+        device_info: DeviceInfo,
+        card_holder_name: str,
+    ) -> None:
+        """Initialize the entity."""
+        super().__init__(coordinator)
+        self._card_id = card_id
+        self._device_info = device_info
+        self._card_holder_name = card_holder_name
+        self._attr_has_entity_name = True
+        self._written_fingerprint: Hashable = None
+
+    @property
+    def device_info(self) -> DeviceInfo:
+        """Return the device info."""
+        return self._device_info
+
+    @property
+    def card(self) -> CardSnapshot | None:
+        """Return the current snapshot of the card."""
+        return self.coordinator.data.get(self._card_id)
+
+    @property
+    def available(self) -> bool:
+        """Return True if entity is available."""
+        # Restored data stays available until the first live refresh succeeds
+        return (
+            self.coordinator.last_update_success or self.coordinator.data_restored
+        ) and self._card_id in self.coordinator.data
+
+    def _state_fingerprint(self) -> Hashable:
+        """Return what the written state depends on."""
+        return (self.available, self.coordinator.card_fingerprint(self._card_id))
+
+    async def async_added_to_hass(self) -> None:
+        """Remember the fingerprint of the state written when added."""
+        await super().async_added_to_hass()
+        self._written_fingerprint = self._state_fingerprint()
+
+    @callback
+    def _handle_coordinator_update(self) -> None:
+        """Write the state only if it may have changed."""
+        fingerprint = self._state_fingerprint()
+        if fingerprint == self._written_fingerprint:
+            return
+        self._written_fingerprint = fingerprint
+        self.async_write_ha_state()
+
+
+class MultisportAccountEntity(CoordinatorEntity[MultisportDataUpdateCoordinator]):
+    """Base class for entities describing a MultiSport account connection."""
+
+    _attr_has_entity_name = True
+
+    def __init__(self, coordinator: MultisportDataUpdateCoordinator, key: str) -> None:
+        """Initialize the entity."""
+        super().__init__(coordinator)
+        entry = coordinator.entry
+        self._attr_unique_id = f"{entry.entry_id}_{key}"
+        self._attr_device_info = DeviceInfo(
+            identifiers={(DOMAIN, entry.entry_id)},
+            name=f"MultiSport {entry.title}",
+            manufacturer="MultiSport",
+            model="Account",
+            entry_type=DeviceEntryType.SERVICE,
+        )
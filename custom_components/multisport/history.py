@@ -0,0 +1,306 @@
+"""Incremental visit history sync for the MultiSport integration."""
+
+from __future__ import annotations
+
+import asyncio
+import datetime
+import logging
+from typing import Any, Awaitable, Callable, Dict, List
+
+from homeassistant.core import HomeAssistant
+from homeassistant.helpers.storage import Store
+
+from .api import payload_digest
+from .const import DOMAIN
+from .visits import VisitAggregates, VisitIngest, VisitStore, parse_visit
+
+_LOGGER = logging.getLogger(__name__)
+
+STORAGE_VERSION = 2
+SAVE_DELAY = 10  # seconds
+
+# Months of a history import fetched at a time, below the polling concurrency
+# so an import leaves room for routine refreshes
+BACKFILL_MAX_CONCURRENCY = 2
+
+HistoryFetcher = Callable[[str, str, str], Awaitable[List[Dict[str, Any]]]]
+
+
+def month_key(day: datetime.date) -> str:
+    """Return the shard key ("YYYY-MM") of the month containing a date."""
+    return f"{day.year:04d}-{day.month:02d}"
+
+
+def month_bounds(key: str) -> tuple[datetime.date, datetime.date]:
+    """Return the first and last day of the month identified by a shard key."""
+    year, month = int(key[:4]), int(key[5:7])
+    first = datetime.date(year, month, 1)
+    if month == 12:
+        last = datetime.date(year, 12, 31)
+    else:
+        last = datetime.date(year, month + 1, 1) - datetime.timedelta(days=1)
+    return first, last
+
+
+def iter_month_keys(start: datetime.date, end: datetime.date) -> List[str]:
+    """Return the shard keys of all months between two dates, inclusive."""
+    keys = []
+    year, month = start.year, start.month
+    while (year, month) <= (end.year, end.month):
+        keys.append(f"{year:04d}-{month:02d}")
+        year, month = (year + 1, 1) if month == 12 else (year, month + 1)
+    return keys
+
+
+class _HistoryStore(Store[Dict[str, Any]]):
+    """Store of the synced history, migrating older storage formats."""
+
+    async def _async_migrate_func(
+        self, old_major_version: int, old_minor_version: int, old_data: Dict[str, Any]
+    ) -> Dict[str, Any]:
+        """Migrate raw monthly visit shards into compact visit stores."""
+        cards = {}
+        for card_id, months in old_data.get("cards", {}).items():
+            visits = VisitStore()
+            for shard in months.values():
+                for raw_visit in shard["visits"]:
+                    if (visit := parse_visit(raw_visit)) is not None:
+                        visits.add(visit)
+            cards[card_id] = {
+                "complete": [key for key, shard in months.items() if shard["complete"]],
+                "visits": visits.as_dict(),
+            }
+        return {"cards": cards}
+
+
+class HistorySync:
+    """Fetch card history month by month, re-fetching only what can change.
+
+    Closed months are fetched once and persisted, so only the current month
+    (starting from its last known visit) costs a request on a routine poll,
+    however long the configured history window is. Fetched visits are kept
+    in a compact VisitStore per card, next to running aggregates updated
+    with the newly ingested visits only.
+    """
+
+    def __init__(self, hass: HomeAssistant, entry_id: str) -> None:
+        """Initialize the history sync."""
+        self._store = _HistoryStore(
+            hass, STORAGE_VERSION, f"{DOMAIN}.{entry_id}.history"
+        )
+        self._visits: Dict[str, VisitStore] = {}
+        self._aggregates: Dict[str, VisitAggregates] = {}
+        # A month is complete once it has been fetched after it closed,
+        # from then on it is immutable and never fetched again.
+        self._complete: Dict[str, set[str]] = {}
+        # Digest of the last current month response, per card
+        self._digests: Dict[str, str] = {}
+        # Date ranges requested by history imports. Their progress is the set
+        # of complete months, so an interrupted import resumes from there.
+        self._backfills: Dict[str, tuple[datetime.date, datetime.date]] = {}
+        self._load_lock = asyncio.Lock()
+        self._loaded = False
+
+    async def async_load(self) -> None:
+        """Load persisted visits, once."""
+        async with self._load_lock:
+            if self._loaded:
+                return
+            stored = await self._store.async_load() or {}
+            for card_id, card in stored.get("cards", {}).items():
+                visits = self._visits[card_id] = VisitStore.from_dict(card["visits"])
+                self._complete[card_id] = set(card["complete"])
+                self._aggregates[card_id] = (
+                    VisitAggregates.from_dict(card["aggregates"])
+                    if "aggregates" in card
+                    else VisitAggregates.from_store(visits)
+                )
+            for card_id, (start, end) in stored.get("backfills", {}).items():
+                self._backfills[card_id] = (
+                    datetime.date.fromisoformat(start),
+                    datetime.date.fromisoformat(end),
+                )
+            self._loaded = True
+
+    def visits(self, card_id: str) -> VisitStore:
+        """Return the visits of a card."""
+        if (visits := self._visits.get(card_id)) is None:
+            visits = self._visits[card_id] = VisitStore()
+        return visits
+
+    def aggregates(self, card_id: str) -> VisitAggregates:
+        """Return the running aggregates over the visits of a card."""
+        if (aggregates := self._aggregates.get(card_id)) is None:
+            aggregates = self._aggregates[card_id] = VisitAggregates()
+        return aggregates
+
+    async def async_sync(
+        self,
+        card_id: str,
+        fetch: HistoryFetcher,
+        today: datetime.date,
+        window_days: int,
+    ) -> VisitIngest:
+        """Bring a card's history up to date and return what was ingested."""
+        await self.async_load()
+
+        visits = self.visits(card_id)
+        ingest = VisitIngest(visits, today)
+        complete = self._complete.setdefault(card_id, set())
+        current_month = month_key(today)
+        completed = len(complete)
+
+        try:
+            for key in iter_month_keys(
+                today - datetime.timedelta(days=window_days), today
+            ):
+                if key in complete:
+                    continue
+
+                first, last = month_bounds(key)
+                if key == current_month:
+                    latest = visits.latest()
+                    if latest is not None and latest.timestamp.date() >= first:
+                        first = latest.timestamp.date()
+                    last = today
+
+                _LOGGER.debug(
+                    "Fetching history of card %s from %s to %s", card_id, first, last
+                )
+                payload = (
+                    await fetch(card_id, first.isoformat(), last.isoformat()) or []
+                )
+                if key != current_month:
+                    ingest.feed(payload)
+                    complete.add(key)
+                    continue
+
+                # An identical response holds no visit that is not stored yet
+                digest = payload_digest(payload)
+                if self._digests.get(card_id) != digest:
+                    ingest.feed(payload)
+                    self._digests[card_id] = digest
+        finally:
+            # Visits fed before a failed fetch are stored, count them as well
+            self.aggregates(card_id).add(ingest.new_visits)
+            if ingest.new_visits or len(complete) != completed:
+                self._async_schedule_save()
+
+        return ingest
+
+    def async_queue_backfill(
+        self, card_id: str, start: datetime.date, end: datetime.date
+    ) -> None:
+        """Request the history of a card between two dates, widening earlier ones."""
+        if (queued := self._backfills.get(card_id)) is not None:
+            start, end = min(start, queued[0]), max(end, queued[1])
+        self._backfills[card_id] = (start, end)
+        self._async_schedule_save()
+
+    def _backfill_months(self, card_id: str, today: datetime.date) -> List[str]:
+        """Return the closed months of the range requested for a card."""
+        start, end = self._backfills[card_id]
+        # The current month is left to the routine sync
+        current_month = month_key(today)
+        return [key for key in iter_month_keys(start, end) if key < current_month]
+
+    def pending_backfills(self, today: datetime.date) -> Dict[str, List[str]]:
+        """Return the months still to be imported, per card."""
+        pending = {}
+        for card_id in self._backfills:
+            complete = self._complete.get(card_id, set())
+            if keys := [
+                key
+                for key in self._backfill_months(card_id, today)
+                if key not in complete
+            ]:
+                pending[card_id] = keys
+        return pending
+
+    def backfill_progress(self, today: datetime.date) -> tuple[int, int]:
+        """Return the number of requested months imported, and requested."""
+        done = total = 0
+        for card_id in self._backfills:
+            keys = self._backfill_months(card_id, today)
+            total += len(keys)
+            done += len(self._complete.get(card_id, set()).intersection(keys))
+        return done, total
+
+    async def async_backfill(
+        self,
+        card_id: str,
+        keys: List[str],
+        fetch: HistoryFetcher,
+        today: datetime.date,
+        on_progress: Callable[[], None],
+    ) -> None:
+        """Import closed months of a card's history, a few at a time.
+
+        Every month is checkpointed as complete once stored, so a failed or
+        interrupted import only repeats the months that were in flight.
+        """
+        await self.async_load()
+
+        visits = self.visits(card_id)
+        aggregates = self.aggregates(card_id)
+        complete = self._complete.setdefault(card_id, set())
+        semaphore = asyncio.Semaphore(BACKFILL_MAX_CONCURRENCY)
+
+        async def _async_import_month(key: str) -> None:
+            first, last = month_bounds(key)
+            async with semaphore:
+                _LOGGER.debug("Importing history of card %s for %s", card_id, key)
+                payload = (
+                    await fetch(card_id, first.isoformat(), last.isoformat()) or []
+                )
+            ingest = VisitIngest(visits, today)
+            ingest.feed(payload)
+            aggregates.add(ingest.new_visits)
+            complete.add(key)
+            self._async_schedule_save()
+            on_progress()
+
+        results = await asyncio.gather(
+            *(_async_import_month(key) for key in keys if key not in complete),
+            return_exceptions=True,
+        )
+        for result in results:
+            if isinstance(result, BaseException):
+                raise result
+
+    def async_retain(self, card_ids: set[str]) -> None:
+        """Drop the visits of cards that no longer exist."""
+        for card_id in set(self._visits) - card_ids:
+            del self._visits[card_id]
+            self._aggregates.pop(card_id, None)
+            self._complete.pop(card_id, None)
+            self._digests.pop(card_id, None)
+            self._async_schedule_save()
+        for card_id in set(self._backfills) - card_ids:
+            del self._backfills[card_id]
+            self._async_schedule_save()
+
+    async def async_remove(self) -> None:
+        """Remove the persisted visits."""
+        await self._store.async_remove()
+
+    def _async_schedule_save(self) -> None:
+        """Persist visits after a short delay, coalescing concurrent syncs."""
+        self._store.async_delay_save(self._data_to_save, SAVE_DELAY)
+
+    def _data_to_save(self) -> Dict[str, Any]:
+        """Return the visits in their storage format."""
+        return {
+            "cards": {
+                card_id: {
+                    "complete": sorted(self._complete.get(card_id, ())),
+                    "visits": visits.as_dict(),
+                    "aggregates": self.aggregates(card_id).as_dict(),
+                }
+                for card_id, visits in self._visits.items()
+            },
+            "backfills": {
+                card_id: [start.isoformat(), end.isoformat()]
+                for card_id, (start, end) in self._backfills.items()
+            },
+        }
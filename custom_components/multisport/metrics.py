@@ -0,0 +1,141 @@
+"""Request instrumentation for the MultiSport integration."""
+
+from __future__ import annotations
+
+import json
+import time
+from functools import wraps
+from typing import Any, Awaitable, Callable, Dict, List, TypeVar
+
+# Upper bounds of the latency histogram buckets, in milliseconds
+LATENCY_BUCKETS_MS = (50, 100, 250, 500, 1000, 2500, 5000, 10000)
+
+# Client methods whose calls are measured
+INSTRUMENTED_CALLS = (
+    "login",
+    "get_user_info",
+    "get_authorized_users",
+    "get_relations",
+    "get_card_limits",
+    "get_card_history",
+)
+
+_T = TypeVar("_T")
+
+
+class EndpointStats:
+    """Call count, errors, latency histogram and volume of one client call."""
+
+    __slots__ = ("buckets", "bytes", "calls", "errors", "max_ms", "total_ms")
+
+    def __init__(self) -> None:
+        """Initialize empty figures."""
+        self.calls = 0
+        self.errors = 0
+        self.total_ms = 0.0
+        self.max_ms = 0.0
+        self.bytes = 0
+        self.buckets: List[int] = [0] * (len(LATENCY_BUCKETS_MS) + 1)
+
+    def record(self, elapsed_ms: float, size: int, error: bool) -> None:
+        """Record one call."""
+        self.calls += 1
+        self.errors += error
+        self.total_ms += elapsed_ms
+        self.max_ms = max(self.max_ms, elapsed_ms)
+        self.bytes += size
+        for index, bound in enumerate(LATENCY_BUCKETS_MS):
+            if elapsed_ms <= bound:
+                break
+        else:
+            index = len(LATENCY_BUCKETS_MS)
+        self.buckets[index] += 1
+
+    def as_dict(self) -> Dict[str, Any]:
+        """Return the figures for diagnostics."""
+        return {
+            "calls": self.calls,
+            "errors": self.errors,
+            "mean_ms": round(self.total_ms / self.calls, 1) if self.calls else None,
+            "max_ms": round(self.max_ms, 1),
+            "bytes_received": self.bytes,
+            "latency_ms": {
+                **{
+                    f"le_{bound}": count
+                    for bound, count in zip(LATENCY_BUCKETS_MS, self.buckets)
+                },
+                "le_inf": self.buckets[-1],
+            },
+        }
+
+
+class ApiStats:
+    """Figures of the client calls and refreshes of one config entry."""
+
+    def __init__(self) -> None:
+        """Initialize empty figures."""
+        self.endpoints: Dict[str, EndpointStats] = {}
+        self.refreshes = 0
+        self.last_refresh_ms: float | None = None
+        self.max_refresh_ms = 0.0
+
+    @property
+    def calls(self) -> int:
+        """Return the number of client calls."""
+        return sum(endpoint.calls for endpoint in self.endpoints.values())
+
+    @property
+    def errors(self) -> int:
+        """Return the number of failed client calls."""
+        return sum(endpoint.errors for endpoint in self.endpoints.values())
+
+    def record_refresh(self, elapsed_ms: float) -> None:
+        """Record the duration of a coordinator refresh."""
+        self.refreshes += 1
+        self.last_refresh_ms = elapsed_ms
+        self.max_refresh_ms = max(self.max_refresh_ms, elapsed_ms)
+
+    def instrument(
+        self, name: str, call: Callable[..., Awaitable[_T]]
+    ) -> Callable[..., Awaitable[_T]]:
+        """Wrap a client call so every invocation is recorded under a name."""
+        endpoint = self.endpoints.setdefault(name, EndpointStats())
+
+        @wraps(call)
+        async def _instrumented(*args: Any, **kwargs: Any) -> _T:
+            started = time.perf_counter()
+            try:
+                result = await call(*args, **kwargs)
+            except Exception:
+                endpoint.record((time.perf_counter() - started) * 1000, 0, True)
+                raise
+            endpoint.record(
+                (time.perf_counter() - started) * 1000, _payload_size(result), False
+            )
+            return result
+
+        return _instrumented
+
+    def as_dict(self) -> Dict[str, Any]:
+        """Return all figures for diagnostics."""
+        return {
+            "refreshes": self.refreshes,
+            "last_refresh_ms": (
+                round(self.last_refresh_ms, 1)
+                if self.last_refresh_ms is not None
+                else None
+            ),
+            "max_refresh_ms": round(self.max_refresh_ms, 1),
+            "endpoints": {
+                name: endpoint.as_dict() for name, endpoint in self.endpoints.items()
+            },
+        }
+
+
+def _payload_size(payload: Any) -> int:
+    """Return the size of a decoded response, as compact JSON."""
+    # The client only hands out decoded bodies, re-encoding approximates
+    # the bytes received
+    if payload is None:
+        return 0
+    return len(json.dumps(payload, separators=(",", ":"), default=str))
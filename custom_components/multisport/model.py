@@ -0,0 +1,146 @@
+"""Per-card data model of the MultiSport integration."""
+
+from __future__ import annotations
+
+from dataclasses import dataclass, field, replace
+from typing import Any, Dict, Mapping
+
+from .visits import Visit
+
+_NO_ATTRIBUTES: Mapping[str, Any] = {}
+
+
+@dataclass(frozen=True, slots=True)
+class CardSnapshot:
+    """Immutable state of one card as of a refresh.
+
+    Built once per refresh, with the display strings and attribute dicts
+    entities report already computed, so reading a state allocates nothing.
+    The dict form is the persisted snapshot format.
+    """
+
+    card_id: str
+    holder_first_name: str
+    holder_last_name: str
+    is_main: bool = False
+    product_type: str | None = None
+    remaining_visits: int | None = None
+    used_today: bool | None = None
+    # The last visit as stored by the API ("DD-MM-YYYY", "HH:MM")
+    last_visit: Mapping[str, Any] | None = None
+    analytics: Mapping[str, Any] = field(default_factory=dict)
+    # Precomputed from the fields above
+    holder_name: str = field(init=False)
+    last_visit_state: str | None = field(init=False)
+    last_visit_attributes: Mapping[str, Any] = field(init=False)
+    favorite_facility_attributes: Mapping[str, Any] = field(init=False)
+
+    def __post_init__(self) -> None:
+        """Compute the display values."""
+        assign = object.__setattr__
+        assign(self, "holder_name", f"{self.holder_first_name} {self.holder_last_name}")
+
+        state = None
+        attributes = _NO_ATTRIBUTES
+        if last_visit := self.last_visit:
+            facility = last_visit.get("facilityName")
+            date = last_visit.get("date")
+            time = last_visit.get("time")
+            attributes = {
+                "date": date,
+                "time": time,
+                "registration_method": last_visit.get("registrationMethod"),
+                "place": facility,
+            }
+            if isinstance(facility, str):
+                state = facility
+                if isinstance(date, str) and isinstance(time, str):
+                    state = f"{facility} {date} {time}"
+        assign(self, "last_visit_state", state)
+        assign(self, "last_visit_attributes", attributes)
+        assign(
+            self,
+            "favorite_facility_attributes",
+            {"visits": self.analytics.get("favorite_facility_visits", 0)},
+        )
+
+    @classmethod
+    def build(
+        cls,
+        card: Mapping[str, Any],
+        remaining_visits: int | None,
+        latest: Visit | None,
+        used_today: bool,
+        analytics: Mapping[str, Any],
+    ) -> CardSnapshot:
+        """Build the snapshot of a card of the account topology."""
+        return cls(
+            card_id=card["id"],
+            holder_first_name=card["holder_first_name"],
+            holder_last_name=card["holder_last_name"],
+            is_main=card.get("is_main", False),
+            product_type=card.get("product_type"),
+            remaining_visits=remaining_visits,
+            used_today=used_today,
+            last_visit=_last_visit(latest),
+            analytics=analytics,
+        )
+
+    def with_visits(
+        self,
+        latest: Visit | None,
+        used_today: bool,
+        analytics: Mapping[str, Any],
+    ) -> CardSnapshot:
+        """Return the snapshot with the values derived from the visits replaced."""
+        return replace(
+            self,
+            last_visit=_last_visit(latest),
+            used_today=used_today,
+            analytics=analytics,
+        )
+
+    def analytic(self, key: str) -> Any:
+        """Return one of the visit analytics, None before they are known."""
+        return self.analytics.get(key)
+
+    def as_dict(self) -> Dict[str, Any]:
+        """Return the snapshot in its persisted format."""
+        return {
+            "id": self.card_id,
+            "holder_first_name": self.holder_first_name,
+            "holder_last_name": self.holder_last_name,
+            "is_main": self.is_main,
+            "product_type": self.product_type,
+            "remaining_visits": self.remaining_visits,
+            "last_visit": dict(self.last_visit) if self.last_visit else None,
+            "used_today": self.used_today,
+            "analytics": dict(self.analytics),
+        }
+
+    @classmethod
+    def from_dict(cls, data: Mapping[str, Any]) -> CardSnapshot:
+        """Restore a snapshot from its persisted format."""
+        return cls(
+            card_id=data["id"],
+            holder_first_name=data["holder_first_name"],
+            holder_last_name=data["holder_last_name"],
+            is_main=data.get("is_main", False),
+            product_type=data.get("product_type"),
+            remaining_visits=data.get("remaining_visits"),
+            used_today=data.get("used_today"),
+            last_visit=data.get("last_visit"),
+            analytics=data.get("analytics") or {},
+        )
+
+
+def _last_visit(latest: Visit | None) -> Dict[str, Any] | None:
+    """Return the last visit of a card in the format of the API."""
+    if latest is None:
+        return None
+    return {
+        "date": latest.timestamp.strftime("%d-%m-%Y"),
+        "time": latest.timestamp.strftime("%H:%M"),
+        "facilityName": latest.facility,
+        "registrationMethod": latest.registration_method,
+    }
@@ -0,0 +1,190 @@
+"""On-demand profiling of MultiSport refreshes.
+
+Only imported when the profile_refresh service is called.
+"""
+
+from __future__ import annotations
+
+import asyncio
+import cProfile
+import io
+import logging
+import pstats
+import time
+from contextlib import contextmanager
+from typing import TYPE_CHECKING, Any, Callable, Dict, Iterator, List
+
+from homeassistant.components import persistent_notification
+from homeassistant.core import HomeAssistant
+from homeassistant.util import dt as dt_util
+
+from .const import DOMAIN
+from .metrics import ApiStats
+
+if TYPE_CHECKING:
+    from .coordinator import MultisportDataUpdateCoordinator
+    from .model import CardSnapshot
+
+_LOGGER = logging.getLogger(__name__)
+
+# Functions listed in the report, by cumulative time
+REPORT_FUNCTIONS = 60
+
+# What the self time of a profiled function is spent on, by its source file
+_KINDS: Dict[str, Callable[[str, str], bool]] = {
+    "JSON decoding": lambda path, function: "/json/" in path or "json" in function,
+    "visit parsing": lambda path, function: path.endswith(
+        ("multisport/visits.py", "multisport/history.py")
+    ),
+    "entity writes": lambda path, function: path.endswith(
+        (
+            "helpers/entity.py",
+            "multisport/entity.py",
+            "multisport/sensor.py",
+            "multisport/binary_sensor.py",
+            "multisport/calendar.py",
+        )
+    )
+    or function == "async_set_internal",
+}
+
+# cProfile allows one active profiler per thread, refreshes are profiled in turn
+_PROFILE_LOCK = asyncio.Lock()
+
+
+async def async_profile_refresh(
+    hass: HomeAssistant, coordinator: MultisportDataUpdateCoordinator, dump: bool
+) -> None:
+    """Profile one full refresh of an account, entity updates included.
+
+    The sorted report, and with dump the raw pstats file, are written to
+    the configuration directory and summarized in a notification.
+    """
+    entry = coordinator.entry
+    stats = coordinator.api.stats
+    async with _PROFILE_LOCK:
+        calls, api_ms = _api_totals(stats)
+        timings = _RefreshTimings()
+        profiler = cProfile.Profile()
+        started_cpu = time.thread_time()
+        started = time.perf_counter()
+        profiler.enable()
+        try:
+            with timings.attach(coordinator):
+                await coordinator.async_refresh()
+        finally:
+            profiler.disable()
+        wall_ms = (time.perf_counter() - started) * 1000
+        loop_cpu_ms = (time.thread_time() - started_cpu) * 1000
+
+    end_calls, end_api_ms = _api_totals(stats)
+    update_ms = stats.last_refresh_ms or 0.0
+    cards = timings.card_ms
+    summary = [
+        (
+            f"Refresh: {wall_ms:.0f} ms, of which data update {update_ms:.0f} ms "
+            f"and entity updates {timings.listeners_ms:.0f} ms"
+        ),
+        (
+            f"Card fetches: {len(cards)} concurrent tasks, slowest "
+            f"{max(cards, default=0.0):.0f} ms, together {sum(cards):.0f} ms"
+        ),
+        (
+            f"Event loop busy: {loop_cpu_ms:.0f} ms, so an estimated "
+            f"{max(0.0, wall_ms - loop_cpu_ms):.0f} ms waiting on the network "
+            "and other tasks"
+        ),
+        f"API calls: {end_calls - calls} taking {end_api_ms - api_ms:.0f} ms",
+    ]
+
+    name = f"{DOMAIN}_profile_{entry.entry_id}_{dt_util.utcnow():%Y%m%d%H%M%S}"
+    report_path = hass.config.path(f"{name}.txt")
+    dump_path = hass.config.path(f"{name}.pstats") if dump else None
+    summary.append(
+        await hass.async_add_executor_job(
+            _write_report, profiler, summary, report_path, dump_path
+        )
+    )
+    _LOGGER.info("MultiSport refresh profile written to %s", report_path)
+
+    persistent_notification.async_create(
+        hass,
+        "\n".join([*(f"- {line}" for line in summary), "", f"Report: `{report_path}`"]),
+        title=f"MultiSport refresh profile of {entry.title}",
+        notification_id=f"{DOMAIN}_profile_{entry.entry_id}",
+    )
+
+
+class _RefreshTimings:
+    """Wall time of the card fetch tasks and of the listener fan-out."""
+
+    def __init__(self) -> None:
+        """Initialize empty timings."""
+        self.card_ms: List[float] = []
+        self.listeners_ms = 0.0
+
+    @contextmanager
+    def attach(self, coordinator: MultisportDataUpdateCoordinator) -> Iterator[None]:
+        """Time the card fetches and entity updates of a coordinator meanwhile."""
+        fetch_card = coordinator._async_fetch_card
+        update_listeners = coordinator.async_update_listeners
+
+        async def _async_fetch_card(card: Dict[str, Any]) -> CardSnapshot:
+            started = time.perf_counter()
+            try:
+                return await fetch_card(card)
+            finally:
+                self.card_ms.append((time.perf_counter() - started) * 1000)
+
+        def _update_listeners() -> None:
+            started = time.perf_counter()
+            try:
+                update_listeners()
+            finally:
+                self.listeners_ms += (time.perf_counter() - started) * 1000
+
+        coordinator._async_fetch_card = _async_fetch_card  # type: ignore[method-assign]
+        coordinator.async_update_listeners = _update_listeners  # type: ignore[method-assign]
+        try:
+            yield
+        finally:
+            # Back to the methods of the class
+            del coordinator._async_fetch_card
+            del coordinator.async_update_listeners
+
+
+def _api_totals(stats: ApiStats) -> tuple[int, float]:
+    """Return the number and total time of the client calls so far."""
+    return stats.calls, sum(endpoint.total_ms for endpoint in stats.endpoints.values())
+
+
+def _write_report(
+    profiler: cProfile.Profile,
+    summary: List[str],
+    report_path: str,
+    dump_path: str | None,
+) -> str:
+    """Write the profile report, returning the line of self time by kind."""
+    stream = io.StringIO()
+    profile = pstats.Stats(profiler, stream=stream)
+
+    kinds = dict.fromkeys(_KINDS, 0.0)
+    entries = profile.stats  # type: ignore[attr-defined]
+    for (path, _, function), (_, _, self_time, _, _) in entries.items():
+        for kind, matches in _KINDS.items():
+            if matches(path, function):
+                kinds[kind] += self_time * 1000
+                break
+    by_kind = "Self time: " + ", ".join(
+        f"{kind} {elapsed:.1f} ms" for kind, elapsed in kinds.items()
+    )
+
+    profile.sort_stats(pstats.SortKey.CUMULATIVE).print_stats(REPORT_FUNCTIONS)
+    with open(report_path, "w", encoding="utf-8") as report:
+        report.write("\n".join([*summary, by_kind, ""]))
+        # Everything the event loop ran meanwhile is included, not only
+        # the refresh
+        report.write(stream.getvalue())
+    if dump_path is not None:
+        profile.dump_stats(dump_path)
+    return by_kind
@@ -0,0 +1,175 @@
+"""Retries and circuit breakers around the MultiSport client calls."""
+
+from __future__ import annotations
+
+import asyncio
+import logging
+import random
+import time
+from functools import wraps
+from typing import Any, Awaitable, Callable, Dict, TypeVar
+
+import httpx
+
+from multisport_py import AuthenticationError, MultisportError
+
+from .budget import RequestDeferredError
+
+_LOGGER = logging.getLogger(__name__)
+
+# Client calls that are retried and guarded by a circuit breaker. The login
+# already retries its own steps.
+RESILIENT_CALLS = (
+    "get_user_info",
+    "get_authorized_users",
+    "get_relations",
+    "get_card_limits",
+    "get_card_history",
+)
+
+RETRY_ATTEMPTS = 3
+RETRY_BASE_DELAY = 1.0  # seconds
+RETRY_MAX_DELAY = 10.0  # seconds
+
+# Consecutive failed calls that open a breaker, and how long it stays open
+# before a single probe call is let through
+BREAKER_FAILURE_THRESHOLD = 5
+BREAKER_RECOVERY_TIME = 300.0  # seconds
+
+STATE_CLOSED = "closed"
+STATE_OPEN = "open"
+STATE_HALF_OPEN = "half_open"
+
+_T = TypeVar("_T")
+
+
+class EndpointUnavailableError(MultisportError):
+    """Raised instead of calling an endpoint whose circuit breaker is open."""
+
+
+def is_transient(exc: BaseException) -> bool:
+    """Return True if a failed call may succeed when repeated."""
+    if isinstance(exc, AuthenticationError | EndpointUnavailableError):
+        return False
+    if isinstance(exc, httpx.HTTPStatusError):
+        status = exc.response.status_code
+        return status == 429 or status >= 500
+    # Network errors, raw or wrapped by the client
+    return isinstance(exc, httpx.TransportError | MultisportError)
+
+
+def backoff_delay(attempt: int) -> float:
+    """Return the delay before a retry, exponential with full jitter."""
+    return random.uniform(0, min(RETRY_MAX_DELAY, RETRY_BASE_DELAY * 2**attempt))
+
+
+class CircuitBreaker:
+    """Stop calling an endpoint that keeps failing, probing it periodically."""
+
+    __slots__ = ("_probing", "failures", "opened_at")
+
+    def __init__(self) -> None:
+        """Initialize a closed breaker."""
+        self.failures = 0
+        self.opened_at: float | None = None
+        self._probing = False
+
+    @property
+    def state(self) -> str:
+        """Return the state of the breaker."""
+        if self.opened_at is None:
+            return STATE_CLOSED
+        if time.monotonic() - self.opened_at >= BREAKER_RECOVERY_TIME:
+            return STATE_HALF_OPEN
+        return STATE_OPEN
+
+    def allow(self) -> bool:
+        """Return True if a call may go out, claiming the probe if half open."""
+        state = self.state
+        if state == STATE_CLOSED:
+            return True
+        if state == STATE_HALF_OPEN and not self._probing:
+            self._probing = True
+            return True
+        return False
+
+    def release_probe(self) -> None:
+        """Give up the probe of a half open breaker without an outcome."""
+        self._probing = False
+
+    def record_success(self) -> None:
+        """Close the breaker."""
+        self.failures = 0
+        self.opened_at = None
+        self._probing = False
+
+    def record_failure(self) -> None:
+        """Count a failed call, opening the breaker at the threshold."""
+        self.failures += 1
+        self._probing = False
+        if self.opened_at is not None or self.failures >= BREAKER_FAILURE_THRESHOLD:
+            # A failed probe keeps the breaker open for another period
+            self.opened_at = time.monotonic()
+
+    def as_dict(self) -> Dict[str, Any]:
+        """Return the breaker for diagnostics."""
+        return {"state": self.state, "failures": self.failures}
+
+
+class CircuitBreakers:
+    """Circuit breakers of the client calls, one per endpoint."""
+
+    def __init__(self) -> None:
+        """Initialize the breakers, all closed."""
+        self.breakers: Dict[str, CircuitBreaker] = {}
+
+    @property
+    def state(self) -> str:
+        """Return the state of the worst breaker."""
+        states = {breaker.state for breaker in self.breakers.values()}
+        for state in (STATE_OPEN, STATE_HALF_OPEN):
+            if state in states:
+                return state
+        return STATE_CLOSED
+
+    def guard(
+        self, name: str, call: Callable[..., Awaitable[_T]]
+    ) -> Callable[..., Awaitable[_T]]:
+        """Wrap a client call with retries and the breaker of its endpoint."""
+        breaker = self.breakers.setdefault(name, CircuitBreaker())
+
+        @wraps(call)
+        async def _guarded(*args: Any, **kwargs: Any) -> _T:
+            if not breaker.allow():
+                raise EndpointUnavailableError(
+                    f"{name} is failing, next attempt after the breaker cools down"
+                )
+            attempt = 0
+            while True:
+                try:
+                    result = await call(*args, **kwargs)
+                except (asyncio.CancelledError, RequestDeferredError):
+                    # Neither outcome, let the next call probe instead
+                    breaker.release_probe()
+                    raise
+                except Exception as exc:
+                    if not is_transient(exc):
+                        # The endpoint answered, the request itself was wrong
+                        breaker.record_success()
+                        raise
+                    attempt += 1
+                    if attempt >= RETRY_ATTEMPTS or breaker.state != STATE_CLOSED:
+                        breaker.record_failure()
+                        raise
+                    delay = backoff_delay(attempt - 1)
+                    _LOGGER.debug("Retrying %s in %.1f s after: %s", name, delay, exc)
+                    await asyncio.sleep(delay)
+                else:
+                    breaker.record_success()
+                    return result
+
+        return _guarded
+
+    def as_dict(self) -> Dict[str, Any]:
+        """Return all breakers for diagnostics."""
+        return {name: breaker.as_dict() for name, breaker in self.breakers.items()}
@@ -0,0 +1,101 @@
+"""Adaptive polling scheduler for the MultiSport integration."""
+
+from __future__ import annotations
+
+import datetime
+from typing import Iterable, List
+
+# Keep polling fast for a while after a visit, companions often check in together
+VISIT_FOLLOW_UP = datetime.timedelta(hours=2)
+# Score from which an hour counts as one of the household's usual gym windows
+WINDOW_SCORE = 0.5
+
+
+class AdaptivePollScheduler:
+    """Pick the polling interval from the household's own visit pattern.
+
+    Visits are binned into a weekday by hour-of-day profile. Hours in which
+    visits usually happen (and the hour after them, while the visit is being
+    registered) poll at the minimum interval, quiet hours back off towards the
+    maximum interval.
+    """
+
+    def __init__(
+        self, min_interval: datetime.timedelta, max_interval: datetime.timedelta
+    ) -> None:
+        """Initialize the scheduler."""
+        self.set_bounds(min_interval, max_interval)
+        self._weekly: List[List[int]] = [[0] * 24 for _ in range(7)]
+        self._daily: List[int] = [0] * 24
+        self._last_visit: datetime.datetime | None = None
+        self.interval = self.max_interval
+
+    def set_bounds(
+        self, min_interval: datetime.timedelta, max_interval: datetime.timedelta
+    ) -> None:
+        """Set the interval range, the maximum being at least the minimum."""
+        self.min_interval = min_interval
+        self.max_interval = max(min_interval, max_interval)
+
+    def learn(self, visit_times: Iterable[datetime.datetime]) -> None:
+        """Rebuild the profile from local visit timestamps."""
+        weekly = [[0] * 24 for _ in range(7)]
+        daily = [0] * 24
+        last_visit = None
+        for visit_time in visit_times:
+            weekly[visit_time.weekday()][visit_time.hour] += 1
+            daily[visit_time.hour] += 1
+            if last_visit is None or visit_time > last_visit:
+                last_visit = visit_time
+        self._weekly = weekly
+        self._daily = daily
+        self._last_visit = last_visit
+
+    def _score(self, now: datetime.datetime) -> float:
+        """Return how likely a visit is around now, from 0 to 1."""
+        peak = max(max(row) for row in self._weekly)
+        if not peak:
+            return 0.0
+
+        weekday, hour = now.weekday(), now.hour
+        previous_weekday, previous_hour = (
+            (weekday, hour - 1) if hour else ((weekday - 1) % 7, 23)
+        )
+        weekly = max(
+            self._weekly[weekday][hour], self._weekly[previous_weekday][previous_hour]
+        )
+        # Visits on other weekdays at this time count half
+        daily = max(self._daily[hour], self._daily[previous_hour]) / 7
+        return min(1.0, max(weekly / peak, daily / (2 * peak)))
+
+    def next_interval(self, now: datetime.datetime) -> datetime.timedelta:
+        """Return the interval until the next poll, for a local naive time."""
+        if self._last_visit is not None and (
+            datetime.timedelta(0) <= now - self._last_visit <= VISIT_FOLLOW_UP
+        ):
+            score = 1.0
+        else:
+            score = self._score(now)
+
+        interval = self.max_interval - (self.max_interval - self.min_interval) * score
+
+        # Never sleep through the start of the next usual gym window
+        until_window = self._until_next_window(now, interval)
+        if until_window is not None:
+            interval = max(self.min_interval, until_window)
+
+        self.interval = interval
+        return interval
+
+    def _until_next_window(
+        self, now: datetime.datetime, horizon: datetime.timedelta
+    ) -> datetime.timedelta | None:
+        """Return the time until the next usual gym window within the horizon."""
+        hour_start = now.replace(minute=0, second=0, microsecond=0)
+        step = datetime.timedelta(hours=1)
+        candidate = hour_start + step
+        while candidate - now < horizon:
+            if self._score(candidate) >= WINDOW_SCORE:
+                return candidate - now
+            candidate += step
+        return None
@@ -1,17 +1,29 @@
 from __future__ import annotations
 
 import logging
-from typing import Any, List, Optional, cast
+from typing import Any, Hashable, List, Mapping, cast
 
-from homeassistant.components.sensor import SensorDeviceClass, SensorEntity
+from homeassistant.components.sensor import (
+    SensorDeviceClass,
+    SensorEntity,
+    SensorStateClass,
+)
 from homeassistant.config_entries import ConfigEntry
+from homeassistant.const import PERCENTAGE, UnitOfTime
 from homeassistant.core import HomeAssistant
 from homeassistant.helpers.entity import DeviceInfo, EntityCategory
 from homeassistant.helpers.entity_platform import AddEntitiesCallback
-from homeassistant.helpers.update_coordinator import CoordinatorEntity
+from homeassistant.util import dt as dt_util
 
 from .const import DOMAIN
 from .coordinator import MultisportDataUpdateCoordinator
+from .entity import (
+    MultisportAccountEntity,
+    MultisportCardEntity,
+    async_add_card_entities,
+)
+from .model import CardSnapshot
+from .resilience import STATE_CLOSED, STATE_HALF_OPEN, STATE_OPEN
 
 _LOGGER = logging.getLogger(__name__)
 
@@ -24,70 +36,38 @@ async def async_setup_entry(
     """Set up the sensor platform."""
     coordinator: MultisportDataUpdateCoordinator = hass.data[DOMAIN][entry.entry_id]
 
-    entities: List[SensorEntity] = []
-    # Create sensors for each MultiSport card
-    for card_id, card_data in coordinator.data.items():
-        card_holder_name = (
-            f"{card_data['holder_first_name']} {card_data['holder_last_name']}"
-        )
-        device_name = f"MultiSport {card_holder_name}"
-
-        device_info = DeviceInfo(
-            identifiers={(DOMAIN, card_id)},
-            name=device_name,
-            manufacturer="MultiSport",
-            model="Card",
-            configuration_url="https://app.kartamultisport.pl/",
-            suggested_area="Gym",
-        )
+    def _create_card_sensors(
+        card: CardSnapshot, device_info: DeviceInfo
+    ) -> List[SensorEntity]:
+        """Create the sensors of a card."""
+        card_id, card_holder_name = card.card_id, card.holder_name
+        return [
+            sensor_class(coordinator, card_id, device_info, card_holder_name)
+            for sensor_class in CARD_SENSORS
+        ]
 
-        entities.extend(
-            [
-                MultisportRemainingVisitsSensor(
-                    coordinator, card_id, device_info, card_holder_name
-                ),
-                MultisportLastVisitSensor(
-                    coordinator, card_id, device_info, card_holder_name
-                ),
-                MultisportLastUpdatedSensor(
-                    coordinator, card_id, device_info, card_holder_name
-                ),
-            ]
-        )
+    async_add_card_entities(
+        coordinator, entry, async_add_entities, _create_card_sensors
+    )
+
+    entities: List[SensorEntity] = []
+    entities.extend(
+        [
+            MultisportRefreshDurationSensor(coordinator),
+            MultisportApiCallsSensor(coordinator),
+            MultisportApiErrorsSensor(coordinator),
+            MultisportApiStatusSensor(coordinator),
+            MultisportHistoryImportSensor(coordinator),
+            MultisportRequestBudgetSensor(coordinator),
+        ]
+    )
 
     async_add_entities(entities)
 
 
-class MultisportBaseSensor(CoordinatorEntity, SensorEntity):
+class MultisportBaseSensor(MultisportCardEntity, SensorEntity):
     """Base class for MultiSport sensors."""
 
-    def __init__(
-        self,
-        coordinator: MultisportDataUpdateCoordinator,
-        card_id: str,
-        device_info: DeviceInfo,
-        card_holder_name: str,
-    ) -> None:
-        """Initialize the sensor."""
-        super().__init__(coordinator)
-        self._card_id = card_id
-        self._device_info = device_info
-        self._card_holder_name = card_holder_name
-        self._attr_has_entity_name = True
-
-    @property
-    def device_info(self) -> DeviceInfo:
-        """Return the device info."""
-        return self._device_info
-
-    @property
-    def available(self) -> bool:
-        """Return True if entity is available."""
-        return (
-            self.coordinator.last_update_success
-            and self._card_id in self.coordinator.data
-        )
-
 
 class MultisportRemainingVisitsSensor(MultisportBaseSensor):
     """Sensor for remaining visits on a MultiSport card."""
@@ -110,8 +90,8 @@ class MultisportRemainingVisitsSensor(MultisportBaseSensor):
     @property
     def native_value(self) -> int | None:
         """Return the state of the sensor."""
-        card_data = self.coordinator.data.get(self._card_id, {})
-        return cast(Optional[int], card_data.get("remaining_visits"))
+        card = self.card
+        return card.remaining_visits if card else None
 
 
 class MultisportLastVisitSensor(MultisportBaseSensor):
@@ -119,7 +99,6 @@ class MultisportLastVisitSensor(MultisportBaseSensor):
 
     _attr_icon = "mdi:map-marker-distance"
     _attr_translation_key = "last_visit"
-    _attr_extra_state_attributes: dict[str, Any] = {}
 
     def __init__(
         self,
@@ -131,39 +110,18 @@ class MultisportLastVisitSensor(MultisportBaseSensor):
         """Initialize the sensor."""
         super().__init__(coordinator, card_id, device_info, card_holder_name)
         self._attr_unique_id = f"{card_id}_last_visit"
-        self._attr_extra_state_attributes = {}
 
     @property
     def native_value(self) -> str | None:
         """Return the state of the sensor."""
-        card_data = self.coordinator.data.get(self._card_id, {})
-        last_visit = card_data.get("last_visit")
-        if last_visit:
-            facility_name = last_visit.get("facilityName")
-            visit_date = last_visit.get("date")
-            visit_time = last_visit.get("time")
-
-            # Update extra state attributes
-            self._attr_extra_state_attributes = {
-                "date": visit_date,
-                "time": visit_time,
-                "registration_method": last_visit.get("registrationMethod"),
-                "place": facility_name,
-            }
-
-            # Format the native value
-            if (
-                isinstance(facility_name, str)
-                and isinstance(visit_date, str)
-                and isinstance(visit_time, str)
-            ):
-                return f"{facility_name} {visit_date} {visit_time}"
-            elif isinstance(facility_name, str):
-                return facility_name
-
-        # If no last_visit, or if parts are missing, ensure attributes are reset and return None
-        self._attr_extra_state_attributes = {}
-        return None
+        card = self.card
+        return card.last_visit_state if card else None
+
+    @property
+    def extra_state_attributes(self) -> Mapping[str, Any]:
+        """Return the details of the last visit."""
+        card = self.card
+        return card.last_visit_attributes if card else {}
 
 
 class MultisportLastUpdatedSensor(MultisportBaseSensor):
@@ -187,4 +145,247 @@ class MultisportLastUpdatedSensor(MultisportBaseSensor):
     @property
     def native_value(self):
         """Return the state of the sensor."""
-        return self.coordinator.last_updated_time
+        # The time the card's data last changed, not of every poll, so an
+        # unchanged card does not get a new state on each refresh
+        return (
+            self.coordinator.card_changed_at(self._card_id)
+            or self.coordinator.last_updated_time
+        )
+
+    def _state_fingerprint(self) -> Hashable:
+        """Return what the written state depends on."""
+        return (
+            super()._state_fingerprint(),
+            self.coordinator.data_restored,
+            self.coordinator.polling_mode,
+            self.coordinator.polling_interval,
+        )
+
+    @property
+    def extra_state_attributes(self) -> dict[str, Any]:
+        """Return the snapshot and polling diagnostics."""
+        return {
+            "restored_from_snapshot": self.coordinator.data_restored,
+            "polling_mode": self.coordinator.polling_mode,
+            "polling_interval_minutes": round(
+                self.coordinator.polling_interval.total_seconds() / 60, 1
+            ),
+        }
+
+
+class MultisportAnalyticsSensor(MultisportBaseSensor):
+    """Base class for sensors of the running visit analytics of a card."""
+
+    def __init__(
+        self,
+        coordinator: MultisportDataUpdateCoordinator,
+        card_id: str,
+        device_info: DeviceInfo,
+        card_holder_name: str,
+    ) -> None:
+        """Initialize the sensor."""
+        super().__init__(coordinator, card_id, device_info, card_holder_name)
+        self._attr_unique_id = f"{card_id}_{self._attr_translation_key}"
+
+    @property
+    def native_value(self) -> Any:
+        """Return the state of the sensor."""
+        card = self.card
+        return card.analytic(cast(str, self._attr_translation_key)) if card else None
+
+
+class MultisportVisitsThisWeekSensor(MultisportAnalyticsSensor):
+    """Sensor for the visits of a card since Monday."""
+
+    _attr_native_unit_of_measurement = "visits"
+    _attr_icon = "mdi:calendar-week"
+    _attr_state_class = SensorStateClass.TOTAL_INCREASING
+    _attr_translation_key = "visits_this_week"
+
+
+class MultisportVisitsThisMonthSensor(MultisportAnalyticsSensor):
+    """Sensor for the visits of a card since the first of the month."""
+
+    _attr_native_unit_of_measurement = "visits"
+    _attr_icon = "mdi:calendar-month"
+    _attr_state_class = SensorStateClass.TOTAL_INCREASING
+    _attr_translation_key = "visits_this_month"
+
+
+class MultisportWeeklyStreakSensor(MultisportAnalyticsSensor):
+    """Sensor for the consecutive weeks with at least one visit."""
+
+    _attr_native_unit_of_measurement = UnitOfTime.WEEKS
+    _attr_icon = "mdi:fire"
+    _attr_state_class = SensorStateClass.MEASUREMENT
+    _attr_translation_key = "weekly_streak"
+
+
+class MultisportAverageVisitsPerWeekSensor(MultisportAnalyticsSensor):
+    """Sensor for the average visits per week over the stored history."""
+
+    _attr_native_unit_of_measurement = "visits/week"
+    _attr_icon = "mdi:chart-line"
+    _attr_state_class = SensorStateClass.MEASUREMENT
+    _attr_suggested_display_precision = 1
+    _attr_translation_key = "average_visits_per_week"
+
+
+class MultisportFavoriteFacilitySensor(MultisportAnalyticsSensor):
+    """Sensor for the most visited facility of a card."""
+
+    _attr_icon = "mdi:star"
+    _attr_translation_key = "favorite_facility"
+
+    @property
+    def extra_state_attributes(self) -> Mapping[str, Any] | None:
+        """Return the number of visits to the facility."""
+        card = self.card
+        return card.favorite_facility_attributes if card else None
+
+
+CARD_SENSORS: tuple[type[MultisportBaseSensor], ...] = (
+    MultisportRemainingVisitsSensor,
+    MultisportLastVisitSensor,
+    MultisportLastUpdatedSensor,
+    MultisportVisitsThisWeekSensor,
+    MultisportVisitsThisMonthSensor,
+    MultisportWeeklyStreakSensor,
+    MultisportAverageVisitsPerWeekSensor,
+    MultisportFavoriteFacilitySensor,
+)
+
+
+class MultisportAccountDiagnosticSensor(MultisportAccountEntity, SensorEntity):
+    """Base class for the request figures of a MultiSport account."""
+
+    _attr_entity_category = EntityCategory.DIAGNOSTIC
+    _attr_entity_registry_enabled_default = False
+
+    def __init__(self, coordinator: MultisportDataUpdateCoordinator) -> None:
+        """Initialize the sensor."""
+        super().__init__(coordinator, cast(str, self._attr_translation_key))
+
+
+class MultisportRefreshDurationSensor(MultisportAccountDiagnosticSensor):
+    """Diagnostic sensor for the duration of the last refresh."""
+
+    _attr_device_class = SensorDeviceClass.DURATION
+    _attr_native_unit_of_measurement = UnitOfTime.MILLISECONDS
+    _attr_state_class = SensorStateClass.MEASUREMENT
+    _attr_suggested_display_precision = 0
+    _attr_translation_key = "refresh_duration"
+
+    @property
+    def native_value(self) -> float | None:
+        """Return the state of the sensor."""
+        return self.coordinator.api.stats.last_refresh_ms
+
+
+class MultisportApiCallsSensor(MultisportAccountDiagnosticSensor):
+    """Diagnostic sensor for the number of MultiSport API calls."""
+
+    _attr_icon = "mdi:api"
+    _attr_state_class = SensorStateClass.TOTAL_INCREASING
+    _attr_translation_key = "api_calls"
+
+    @property
+    def native_value(self) -> int:
+        """Return the state of the sensor."""
+        return self.coordinator.api.stats.calls
+
+
+class MultisportApiErrorsSensor(MultisportAccountDiagnosticSensor):
+    """Diagnostic sensor for the number of failed MultiSport API calls."""
+
+    _attr_icon = "mdi:alert-circle-outline"
+    _attr_state_class = SensorStateClass.TOTAL_INCREASING
+    _attr_translation_key = "api_errors"
+
+    @property
+    def native_value(self) -> int:
+        """Return the state of the sensor."""
+        return self.coordinator.api.stats.errors
+
+
+class MultisportApiStatusSensor(MultisportAccountDiagnosticSensor):
+    """Diagnostic sensor for the worst circuit breaker of the MultiSport API."""
+
+    _attr_device_class = SensorDeviceClass.ENUM
+    _attr_entity_registry_enabled_default = True
+    _attr_options = [STATE_CLOSED, STATE_HALF_OPEN, STATE_OPEN]
+    _attr_translation_key = "api_status"
+
+    @property
+    def native_value(self) -> str:
+        """Return the state of the sensor."""
+        return self.coordinator.api.breakers.state
+
+    @property
+    def extra_state_attributes(self) -> dict[str, Any]:
+        """Return the breaker state of each endpoint."""
+        return {
+            name: breaker.state
+            for name, breaker in self.coordinator.api.breakers.breakers.items()
+        }
+
+
+class MultisportHistoryImportSensor(MultisportAccountDiagnosticSensor):
+    """Diagnostic sensor for the progress of history imports."""
+
+    _attr_entity_registry_enabled_default = True
+    _attr_icon = "mdi:history"
+    _attr_native_unit_of_measurement = PERCENTAGE
+    _attr_translation_key = "history_import"
+
+    @property
+    def native_value(self) -> int | None:
+        """Return the share of the requested months imported so far."""
+        done, total = self.coordinator.history.backfill_progress(dt_util.now().date())
+        return done * 100 // total if total else None
+
+    @property
+    def extra_state_attributes(self) -> dict[str, Any]:
+        """Return the months imported and whether the import is running."""
+        coordinator = self.coordinator
+        done, total = coordinator.history.backfill_progress(dt_util.now().date())
+        if coordinator.backfill_running:
+            status = "importing"
+        elif done < total:
+            status = "paused"
+        else:
+            status = "complete"
+        return {
+            "status": status,
+            "months_imported": done,
+            "months_requested": total,
+            "error": coordinator.backfill_error,
+        }
+
+
+class MultisportRequestBudgetSensor(MultisportAccountDiagnosticSensor):
+    """Diagnostic sensor for the requests the account can still make this hour."""
+
+    _attr_entity_registry_enabled_default = True
+    _attr_icon = "mdi:speedometer"
+    _attr_native_unit_of_measurement = "requests"
+    _attr_state_class = SensorStateClass.MEASUREMENT
+    _attr_translation_key = "request_budget"
+
+    @property
+    def native_value(self) -> int:
+        """Return the state of the sensor."""
+        return self.coordinator.api.scheduler.remaining
+
+    @property
+    def extra_state_attributes(self) -> dict[str, Any]:
+        """Return the account and domain-wide budgets."""
+        scheduler = self.coordinator.api.scheduler
+        return {
+            "account_limit": scheduler.account.limit,
+            "account_remaining": scheduler.account.remaining,
+            "account_deferred": scheduler.account.deferred,
+            "domain_limit": scheduler.domain.limit,
+            "domain_remaining": scheduler.domain.remaining,
+            "domain_deferred": scheduler.domain.deferred,
+        }
@@ -0,0 +1,161 @@
+"""Long-term statistics of MultiSport visits."""
+
+from __future__ import annotations
+
+import asyncio
+import datetime
+import logging
+from typing import Dict, List
+
+from homeassistant.components.recorder import get_instance
+from homeassistant.components.recorder.models import (
+    StatisticData,
+    StatisticMeanType,
+    StatisticMetaData,
+)
+from homeassistant.components.recorder.statistics import (
+    async_add_external_statistics,
+    get_last_statistics,
+    statistics_during_period,
+)
+from homeassistant.core import HomeAssistant
+from homeassistant.util import dt as dt_util
+from homeassistant.util import slugify
+
+from .const import DOMAIN
+from .visits import VisitStore
+
+_LOGGER = logging.getLogger(__name__)
+
+# Rows handed to the recorder per import job
+IMPORT_BATCH_SIZE = 1000
+
+_HOUR = datetime.timedelta(hours=1)
+
+
+def visits_statistic_id(card_id: str) -> str:
+    """Return the external statistic id holding the visits of a card."""
+    return f"{DOMAIN}:visits_{slugify(card_id)}"
+
+
+class VisitStatistics:
+    """Push hourly visit counts of each card into long-term statistics.
+
+    The first run backfills every stored visit, later runs only append the
+    hours completed since the last imported one, so dashboards get
+    pre-aggregated hourly/daily series without scanning state history.
+    Visits imported into the past are added by importing again the hours
+    from their first day on.
+    """
+
+    def __init__(self, hass: HomeAssistant) -> None:
+        """Initialize the statistics pipeline."""
+        self._hass = hass
+        # Start of the last imported hour and the running sum, per card
+        self._imported: Dict[str, tuple[datetime.datetime, float]] = {}
+        self._lock = asyncio.Lock()
+
+    async def async_update(
+        self, card_id: str, holder_name: str, visits: VisitStore
+    ) -> None:
+        """Import the completed hours not yet in the statistics of a card."""
+        if "recorder" not in self._hass.config.components:
+            return
+
+        async with self._lock:
+            await self._async_update(card_id, holder_name, visits)
+
+    async def async_reimport(
+        self,
+        card_id: str,
+        holder_name: str,
+        visits: VisitStore,
+        since: datetime.date,
+    ) -> None:
+        """Import again the hours of a card from a day on, sums included."""
+        if "recorder" not in self._hass.config.components:
+            return
+
+        async with self._lock:
+            statistic_id = visits_statistic_id(card_id)
+            start = dt_util.as_utc(dt_util.start_of_local_day(since))
+            before = await get_instance(self._hass).async_add_executor_job(
+                statistics_during_period,
+                self._hass,
+                dt_util.utc_from_timestamp(0),
+                start,
+                {statistic_id},
+                "hour",
+                None,
+                {"sum"},
+            )
+            rows = before.get(statistic_id)
+            # Rows from the start on are overwritten, the sum continues from
+            # the last row before it
+            self._imported[card_id] = (
+                start - _HOUR,
+                (rows[-1]["sum"] or 0.0) if rows else 0.0,
+            )
+            await self._async_update(card_id, holder_name, visits)
+
+    async def _async_update(
+        self, card_id: str, holder_name: str, visits: VisitStore
+    ) -> None:
+        statistic_id = visits_statistic_id(card_id)
+        if card_id not in self._imported:
+            last = await get_instance(self._hass).async_add_executor_job(
+                get_last_statistics, self._hass, 1, statistic_id, True, {"sum"}
+            )
+            if rows := last.get(statistic_id):
+                self._imported[card_id] = (
+                    dt_util.utc_from_timestamp(rows[0]["start"]),
+                    rows[0]["sum"] or 0.0,
+                )
+
+        last_start, total = self._imported.get(card_id, (None, 0.0))
+        # Only completed hours are imported, a visit may still land in this one
+        end = dt_util.utcnow().replace(minute=0, second=0, microsecond=0)
+        start = last_start + _HOUR if last_start else None
+
+        counts: Dict[datetime.datetime, int] = {}
+        for visit in visits.visits_between(
+            _to_local_naive(start) if start else datetime.datetime.min,
+            _to_local_naive(end),
+        ):
+            hour = dt_util.as_utc(
+                visit.timestamp.replace(tzinfo=dt_util.get_default_time_zone())
+            ).replace(minute=0, second=0, microsecond=0)
+            counts[hour] = counts.get(hour, 0) + 1
+
+        if not counts:
+            return
+
+        statistics: List[StatisticData] = []
+        for hour in sorted(counts):
+            total += counts[hour]
+            statistics.append(StatisticData(start=hour, state=counts[hour], sum=total))
+
+        metadata = StatisticMetaData(
+            mean_type=StatisticMeanType.NONE,
+            has_sum=True,
+            name=f"MultiSport {holder_name} visits",
+            source=DOMAIN,
+            statistic_id=statistic_id,
+            unit_of_measurement="visits",
+        )
+        for index in range(0, len(statistics), IMPORT_BATCH_SIZE):
+            async_add_external_statistics(
+                self._hass, metadata, statistics[index : index + IMPORT_BATCH_SIZE]
+            )
+
+        self._imported[card_id] = (statistics[-1]["start"], total)
+        _LOGGER.debug(
+            "Imported %s hours of visit statistics for card %s",
+            len(statistics),
+            card_id,
+        )
+
+
+def _to_local_naive(value: datetime.datetime) -> datetime.datetime:
+    """Convert an aware time into the naive local time visits are stored in."""
+    return dt_util.as_local(value).replace(tzinfo=None)
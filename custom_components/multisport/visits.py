@@ -0,0 +1,417 @@
+"""Compact per-card visit store for the MultiSport integration."""
+
+from __future__ import annotations
+
+import datetime
+import logging
+from array import array
+from bisect import bisect_left, bisect_right
+from functools import lru_cache
+from typing import Any, Dict, Iterable, Iterator, List, NamedTuple
+
+_LOGGER = logging.getLogger(__name__)
+
+# Roughly ten years of daily visits, enough for any realistic multi-year history
+DEFAULT_MAX_VISITS = 4000
+
+_EPOCH = datetime.datetime(1970, 1, 1)
+_WEEK = datetime.timedelta(weeks=1)
+
+
+class Visit(NamedTuple):
+    """A single visit, with a naive local timestamp."""
+
+    timestamp: datetime.datetime
+    facility: str | None
+    registration_method: str | None
+
+
+def to_timestamp(value: datetime.datetime) -> int:
+    """Convert a naive local datetime into the store's integer timestamp."""
+    return int((value - _EPOCH).total_seconds())
+
+
+def from_timestamp(value: int) -> datetime.datetime:
+    """Convert a store timestamp back into a naive local datetime."""
+    return _EPOCH + datetime.timedelta(seconds=value)
+
+
+@lru_cache(maxsize=8192)
+def _parse_moment(
+    date_str: Any, time_str: Any
+) -> tuple[datetime.datetime, int, str] | None:
+    """Parse a "DD-MM-YYYY" date and "HH:MM" time.
+
+    Returns the datetime, the store timestamp and the "YYYY-MM" month key.
+
+    The format is fixed, so slicing is much cheaper than strptime, and the
+    memo makes visits re-fetched with the current month free to parse.
+    """
+    try:
+        if date_str[2] != "-" or date_str[5] != "-" or time_str[2] != ":":
+            return None
+        moment = datetime.datetime(
+            int(date_str[6:10]),
+            int(date_str[3:5]),
+            int(date_str[0:2]),
+            int(time_str[0:2]),
+            int(time_str[3:5]),
+        )
+    except (IndexError, TypeError, ValueError):
+        return None
+    return moment, to_timestamp(moment), f"{date_str[6:10]}-{date_str[3:5]}"
+
+
+def parse_visit_datetime(
+    date_str: str | None, time_str: str | None
+) -> datetime.datetime | None:
+    """Parse a "DD-MM-YYYY" date and "HH:MM" time, None if malformed."""
+    moment = _parse_moment(date_str, time_str)
+    return moment[0] if moment else None
+
+
+def parse_visit(visit: Dict[str, Any]) -> Visit | None:
+    """Parse a raw visit dict from the API, None if its date is malformed."""
+    visit_date_str = visit.get("date")  # e.g., "DD-MM-YYYY"
+    visit_time_str = visit.get("time")  # e.g., "HH:MM"
+    timestamp = parse_visit_datetime(visit_date_str, visit_time_str)
+    if timestamp is None:
+        _LOGGER.warning(
+            "Could not parse visit date/time: %s %s", visit_date_str, visit_time_str
+        )
+        return None
+    return Visit(timestamp, visit.get("facilityName"), visit.get("registrationMethod"))
+
+
+class _InternTable:
+    """Small table mapping repeated strings to integer ids."""
+
+    __slots__ = ("_ids", "values")
+
+    def __init__(self, values: List[str | None] | None = None) -> None:
+        self.values: List[str | None] = values or [None]
+        self._ids = {value: index for index, value in enumerate(self.values)}
+
+    def intern(self, value: str | None) -> int:
+        index = self._ids.get(value)
+        if index is None:
+            index = self._ids[value] = len(self.values)
+            self.values.append(value)
+        return index
+
+
+class VisitStore:
+    """Time-ordered visits of one card, kept in array-backed columns.
+
+    Timestamps live in a sorted integer array, facility names and
+    registration methods are interned and referenced by id. Range queries
+    bisect the timestamp column, so derived values such as the last visit
+    or visits per window cost O(log n). The oldest visits are dropped once
+    max_visits is exceeded, and visits older than all kept ones are then
+    ignored, so a dropped visit delivered again is not taken for a new one.
+    """
+
+    __slots__ = (
+        "_facilities",
+        "_facility_ids",
+        "_method_ids",
+        "_methods",
+        "_timestamps",
+        "max_visits",
+    )
+
+    def __init__(self, max_visits: int = DEFAULT_MAX_VISITS) -> None:
+        """Initialize an empty store."""
+        self._timestamps = array("q")
+        self._facility_ids = array("I")
+        self._method_ids = array("I")
+        self._facilities = _InternTable()
+        self._methods = _InternTable()
+        self.max_visits = max_visits
+
+    def __len__(self) -> int:
+        """Return the number of visits."""
+        return len(self._timestamps)
+
+    def add(self, visit: Visit) -> bool:
+        """Add a visit, returning False if it is already stored."""
+        return self._add(
+            to_timestamp(visit.timestamp), visit.facility, visit.registration_method
+        )
+
+    def _add(self, timestamp: int, facility: str | None, method: str | None) -> bool:
+        """Add a visit given its store timestamp, False if already stored."""
+        timestamps = self._timestamps
+        if (
+            timestamps
+            and len(timestamps) >= self.max_visits
+            and timestamp < timestamps[0]
+        ):
+            # Older than any kept, most likely a visit dropped before
+            return False
+        facility_id = self._facilities.intern(facility)
+        if not timestamps or timestamp > timestamps[-1]:
+            # Visits mostly arrive in time order, append without searching
+            timestamps.append(timestamp)
+            self._facility_ids.append(facility_id)
+            self._method_ids.append(self._methods.intern(method))
+        else:
+            start = bisect_left(timestamps, timestamp)
+            end = bisect_right(timestamps, timestamp, start)
+            if facility_id in self._facility_ids[start:end]:
+                return False
+
+            timestamps.insert(end, timestamp)
+            self._facility_ids.insert(end, facility_id)
+            self._method_ids.insert(end, self._methods.intern(method))
+
+        if len(timestamps) > self.max_visits:
+            excess = len(self._timestamps) - self.max_visits
+            del self._timestamps[:excess]
+            del self._facility_ids[:excess]
+            del self._method_ids[:excess]
+        return True
+
+    def _visit(self, index: int) -> Visit:
+        return Visit(
+            from_timestamp(self._timestamps[index]),
+            self._facilities.values[self._facility_ids[index]],
+            self._methods.values[self._method_ids[index]],
+        )
+
+    def latest(self) -> Visit | None:
+        """Return the most recent visit."""
+        if not self._timestamps:
+            return None
+        return self._visit(len(self._timestamps) - 1)
+
+    def _range(self, start: datetime.datetime, end: datetime.datetime) -> range:
+        """Return the indexes of visits in [start, end)."""
+        return range(
+            bisect_left(self._timestamps, to_timestamp(start)),
+            bisect_left(self._timestamps, to_timestamp(end)),
+        )
+
+    def count_between(self, start: datetime.datetime, end: datetime.datetime) -> int:
+        """Return the number of visits in [start, end)."""
+        return len(self._range(start, end))
+
+    def visits_between(
+        self, start: datetime.datetime, end: datetime.datetime
+    ) -> Iterator[Visit]:
+        """Yield the visits in [start, end), oldest first."""
+        for index in self._range(start, end):
+            yield self._visit(index)
+
+    def as_dict(self) -> Dict[str, Any]:
+        """Return the store in its JSON storage format."""
+        return {
+            "timestamps": self._timestamps.tolist(),
+            "facility_ids": self._facility_ids.tolist(),
+            "method_ids": self._method_ids.tolist(),
+            "facilities": self._facilities.values,
+            "methods": self._methods.values,
+        }
+
+    @classmethod
+    def from_dict(
+        cls, data: Dict[str, Any], max_visits: int = DEFAULT_MAX_VISITS
+    ) -> VisitStore:
+        """Restore a store from its JSON storage format."""
+        store = cls(max_visits)
+        store._timestamps = array("q", data["timestamps"])
+        store._facility_ids = array("I", data["facility_ids"])
+        store._method_ids = array("I", data["method_ids"])
+        store._facilities = _InternTable(data["facilities"])
+        store._methods = _InternTable(data["methods"])
+        return store
+
+
+class VisitIngest:
+    """Single pass ingestion of raw monthly summaries into a VisitStore.
+
+    Each raw visit is parsed once, de-duplicated against the store, and the
+    per-card aggregates are updated on the way: the latest visit, whether
+    the card was used today and per-month counts of the new visits.
+    """
+
+    __slots__ = (
+        "latest",
+        "month_counts",
+        "new_visits",
+        "previous",
+        "store",
+        "today",
+    )
+
+    def __init__(self, store: VisitStore, today: datetime.date) -> None:
+        """Initialize the ingestion from the visits already stored."""
+        self.store = store
+        self.today = today
+        # Latest visit stored before this ingestion
+        self.previous: Visit | None = store.latest()
+        self.latest: Visit | None = self.previous
+        self.new_visits: List[Visit] = []
+        self.month_counts: Dict[str, int] = {}
+
+    def visits_since_previous(self) -> List[Visit]:
+        """Return the new visits later than any visit stored before, in order.
+
+        Nothing is returned on the first ingestion of a card, or for visits
+        back-filled into older months, as those are not fresh check-ins.
+        """
+        previous = self.previous
+        if previous is None:
+            return []
+        return sorted(
+            (
+                visit
+                for visit in self.new_visits
+                if visit.timestamp > previous.timestamp
+            ),
+            key=lambda visit: visit.timestamp,
+        )
+
+    @property
+    def used_today(self) -> bool:
+        """Return True if the latest visit happened today."""
+        return self.latest is not None and self.latest.timestamp.date() == self.today
+
+    def feed(self, monthly_summaries: Iterable[Dict[str, Any]]) -> None:
+        """Ingest the monthly summaries returned by the history endpoint."""
+        add = self.store._add
+        new_visits = self.new_visits
+        month_counts = self.month_counts
+        latest = self.latest
+        latest_timestamp = to_timestamp(latest.timestamp) if latest else None
+
+        for monthly_summary in monthly_summaries:
+            for raw_visit in monthly_summary.get("visits", []):
+                moment = _parse_moment(raw_visit.get("date"), raw_visit.get("time"))
+                if moment is None:
+                    # Takes the slow path only to log the malformed visit
+                    parse_visit(raw_visit)
+                    continue
+
+                visit_datetime, timestamp, month = moment
+                facility = raw_visit.get("facilityName")
+                method = raw_visit.get("registrationMethod")
+                if not add(timestamp, facility, method):
+                    continue
+
+                visit = Visit(visit_datetime, facility, method)
+                new_visits.append(visit)
+                month_counts[month] = month_counts.get(month, 0) + 1
+                if latest_timestamp is None or timestamp >= latest_timestamp:
+                    latest, latest_timestamp = visit, timestamp
+
+        self.latest = latest
+
+
+def _week_start(day: datetime.date) -> datetime.date:
+    """Return the Monday of the week containing a day."""
+    return day - datetime.timedelta(days=day.weekday())
+
+
+class VisitAggregates:
+    """Running analytics over the visits of one card.
+
+    Counts per week, month and facility are only ever incremented with newly
+    ingested visits, so keeping them current costs O(new visits) per poll
+    however much history is stored. Reading them back is O(1), except the
+    streak which takes one lookup per week it spans.
+    """
+
+    __slots__ = ("facilities", "favorite", "first", "months", "total", "weeks")
+
+    def __init__(self) -> None:
+        """Initialize empty aggregates."""
+        self.total = 0
+        self.first: datetime.date | None = None
+        # Keyed by the Monday starting the week, and by "YYYY-MM"
+        self.weeks: Dict[str, int] = {}
+        self.months: Dict[str, int] = {}
+        self.facilities: Dict[str, int] = {}
+        self.favorite: str | None = None
+
+    def add(self, visits: Iterable[Visit]) -> None:
+        """Count newly ingested visits."""
+        weeks, months, facilities = self.weeks, self.months, self.facilities
+        for visit in visits:
+            day = visit.timestamp.date()
+            self.total += 1
+            if self.first is None or day < self.first:
+                self.first = day
+            week = _week_start(day).isoformat()
+            weeks[week] = weeks.get(week, 0) + 1
+            month = f"{day.year:04d}-{day.month:02d}"
+            months[month] = months.get(month, 0) + 1
+            if (facility := visit.facility) is not None:
+                count = facilities[facility] = facilities.get(facility, 0) + 1
+                # Counts only grow, the favorite can only be overtaken
+                if self.favorite is None or count > facilities[self.favorite]:
+                    self.favorite = facility
+
+    def summary(self, today: datetime.date) -> Dict[str, Any]:
+        """Return the analytics as of a day."""
+        week_start = _week_start(today)
+        this_week = self.weeks.get(week_start.isoformat(), 0)
+
+        # A week without visits yet does not break the streak until it ends
+        streak = 0
+        week = week_start if this_week else week_start - _WEEK
+        while self.weeks.get(week.isoformat()):
+            streak += 1
+            week -= _WEEK
+
+        average = None
+        if self.first is not None:
+            weeks = (week_start - _week_start(self.first)).days // 7 + 1
+            average = round(self.total / weeks, 2)
+
+        return {
+            "visits_this_week": this_week,
+            "visits_this_month": self.months.get(
+                f"{today.year:04d}-{today.month:02d}", 0
+            ),
+            "weekly_streak": streak,
+            "average_visits_per_week": average,
+            "favorite_facility": self.favorite,
+            "favorite_facility_visits": (
+                self.facilities[self.favorite] if self.favorite is not None else 0
+            ),
+        }
+
+    def as_dict(self) -> Dict[str, Any]:
+        """Return the aggregates in their JSON storage format."""
+        return {
+            "total": self.total,
+            "first": self.first.isoformat() if self.first else None,
+            "weeks": self.weeks,
+            "months": self.months,
+            "facilities": self.facilities,
+            "favorite": self.favorite,
+        }
+
+    @classmethod
+    def from_dict(cls, data: Dict[str, Any]) -> VisitAggregates:
+        """Restore aggregates from their JSON storage format."""
+        aggregates = cls()
+        aggregates.total = data["total"]
+        aggregates.first = (
+            datetime.date.fromisoformat(data["first"]) if data["first"] else None
+        )
+        aggregates.weeks = data["weeks"]
+        aggregates.months = data["months"]
+        aggregates.facilities = data["facilities"]
+        aggregates.favorite = data["favorite"]
+        return aggregates
+
+    @classmethod
+    def from_store(cls, store: VisitStore) -> VisitAggregates:
+        """Build aggregates from stored visits, for history saved without them."""
+        aggregates = cls()
+        aggregates.add(
+            store.visits_between(datetime.datetime.min, datetime.datetime.max)
+        )
+        return aggregates
@@ -0,0 +1,114 @@
+"""Micro-benchmark of visit history ingestion.
+
+Compares the original per-poll strptime scan for the latest visit with the
+single-pass VisitIngest, both on a first ingestion and on a steady-state
+poll that re-delivers already known visits.
+
+Run from the repository root:
+
+    python tests/benchmarks/bench_ingest.py [visits]
+"""
+
+from __future__ import annotations
+
+import datetime
+import pathlib
+import random
+import sys
+import timeit
+from typing import Any, Dict, List
+
+sys.path.insert(0, str(pathlib.Path(__file__).resolve().parents[2]))
+
+from custom_components.multisport import visits as visits_module  # noqa: E402
+from custom_components.multisport.visits import VisitIngest, VisitStore  # noqa: E402
+
+FACILITIES = [f"Facility {index}" for index in range(40)]
+
+
+def synthetic_history(visits: int, seed: int = 1) -> List[Dict[str, Any]]:
+    """Return monthly summaries holding the given number of visits."""
+    rng = random.Random(seed)
+    start = datetime.datetime(2020, 1, 1, 6, 0)
+    months: Dict[str, List[Dict[str, Any]]] = {}
+    for index in range(visits):
+        moment = start + datetime.timedelta(hours=index * 9 + rng.randrange(3))
+        months.setdefault(moment.strftime("%Y-%m"), []).append(
+            {
+                "date": moment.strftime("%d-%m-%Y"),
+                "time": moment.strftime("%H:%M"),
+                "facilityName": rng.choice(FACILITIES),
+                "registrationMethod": "CARD",
+            }
+        )
+    return [{"visits": month_visits} for month_visits in months.values()]
+
+
+def legacy_latest(history: List[Dict[str, Any]]) -> Dict[str, Any] | None:
+    """Find the latest visit the way the coordinator originally did."""
+    latest_visit_date = None
+    latest_visit_details = None
+    for monthly_summary in history:
+        for visit in monthly_summary.get("visits", []):
+            current_visit_datetime = datetime.datetime.strptime(
+                f"{visit['date']} {visit['time']}", "%d-%m-%Y %H:%M"
+            )
+            if latest_visit_date is None or current_visit_datetime > latest_visit_date:
+                latest_visit_date = current_visit_datetime
+                latest_visit_details = visit
+    return latest_visit_details
+
+
+def main() -> None:
+    """Run the benchmark and print the results."""
+    visits = int(sys.argv[1]) if len(sys.argv) > 1 else 5000
+    history = synthetic_history(visits)
+    today = datetime.date(2030, 1, 1)
+    runs = 20
+
+    def first_ingest() -> None:
+        visits_module._parse_moment.cache_clear()
+        VisitIngest(VisitStore(max_visits=visits), today).feed(history)
+
+    steady_store = VisitStore(max_visits=visits)
+    VisitIngest(steady_store, today).feed(history)
+
+    def steady_ingest() -> None:
+        VisitIngest(steady_store, today).feed(history)
+
+    raw_moments = [
+        (visit["date"], visit["time"])
+        for monthly_summary in history
+        for visit in monthly_summary["visits"]
+    ]
+
+    def strptime_parse() -> None:
+        for date_str, time_str in raw_moments:
+            datetime.datetime.strptime(f"{date_str} {time_str}", "%d-%m-%Y %H:%M")
+
+    def fixed_format_parse() -> None:
+        visits_module._parse_moment.cache_clear()
+        for date_str, time_str in raw_moments:
+            visits_module._parse_moment(date_str, time_str)
+
+    results = {
+        "parse, strptime": timeit.timeit(strptime_parse, number=runs),
+        "parse, fixed format": timeit.timeit(fixed_format_parse, number=runs),
+        "legacy strptime scan": timeit.timeit(
+            lambda: legacy_latest(history), number=runs
+        ),
+        "ingest, cold parse memo": timeit.timeit(first_ingest, number=runs),
+        "ingest, known visits": timeit.timeit(steady_ingest, number=runs),
+    }
+
+    print(f"{visits} visits, mean of {runs} runs")
+    for name, total in results.items():
+        baseline = results[
+            "parse, strptime" if name.startswith("parse") else "legacy strptime scan"
+        ]
+        per_run = total / runs * 1000
+        print(f"  {name:<26} {per_run:8.2f} ms  ({baseline / total:5.1f}x)")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,161 @@
+"""Benchmarks of the MultiSport coordinator refresh.
+
+Run with timing enabled, saving results as a baseline or comparing
+against one:
+
+    pytest tests/benchmarks --benchmark-enable --benchmark-only \\
+        --benchmark-timer=time.process_time --benchmark-save=baseline
+    pytest tests/benchmarks --benchmark-enable --benchmark-only \\
+        --benchmark-timer=time.process_time --benchmark-compare \\
+        --benchmark-compare-fail=min:30%
+
+With --benchmark-disable instead, each workload runs once as a smoke test,
+still checking the memory and event loop blocking budgets. The benchmarks
+are left out of a plain pytest run.
+"""
+
+from __future__ import annotations
+
+import asyncio
+import datetime
+import itertools
+import time
+import tracemalloc
+from datetime import timedelta
+from typing import Any, Coroutine, TypeVar
+
+import pytest
+from homeassistant.core import HomeAssistant
+from pytest_homeassistant_custom_component.common import MockConfigEntry
+
+from custom_components.multisport.const import CONF_HISTORY_DAYS, DOMAIN
+from custom_components.multisport.coordinator import MultisportDataUpdateCoordinator
+from custom_components.multisport.metrics import ApiStats
+
+from workloads import WORKLOADS, Workload, synthetic_client
+
+# Budgets of a single refresh of the largest workload, well above what it
+# needs so only real regressions trip them
+PEAK_MEMORY_BUDGET = 32 * 1024 * 1024  # bytes
+LOOP_BLOCKING_BUDGET = 0.1  # seconds
+
+_T = TypeVar("_T")
+
+_entry_ids = itertools.count()
+
+
+def _coordinator(
+    hass: HomeAssistant, workload: Workload, client: Any
+) -> MultisportDataUpdateCoordinator:
+    entry = MockConfigEntry(
+        domain=DOMAIN,
+        entry_id=f"bench-{next(_entry_ids)}",
+        data={},
+        options={CONF_HISTORY_DAYS: workload.months * 30},
+    )
+    entry.add_to_hass(hass)
+    api = type("Api", (), {})()
+    api.client = client
+    api.stats = ApiStats()
+    api.async_save_tokens = lambda: None
+    return MultisportDataUpdateCoordinator(
+        hass, api=api, entry=entry, update_interval=timedelta(hours=1)
+    )
+
+
+async def _async_new_coordinator(
+    hass: HomeAssistant, workload: Workload, client: Any
+) -> MultisportDataUpdateCoordinator:
+    return _coordinator(hass, workload, client)
+
+
+async def _async_refresh(coordinator: MultisportDataUpdateCoordinator) -> None:
+    await coordinator.async_refresh()
+    assert coordinator.last_update_success
+
+
+def _run(hass: HomeAssistant, coro: Coroutine[Any, Any, _T]) -> _T:
+    """Run a coroutine on the Home Assistant loop from the benchmark thread."""
+    return asyncio.run_coroutine_threadsafe(coro, hass.loop).result()
+
+
+async def _async_peak_memory(coordinator: MultisportDataUpdateCoordinator) -> int:
+    """Refresh once, returning the peak of memory allocated meanwhile."""
+    tracemalloc.start()
+    try:
+        await _async_refresh(coordinator)
+        return tracemalloc.get_traced_memory()[1]
+    finally:
+        tracemalloc.stop()
+
+
+async def _async_loop_blocking(coordinator: MultisportDataUpdateCoordinator) -> float:
+    """Refresh once, returning the longest time the event loop was blocked.
+
+    Measured in CPU time of the loop thread, so a runner busy with other
+    jobs does not count as blocking.
+    """
+    stalls = [0.0]
+    done = asyncio.Event()
+
+    async def _watch() -> None:
+        last = time.thread_time()
+        while not done.is_set():
+            await asyncio.sleep(0)
+            now = time.thread_time()
+            stalls.append(now - last)
+            last = now
+
+    watcher = asyncio.create_task(_watch())
+    try:
+        await _async_refresh(coordinator)
+    finally:
+        done.set()
+        await watcher
+    return max(stalls)
+
+
+@pytest.mark.parametrize("workload", WORKLOADS, ids=str)
+async def test_cold_refresh(
+    hass: HomeAssistant, benchmark: Any, workload: Workload
+) -> None:
+    """Benchmark a first refresh, fetching and ingesting the whole window."""
+    client = synthetic_client(workload, datetime.date.today())
+    peak = await _async_peak_memory(_coordinator(hass, workload, client))
+    stall = await _async_loop_blocking(_coordinator(hass, workload, client))
+    benchmark.extra_info.update(peak_memory_bytes=peak, loop_blocking_s=stall)
+
+    def _setup() -> tuple[tuple[Any, ...], dict[str, Any]]:
+        return (_run(hass, _async_new_coordinator(hass, workload, client)),), {}
+
+    await hass.async_add_executor_job(
+        lambda: benchmark.pedantic(
+            lambda coordinator: _run(hass, _async_refresh(coordinator)),
+            setup=_setup,
+            rounds=10,
+        )
+    )
+    assert peak < PEAK_MEMORY_BUDGET
+    assert stall < LOOP_BLOCKING_BUDGET
+
+
+@pytest.mark.parametrize("workload", WORKLOADS, ids=str)
+async def test_steady_refresh(
+    hass: HomeAssistant, benchmark: Any, workload: Workload
+) -> None:
+    """Benchmark a routine poll, where nothing changed since the last one."""
+    coordinator = _coordinator(
+        hass, workload, synthetic_client(workload, datetime.date.today())
+    )
+    await _async_refresh(coordinator)
+    peak = await _async_peak_memory(coordinator)
+    stall = await _async_loop_blocking(coordinator)
+    benchmark.extra_info.update(peak_memory_bytes=peak, loop_blocking_s=stall)
+
+    await hass.async_add_executor_job(
+        lambda: benchmark.pedantic(
+            lambda: _run(hass, _async_refresh(coordinator)), rounds=50
+        )
+    )
+    assert peak < PEAK_MEMORY_BUDGET
+    assert stall < LOOP_BLOCKING_BUDGET
@@ -0,0 +1,108 @@
+"""Synthetic accounts for the MultiSport benchmarks."""
+
+from __future__ import annotations
+
+import asyncio
+import datetime
+import random
+from typing import Any, Dict, List, NamedTuple
+from unittest.mock import AsyncMock, MagicMock
+
+from custom_components.multisport.history import iter_month_keys, month_bounds
+
+FACILITIES = [f"Facility {index}" for index in range(40)]
+
+
+class Workload(NamedTuple):
+    """Size of a synthetic account."""
+
+    cards: int
+    visits_per_month: int
+    months: int
+
+    def __str__(self) -> str:
+        """Return the id used in test names and saved results."""
+        return f"{self.cards}c-{self.visits_per_month}v-{self.months}m"
+
+
+WORKLOADS = [Workload(1, 8, 1), Workload(5, 20, 12), Workload(20, 40, 24)]
+
+
+def synthetic_visits(
+    workload: Workload, today: datetime.date, seed: int
+) -> Dict[str, List[tuple[str, Dict[str, Any]]]]:
+    """Return raw visits keyed by month, each with its ISO date."""
+    rng = random.Random(seed)
+    start = today - datetime.timedelta(days=workload.months * 30)
+    months: Dict[str, List[tuple[str, Dict[str, Any]]]] = {}
+    for key in iter_month_keys(start, today):
+        first, last = month_bounds(key)
+        last = min(last, today)
+        days = sorted(
+            rng.randint(first.day, last.day) for _ in range(workload.visits_per_month)
+        )
+        months[key] = [
+            (
+                datetime.date(first.year, first.month, day).isoformat(),
+                {
+                    "date": f"{day:02d}-{first.month:02d}-{first.year:04d}",
+                    "time": f"{6 + index % 16:02d}:{rng.randrange(60):02d}",
+                    "facilityName": rng.choice(FACILITIES),
+                    "registrationMethod": "CARD",
+                },
+            )
+            for index, day in enumerate(days)
+        ]
+    return months
+
+
+def synthetic_client(workload: Workload, today: datetime.date) -> MagicMock:
+    """Return a client mock serving a synthetic account."""
+    card_ids = ["main"] + [f"companion-{index}" for index in range(workload.cards - 1)]
+    histories = {
+        card_id: synthetic_visits(workload, today, seed)
+        for seed, card_id in enumerate(card_ids)
+    }
+
+    async def _get_card_history(
+        card_id: str, date_from: str, date_to: str
+    ) -> List[Dict[str, Any]]:
+        # A real request always yields to the event loop
+        await asyncio.sleep(0)
+        return [
+            {"visits": [raw for day, raw in visits if date_from <= day <= date_to]}
+            for key, visits in histories[card_id].items()
+            if date_from[:7] <= key <= date_to[:7]
+        ]
+
+    async def _get_card_limits(card_id: str) -> Dict[str, Any]:
+        await asyncio.sleep(0)
+        return {"remainingVisits": 5}
+
+    client = MagicMock()
+    client.get_user_info = AsyncMock(return_value={"ms_products": ["main"]})
+    client.get_authorized_users = AsyncMock(
+        return_value={
+            "products": [
+                {
+                    "id": "main",
+                    "holder": {"firstName": "Jan", "lastName": "Kowalski"},
+                    "productType": "Plus",
+                }
+            ]
+        }
+    )
+    client.get_relations = AsyncMock(
+        return_value={
+            "items": [
+                {
+                    "id": card_id,
+                    "holder": {"firstName": "Anna", "lastName": card_id},
+                }
+                for card_id in card_ids[1:]
+            ]
+        }
+    )
+    client.get_card_limits = AsyncMock(side_effect=_get_card_limits)
+    client.get_card_history = AsyncMock(side_effect=_get_card_history)
+    return client
@@ -0,0 +1,318 @@
+"""Local stand-in of the MultiSport API for end-to-end and load tests.
+
+Serves the login flow and the endpoints multisport_py calls for any number
+of synthetic accounts, with configurable latency, jitter, error rate and
+token lifetime. Point the integration at it with MULTISPORT_BASE_URL, or
+run it on its own:
+
+    python tests/fake_server.py --accounts 50 --cards 4 --latency 0.2
+
+Accounts are named user0, user1, ... and all use the password "password".
+"""
+
+from __future__ import annotations
+
+import argparse
+import asyncio
+import datetime
+import itertools
+import random
+import secrets
+from collections import Counter
+from dataclasses import dataclass, field
+from typing import Any, Dict, List
+
+from aiohttp import web
+
+PASSWORD = "password"
+REDIRECT_URI = "https://app.kartamultisport.pl/"
+
+
+@dataclass
+class FakeServerConfig:
+    """Shape and behaviour of the fake API."""
+
+    accounts: int = 1
+    cards_per_account: int = 1
+    visits_per_month: int = 8
+    latency: float = 0.0  # seconds
+    jitter: float = 0.0  # seconds
+    error_rate: float = 0.0
+    token_lifetime: float | None = None  # seconds, None never expires
+    seed: int = 0
+
+
+@dataclass
+class FakeServerStats:
+    """What the fake API served."""
+
+    requests: Counter[str] = field(default_factory=Counter)
+    logins: int = 0
+    token_refreshes: int = 0
+    rejected_tokens: int = 0
+    injected_errors: int = 0
+    connections: int = 0
+
+
+class FakeMultisportServer:
+    """aiohttp application mimicking the MultiSport API."""
+
+    def __init__(self, config: FakeServerConfig | None = None) -> None:
+        """Initialize the server."""
+        self.config = config or FakeServerConfig()
+        self.stats = FakeServerStats()
+        self.base_url = ""
+        self._rng = random.Random(self.config.seed)
+        self._codes: Dict[str, str] = {}
+        # Access and refresh tokens, with their account and expiry
+        self._tokens: Dict[str, tuple[str, float | None]] = {}
+        self._refresh_tokens: Dict[str, str] = {}
+        self._connections: set[int] = set()
+        self._runner: web.AppRunner | None = None
+
+    def username(self, index: int) -> str:
+        """Return the username of an account."""
+        return f"user{index}"
+
+    def card_ids(self, username: str) -> List[str]:
+        """Return the card ids of an account, main card first."""
+        return [f"{username}-main"] + [
+            f"{username}-companion-{index}"
+            for index in range(self.config.cards_per_account - 1)
+        ]
+
+    async def async_start(self) -> str:
+        """Start serving on a free local port and return the base URL."""
+        app = web.Application(middlewares=[self._middleware])
+        app.router.add_get(
+            "/realms/sso/protocol/openid-connect/auth", self._handle_auth_page
+        )
+        app.router.add_post(
+            "/realms/sso/login-actions/authenticate", self._handle_authenticate
+        )
+        app.router.add_post(
+            "/realms/sso/protocol/openid-connect/token", self._handle_token
+        )
+        app.router.add_get(
+            "/realms/sso/protocol/openid-connect/userinfo", self._handle_user_info
+        )
+        app.router.add_get("/bam/core/v1/authorized/users", self._handle_users)
+        app.router.add_get(
+            "/bam/relations/v1/authorized/relations", self._handle_relations
+        )
+        app.router.add_get(
+            "/bam/core/v1/authorized/products/{card_id}/limits", self._handle_limits
+        )
+        app.router.add_get(
+            "/bam/core/v1/authorized/products/{card_id}/history",
+            self._handle_history,
+        )
+        self._runner = web.AppRunner(app)
+        await self._runner.setup()
+        site = web.TCPSite(self._runner, "127.0.0.1", 0)
+        await site.start()
+        port = site._server.sockets[0].getsockname()[1]  # type: ignore[union-attr]
+        self.base_url = f"http://127.0.0.1:{port}"
+        return self.base_url
+
+    async def async_stop(self) -> None:
+        """Stop serving."""
+        if self._runner is not None:
+            await self._runner.cleanup()
+            self._runner = None
+
+    def expire_tokens(self) -> None:
+        """Make every issued access token expired."""
+        self._tokens = {
+            token: (username, 0.0) for token, (username, _) in self._tokens.items()
+        }
+
+    @web.middleware
+    async def _middleware(self, request: web.Request, handler: Any) -> Any:
+        """Count requests and connections, inject latency and errors."""
+        self.stats.requests[request.match_info.route.resource.canonical] += 1  # type: ignore[union-attr]
+        transport = id(request.transport)
+        if transport not in self._connections:
+            self._connections.add(transport)
+            self.stats.connections += 1
+
+        config = self.config
+        if config.latency or config.jitter:
+            await asyncio.sleep(
+                max(0.0, config.latency + self._rng.uniform(-1, 1) * config.jitter)
+            )
+        if config.error_rate and self._rng.random() < config.error_rate:
+            self.stats.injected_errors += 1
+            raise web.HTTPServiceUnavailable()
+        return await handler(request)
+
+    def _account(self, request: web.Request) -> str:
+        """Return the account of the bearer token, rejecting expired ones."""
+        token = request.headers.get("Authorization", "").removeprefix("Bearer ")
+        username, expires = self._tokens.get(token, ("", 0.0))
+        if not username or (expires is not None and expires < _now()):
+            self.stats.rejected_tokens += 1
+            raise web.HTTPUnauthorized()
+        return username
+
+    def _issue_tokens(self, username: str) -> Dict[str, str]:
+        """Issue a new token pair for an account."""
+        access_token = secrets.token_hex(8)
+        refresh_token = secrets.token_hex(8)
+        lifetime = self.config.token_lifetime
+        self._tokens[access_token] = (
+            username,
+            _now() + lifetime if lifetime is not None else None,
+        )
+        self._refresh_tokens[refresh_token] = username
+        return {"access_token": access_token, "refresh_token": refresh_token}
+
+    async def _handle_auth_page(self, request: web.Request) -> web.Response:
+        session_code = secrets.token_hex(4)
+        return web.Response(
+            text=(
+                '<form method="post" action="'
+                f"{self.base_url}/realms/sso/login-actions/authenticate"
+                f'?session_code={session_code}&amp;execution=login">'
+            ),
+            content_type="text/html",
+        )
+
+    async def _handle_authenticate(self, request: web.Request) -> web.Response:
+        form = await request.post()
+        username = str(form.get("username"))
+        valid = [self.username(index) for index in range(self.config.accounts)]
+        if username not in valid or form.get("password") != PASSWORD:
+            return web.Response(text="Invalid username or password.")
+        self.stats.logins += 1
+        code = secrets.token_hex(8)
+        self._codes[code] = username
+        return web.Response(
+            status=302, headers={"Location": f"{REDIRECT_URI}#state=&code={code}"}
+        )
+
+    async def _handle_token(self, request: web.Request) -> web.Response:
+        form = await request.post()
+        if form.get("grant_type") == "authorization_code":
+            username = self._codes.pop(str(form.get("code")), None)
+        else:
+            self.stats.token_refreshes += 1
+            username = self._refresh_tokens.pop(str(form.get("refresh_token")), None)
+        if username is None:
+            raise web.HTTPBadRequest()
+        return web.json_response(self._issue_tokens(username))
+
+    async def _handle_user_info(self, request: web.Request) -> web.Response:
+        username = self._account(request)
+        return web.json_response({"ms_products": [self.card_ids(username)[0]]})
+
+    async def _handle_users(self, request: web.Request) -> web.Response:
+        username = self._account(request)
+        return web.json_response(
+            {
+                "products": [
+                    {
+                        "id": self.card_ids(username)[0],
+                        "holder": {"firstName": "Jan", "lastName": username},
+                        "productType": "Plus",
+                    }
+                ]
+            }
+        )
+
+    async def _handle_relations(self, request: web.Request) -> web.Response:
+        username = self._account(request)
+        return web.json_response(
+            {
+                "items": [
+                    {
+                        "id": card_id,
+                        "holder": {"firstName": "Anna", "lastName": card_id},
+                    }
+                    for card_id in self.card_ids(username)[1:]
+                ]
+            }
+        )
+
+    async def _handle_limits(self, request: web.Request) -> web.Response:
+        self._account(request)
+        return web.json_response({"remainingVisits": 10})
+
+    async def _handle_history(self, request: web.Request) -> web.Response:
+        self._account(request)
+        card_id = request.match_info["card_id"]
+        date_from = datetime.date.fromisoformat(request.query["dateFrom"])
+        date_to = datetime.date.fromisoformat(request.query["dateTo"])
+        return web.json_response(self._history(card_id, date_from, date_to))
+
+    def _history(
+        self, card_id: str, date_from: datetime.date, date_to: datetime.date
+    ) -> List[Dict[str, Any]]:
+        """Return the monthly summaries of a card, the same on every call."""
+        months: Dict[tuple[int, int], List[Dict[str, Any]]] = {}
+        day = date_from
+        while day <= date_to:
+            # Deterministic per card and day, so re-fetches are identical
+            rng = random.Random(f"{self.config.seed}-{card_id}-{day.isoformat()}")
+            if rng.random() < self.config.visits_per_month / 30:
+                months.setdefault((day.year, day.month), []).append(
+                    {
+                        "date": day.strftime("%d-%m-%Y"),
+                        "time": f"{rng.randint(6, 21):02d}:{rng.randrange(60):02d}",
+                        "facilityName": f"Facility {rng.randrange(20)}",
+                        "registrationMethod": "CARD",
+                    }
+                )
+            day += datetime.timedelta(days=1)
+        return [{"visits": visits} for visits in months.values()]
+
+
+def _now() -> float:
+    return asyncio.get_running_loop().time()
+
+
+async def _async_main(config: FakeServerConfig) -> None:
+    server = FakeMultisportServer(config)
+    base_url = await server.async_start()
+    print(f"Fake MultiSport API on {base_url}")
+    print(f"export MULTISPORT_BASE_URL={base_url}")
+    try:
+        for _ in itertools.count():
+            await asyncio.sleep(60)
+            print(
+                f"{sum(server.stats.requests.values())} requests,"
+                f" {server.stats.connections} connections,"
+                f" {server.stats.logins} logins"
+            )
+    finally:
+        await server.async_stop()
+
+
+def main() -> None:
+    """Run the fake API until interrupted."""
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    parser.add_argument("--accounts", type=int, default=1)
+    parser.add_argument("--cards", type=int, default=1)
+    parser.add_argument("--visits-per-month", type=int, default=8)
+    parser.add_argument("--latency", type=float, default=0.0)
+    parser.add_argument("--jitter", type=float, default=0.0)
+    parser.add_argument("--error-rate", type=float, default=0.0)
+    parser.add_argument("--token-lifetime", type=float, default=None)
+    args = parser.parse_args()
+    asyncio.run(
+        _async_main(
+            FakeServerConfig(
+                accounts=args.accounts,
+                cards_per_account=args.cards,
+                visits_per_month=args.visits_per_month,
+                latency=args.latency,
+                jitter=args.jitter,
+                error_rate=args.error_rate,
+                token_lifetime=args.token_lifetime,
+            )
+        )
+    )
+
+
+if __name__ == "__main__":
+    main()
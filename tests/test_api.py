@@ -0,0 +1,134 @@
+"""Test the MultiSport API wrapper."""
+
+import asyncio
+from unittest.mock import AsyncMock, patch
+
+import pytest
+from homeassistant.core import HomeAssistant
+from multisport_py import MultisportError
+
+from custom_components.multisport.api import (
+    MultisportApi,
+    async_get_session,
+    async_hand_off_api,
+)
+
+
+async def test_entries_share_session_and_serialize_logins(
+    hass: HomeAssistant,
+) -> None:
+    """Test all accounts share one HTTP client and log in one at a time."""
+    session = async_get_session(hass)
+    in_flight = 0
+    peak = 0
+
+    async def _login(self) -> None:
+        nonlocal in_flight, peak
+        in_flight += 1
+        peak = max(peak, in_flight)
+        session.http_client.cookies.set("KC_RESTART", self.username)
+        await asyncio.sleep(0)
+        in_flight -= 1
+
+    apis = [MultisportApi(hass, f"user{index}", "password") for index in range(3)]
+    with patch("multisport_py.MultisportClient.login", _login):
+        assert all(await asyncio.gather(*(api.async_authenticate() for api in apis)))
+
+    assert peak == 1
+    assert all(api.client.http_client is session.http_client for api in apis)
+    # Login cookies of one account are not left behind for the next one
+    assert not session.http_client.cookies
+
+    await apis[0].async_close()
+    assert apis[0].client is None
+    assert not session.http_client.is_closed
+
+
+async def test_tokens_reused_after_restart(
+    hass: HomeAssistant, hass_storage: dict
+) -> None:
+    """Test persisted tokens replace the password login of the next run."""
+
+    async def _login(self) -> None:
+        self.access_token, self.refresh_token = "access", "refresh"
+
+    with patch("multisport_py.MultisportClient.login", _login):
+        api = MultisportApi(hass, "user", "password", entry_id="entry")
+        assert await api.async_authenticate()
+        await api.async_close()
+
+    stored = hass_storage["multisport.entry.auth"]["data"]
+    assert stored["refresh_token"] == "refresh"
+
+    with patch("multisport_py.MultisportClient.login", AsyncMock()) as login:
+        api = MultisportApi(hass, "user", "password", entry_id="entry")
+        assert await api.async_authenticate()
+
+    login.assert_not_awaited()
+    assert api.client.access_token == "access"
+    assert api.client.refresh_token == "refresh"
+
+
+async def test_config_flow_client_handed_off(hass: HomeAssistant) -> None:
+    """Test the entry takes over the client authenticated by the config flow."""
+    with patch("multisport_py.MultisportClient.login", AsyncMock()) as login:
+        flow_api = MultisportApi(hass, "user", "password")
+        assert await flow_api.async_authenticate()
+        async_hand_off_api(hass, flow_api)
+
+        api = MultisportApi(hass, "user", "password", entry_id="entry")
+        assert await api.async_authenticate()
+
+    login.assert_awaited_once()
+    assert api.client is flow_api.client
+
+
+async def test_concurrent_token_refreshes_single_flight(hass: HomeAssistant) -> None:
+    """Test requests rejected together share a single token refresh."""
+    refreshes = 0
+
+    async def _login(self) -> None:
+        self.access_token = "expired"
+
+    async def _refresh(self) -> None:
+        nonlocal refreshes
+        refreshes += 1
+        await asyncio.sleep(0)
+        self.access_token = f"access-{refreshes}"
+
+    with (
+        patch("multisport_py.MultisportClient.login", _login),
+        patch("multisport_py.MultisportClient._refresh_access_token", _refresh),
+    ):
+        api = MultisportApi(hass, "user", "password")
+        assert await api.async_authenticate()
+        await asyncio.gather(*(api.client._refresh_access_token() for _ in range(4)))
+
+    assert refreshes == 1
+    assert api.client.access_token == "access-1"
+
+
+async def test_client_calls_instrumented(hass: HomeAssistant) -> None:
+    """Test client calls are counted with their latency, errors and volume."""
+    with (
+        patch("multisport_py.MultisportClient.login", AsyncMock()),
+        patch(
+            "multisport_py.MultisportClient.get_card_limits",
+            AsyncMock(side_effect=[{"remainingVisits": 3}, MultisportError("down")]),
+        ),
+        # Measure the failure as is, without retries
+        patch("custom_components.multisport.resilience.RETRY_ATTEMPTS", 1),
+    ):
+        api = MultisportApi(hass, "user", "password")
+        assert await api.async_authenticate()
+        await api.client.get_card_limits("card")
+        with pytest.raises(MultisportError):
+            await api.client.get_card_limits("card")
+
+    limits = api.stats.as_dict()["endpoints"]["get_card_limits"]
+    assert limits["calls"] == 2
+    assert limits["errors"] == 1
+    assert limits["bytes_received"] == len('{"remainingVisits":3}')
+    assert sum(limits["latency_ms"].values()) == 2
+    assert api.stats.calls == 3
+    assert api.stats.errors == 1
@@ -0,0 +1,114 @@
+"""Test the request budgets in front of the MultiSport client."""
+
+from typing import Any, Awaitable, Callable
+from unittest.mock import patch
+
+import httpx
+import pytest
+
+from custom_components.multisport.budget import (
+    RequestBudget,
+    RequestDeferredError,
+    RequestScheduler,
+    async_admit_request,
+)
+from custom_components.multisport.resilience import CircuitBreakers
+
+
+def _http_client(statuses: list[int] | None = None) -> httpx.AsyncClient:
+    """Return an HTTP client answering with the given statuses, then 200."""
+    pending = list(statuses or [])
+
+    def _handler(request: httpx.Request) -> httpx.Response:
+        return httpx.Response(pending.pop(0) if pending else 200, json={})
+
+    return httpx.AsyncClient(
+        transport=httpx.MockTransport(_handler),
+        event_hooks={"request": [async_admit_request]},
+    )
+
+
+def _get(http: httpx.AsyncClient, requests: int = 1) -> Callable[..., Awaitable[Any]]:
+    """Return a client call making a number of requests."""
+
+    async def _call(*args: Any) -> Any:
+        for _ in range(requests):
+            response = await http.get("https://api.test/endpoint")
+            response.raise_for_status()
+        return response.json()
+
+    return _call
+
+
+async def test_low_priority_calls_deferred_first() -> None:
+    """Test topology, then history calls are deferred as the budget runs low."""
+    scheduler = RequestScheduler(RequestBudget(10), RequestBudget(100))
+    http = _http_client()
+    limits = scheduler.guard("get_card_limits", _get(http))
+    history = scheduler.guard("get_card_history", _get(http))
+    relations = scheduler.guard("get_relations", _get(http))
+
+    for _ in range(8):
+        await limits("card")
+    assert scheduler.remaining == 2
+    with pytest.raises(RequestDeferredError):
+        await relations()
+    await history("card")
+    with pytest.raises(RequestDeferredError):
+        await history("card")
+    await limits("card")
+    with pytest.raises(RequestDeferredError):
+        await limits("card")
+
+    assert scheduler.account.deferred == 3
+    # Deferred calls cost nothing
+    assert scheduler.domain.remaining == 90
+
+
+async def test_every_attempt_and_login_counted() -> None:
+    """Test retries and the requests of a login are charged one by one."""
+    scheduler = RequestScheduler(RequestBudget(10), RequestBudget(100))
+    http = _http_client([503, 502])
+    breakers = CircuitBreakers()
+    limits = scheduler.guard(
+        "get_card_limits", breakers.guard("get_card_limits", _get(http))
+    )
+    login = scheduler.track(_get(http, requests=3))
+
+    with patch("custom_components.multisport.resilience.backoff_delay", return_value=0):
+        await limits("card")
+    assert scheduler.account.remaining == 7
+
+    await login()
+    assert scheduler.account.remaining == 4
+    assert scheduler.domain.remaining == 94
+
+    # A retry the budget cannot afford is deferred, not retried
+    http = _http_client([503])
+    limits = scheduler.guard(
+        "get_card_limits", breakers.guard("get_card_limits", _get(http))
+    )
+    scheduler.account.limit = 7
+    with (
+        patch("custom_components.multisport.resilience.backoff_delay", return_value=0),
+        pytest.raises(RequestDeferredError),
+    ):
+        await limits("card")
+    assert breakers.breakers["get_card_limits"].failures == 0
+
+
+async def test_domain_budget_shared_and_window_slides() -> None:
+    """Test accounts draw on one domain budget that frees up after an hour."""
+    domain = RequestBudget(2)
+    first = RequestScheduler(RequestBudget(10), domain)
+    second = RequestScheduler(RequestBudget(10), domain)
+
+    with patch("custom_components.multisport.budget.time.monotonic", return_value=0):
+        first.admit(0, "get_card_limits")
+        second.admit(0, "get_card_limits")
+        with pytest.raises(RequestDeferredError):
+            first.admit(0, "get_card_limits")
+
+    with patch("custom_components.multisport.budget.time.monotonic", return_value=3600):
+        assert first.remaining == 2
+        first.admit(0, "get_card_limits")
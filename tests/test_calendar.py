@@ -0,0 +1,70 @@
+"""Test the MultiSport visits calendar."""
+
+from datetime import datetime, timedelta
+from unittest.mock import AsyncMock, MagicMock
+
+from homeassistant.core import HomeAssistant
+from homeassistant.util import dt as dt_util
+from pytest_homeassistant_custom_component.common import MockConfigEntry
+
+from custom_components.multisport.calendar import MultisportVisitsCalendar
+from custom_components.multisport.const import DOMAIN
+from custom_components.multisport.coordinator import MultisportDataUpdateCoordinator
+from custom_components.multisport.entity import card_device_info
+from custom_components.multisport.metrics import ApiStats
+
+
+async def test_events_of_a_range(hass: HomeAssistant) -> None:
+    """Test the visits overlapping a range are returned as events."""
+    entry = MockConfigEntry(domain=DOMAIN, data={"username": "u", "password": "p"})
+    entry.add_to_hass(hass)
+    client = MagicMock()
+    client.get_user_info = AsyncMock(return_value={"ms_products": ["main"]})
+    client.get_authorized_users = AsyncMock(
+        return_value={
+            "products": [
+                {"id": "main", "holder": {"firstName": "Jan", "lastName": "Kowalski"}}
+            ]
+        }
+    )
+    client.get_relations = AsyncMock(return_value={"items": []})
+    client.get_card_limits = AsyncMock(return_value={"remainingVisits": 5})
+    client.get_card_history = AsyncMock(
+        return_value=[
+            {
+                "visits": [
+                    {"date": date, "time": time, "facilityName": facility}
+                    for date, time, facility in (
+                        ("30-12-2025", "18:00", "Gym"),
+                        ("31-12-2025", "23:30", "Pool"),
+                        ("14-01-2026", "07:15", "Gym"),
+                        ("01-02-2026", "10:00", "Sauna"),
+                    )
+                ]
+            }
+        ]
+    )
+    api = MagicMock(client=client, stats=ApiStats())
+    coordinator = MultisportDataUpdateCoordinator(
+        hass, api=api, entry=entry, update_interval=timedelta(hours=1)
+    )
+    await coordinator.async_refresh()
+    card = coordinator.data["main"]
+    calendar = MultisportVisitsCalendar(
+        coordinator, "main", card_device_info(card), card.holder_name
+    )
+
+    time_zone = dt_util.get_default_time_zone()
+    events = await calendar.async_get_events(
+        hass,
+        datetime(2026, 1, 1, tzinfo=time_zone),
+        datetime(2026, 2, 1, tzinfo=time_zone),
+    )
+
+    # The late visit of New Year's Eve lasts into the range
+    assert [(event.summary, event.start.day) for event in events] == [
+        ("Pool", 31),
+        ("Gym", 14),
+    ]
+    assert events[1].end - events[1].start == timedelta(hours=1)
+    assert calendar.event is None
@@ -5,6 +5,7 @@ from unittest.mock import patch
 from homeassistant import config_entries, setup
 from homeassistant.core import HomeAssistant
 from homeassistant.data_entry_flow import FlowResultType
+from pytest_homeassistant_custom_component.common import MockConfigEntry
 
 from custom_components.multisport.const import DOMAIN
 
@@ -18,9 +19,12 @@ async def test_form(hass: HomeAssistant) -> None:
     assert result["type"] == FlowResultType.FORM
     assert result["errors"] == {}
 
-    with patch(
-        "custom_components.multisport.config_flow.validate_input",
-        return_value={"title": "test-username"},
+    with (
+        patch(
+            "custom_components.multisport.config_flow.validate_input",
+            return_value={"title": "test-username"},
+        ),
+        patch("custom_components.multisport.async_setup_entry", return_value=True),
     ):
         result2 = await hass.config_entries.flow.async_configure(
             result["flow_id"],
@@ -37,3 +41,33 @@ async def test_form(hass: HomeAssistant) -> None:
         "username": "test-username",
         "password": "test-password",
     }
+
+
+async def test_reauth(hass: HomeAssistant) -> None:
+    """Test a rejected session is fixed by entering the password again."""
+    entry = MockConfigEntry(
+        domain=DOMAIN,
+        unique_id="test-username",
+        data={"username": "test-username", "password": "old-password"},
+    )
+    entry.add_to_hass(hass)
+
+    result = await entry.start_reauth_flow(hass)
+    assert result["type"] == FlowResultType.FORM
+    assert result["step_id"] == "reauth_confirm"
+
+    with (
+        patch(
+            "custom_components.multisport.config_flow.validate_input",
+            return_value={"title": "test-username"},
+        ),
+        patch("custom_components.multisport.async_setup_entry", return_value=True),
+    ):
+        result2 = await hass.config_entries.flow.async_configure(
+            result["flow_id"], {"password": "new-password"}
+        )
+        await hass.async_block_till_done()
+
+    assert result2["type"] == FlowResultType.ABORT
+    assert result2["reason"] == "reauth_successful"
+    assert entry.data["password"] == "new-password"
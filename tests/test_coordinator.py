@@ -0,0 +1,448 @@
+"""Test the MultiSport data update coordinator."""
+
+import asyncio
+from datetime import datetime, timedelta
+from unittest.mock import AsyncMock, MagicMock
+
+import pytest
+from freezegun.api import FrozenDateTimeFactory
+from homeassistant.core import HomeAssistant
+from homeassistant.exceptions import ConfigEntryAuthFailed
+from homeassistant.util import dt as dt_util
+from pytest_homeassistant_custom_component.common import (
+    MockConfigEntry,
+    async_capture_events,
+    async_fire_time_changed,
+)
+
+from custom_components.multisport.budget import RequestDeferredError
+from custom_components.multisport.const import (
+    CONF_MAX_CONCURRENT_REQUESTS,
+    DOMAIN,
+    EVENT_VISIT,
+)
+from custom_components.multisport.coordinator import MultisportDataUpdateCoordinator
+from multisport_py import AuthenticationError, MultisportError
+
+
+def _mock_client(companions: int = 2) -> MagicMock:
+    """Return a client mock for an account with a main card and companions."""
+    client = MagicMock()
+    client.get_user_info = AsyncMock(return_value={"ms_products": ["main"]})
+    client.get_authorized_users = AsyncMock(
+        return_value={
+            "products": [
+                {
+                    "id": "main",
+                    "holder": {"firstName": "Jan", "lastName": "Kowalski"},
+                    "productType": "Plus",
+                }
+            ]
+        }
+    )
+    client.get_relations = AsyncMock(
+        return_value={
+            "items": [
+                {
+                    "id": f"companion-{index}",
+                    "holder": {"firstName": "Anna", "lastName": f"Nowak {index}"},
+                }
+                for index in range(companions)
+            ]
+        }
+    )
+    client.get_card_limits = AsyncMock(return_value={"remainingVisits": 5})
+    client.get_card_history = AsyncMock(return_value=[])
+    return client
+
+
+def _coordinator(
+    hass: HomeAssistant, client: MagicMock, options: dict | None = None
+) -> MultisportDataUpdateCoordinator:
+    entry = MockConfigEntry(
+        domain=DOMAIN, entry_id="entry", data={}, options=options or {}
+    )
+    entry.add_to_hass(hass)
+    api = MagicMock()
+    api.client = client
+    api.async_reauthenticate = AsyncMock()
+    return MultisportDataUpdateCoordinator(
+        hass, api=api, entry=entry, update_interval=timedelta(hours=1)
+    )
+
+
+async def test_cards_fetched_concurrently_within_limit(hass: HomeAssistant) -> None:
+    """Test per-card requests fan out but never exceed the configured limit."""
+    client = _mock_client(companions=5)
+    in_flight = 0
+    peak = 0
+
+    async def _get_card_limits(card_id: str) -> dict:
+        nonlocal in_flight, peak
+        in_flight += 1
+        peak = max(peak, in_flight)
+        await asyncio.sleep(0)
+        in_flight -= 1
+        return {"remainingVisits": 3}
+
+    client.get_card_limits = AsyncMock(side_effect=_get_card_limits)
+    coordinator = _coordinator(hass, client, {CONF_MAX_CONCURRENT_REQUESTS: 2})
+
+    data = await coordinator._async_update_data()
+
+    assert len(data) == 6
+    assert peak == 2
+    assert all(card.remaining_visits == 3 for card in data.values())
+
+
+async def test_failing_card_does_not_cancel_others(hass: HomeAssistant) -> None:
+    """Test one card failing keeps the remaining cards updated."""
+    client = _mock_client(companions=2)
+
+    async def _get_card_limits(card_id: str) -> dict:
+        if card_id == "companion-0":
+            raise MultisportError("boom")
+        return {"remainingVisits": 1}
+
+    client.get_card_limits = AsyncMock(side_effect=_get_card_limits)
+    coordinator = _coordinator(hass, client)
+
+    data = await coordinator._async_update_data()
+
+    assert set(data) == {"main", "companion-1"}
+
+
+async def test_snapshot_restored_on_next_start(
+    hass: HomeAssistant, hass_storage: dict
+) -> None:
+    """Test the last good data is persisted and restored without the API."""
+    coordinator = _coordinator(hass, _mock_client(companions=1))
+    await coordinator.async_refresh()
+    async_fire_time_changed(hass, dt_util.utcnow() + timedelta(minutes=1))
+    await hass.async_block_till_done()
+
+    snapshot = hass_storage["multisport.entry.snapshot"]["data"]
+    assert set(snapshot["data"]) == {"main", "companion-0"}
+    assert "history" not in snapshot["data"]["main"]
+
+    restored = _coordinator(hass, _mock_client())
+    restored.api.client = None
+    assert await restored.async_restore_snapshot()
+    assert restored.data_restored
+    assert restored.data["main"].remaining_visits == 5
+    assert restored.last_updated_time == coordinator.last_updated_time
+
+
+async def test_restored_snapshot_rolled_over_to_today(
+    hass: HomeAssistant, hass_storage: dict, freezer: FrozenDateTimeFactory
+) -> None:
+    """Test a snapshot saved before midnight is restored with today's values."""
+    freezer.move_to(
+        datetime(2026, 3, 15, 23, 30, tzinfo=dt_util.get_default_time_zone())
+    )
+    client = _mock_client(companions=0)
+    client.get_card_history = AsyncMock(
+        return_value=[
+            {"visits": [{"date": "15-03-2026", "time": "18:00", "facilityName": "Gym"}]}
+        ]
+    )
+    coordinator = _coordinator(hass, client)
+    await coordinator.async_refresh()
+    freezer.tick(timedelta(minutes=1))
+    async_fire_time_changed(hass)
+    await hass.async_block_till_done()
+    assert coordinator.data["main"].used_today
+
+    # Restarted on Monday, before any poll
+    freezer.move_to(datetime(2026, 3, 16, 8, 0, tzinfo=dt_util.get_default_time_zone()))
+    restored = _coordinator(hass, _mock_client())
+    restored.api.client = None
+    assert await restored.async_restore_snapshot()
+
+    card = restored.data["main"]
+    assert not card.used_today
+    assert card.analytics["visits_this_week"] == 0
+    assert card.last_visit_state == "Gym 15-03-2026 18:00"
+    assert card.remaining_visits == 5
+
+
+async def test_failing_card_keeps_persisted_history(
+    hass: HomeAssistant, hass_storage: dict, freezer: FrozenDateTimeFactory
+) -> None:
+    """Test a card failing on the first refresh keeps its stored visits."""
+    freezer.move_to(datetime(2026, 3, 16, 8, 0, tzinfo=dt_util.get_default_time_zone()))
+    client = _mock_client(companions=1)
+    client.get_card_history = AsyncMock(
+        return_value=[
+            {"visits": [{"date": "15-03-2026", "time": "18:00", "facilityName": "Gym"}]}
+        ]
+    )
+    coordinator = _coordinator(hass, client)
+    await coordinator.async_refresh()
+    freezer.tick(timedelta(minutes=1))
+    async_fire_time_changed(hass)
+    await hass.async_block_till_done()
+
+    # Restarted, and the companion card fails on the first refresh
+    client = _mock_client(companions=1)
+
+    async def _get_card_limits(card_id: str) -> dict:
+        if card_id == "companion-0":
+            raise MultisportError("boom")
+        return {"remainingVisits": 1}
+
+    client.get_card_limits = AsyncMock(side_effect=_get_card_limits)
+    restarted = _coordinator(hass, client)
+    await restarted.async_refresh()
+    freezer.tick(timedelta(minutes=1))
+    async_fire_time_changed(hass)
+    await hass.async_block_till_done()
+
+    assert set(restarted.data) == {"main"}
+    assert restarted.history.visits("companion-0").latest() is not None
+    cards = hass_storage["multisport.entry.history"]["data"]["cards"]
+    assert "companion-0" in cards
+
+
+async def test_topology_cached_between_refreshes(hass: HomeAssistant) -> None:
+    """Test routine polls reuse the card list and only fetch per-card data."""
+    client = _mock_client(companions=1)
+    coordinator = _coordinator(hass, client)
+
+    await coordinator._async_update_data()
+    await coordinator._async_update_data()
+
+    client.get_user_info.assert_awaited_once()
+    client.get_authorized_users.assert_awaited_once()
+    client.get_relations.assert_awaited_once()
+    assert client.get_card_limits.await_count == 4
+
+    # Forcing a topology refresh fetches the card list again
+    coordinator._topology_updated = None
+    await coordinator._async_update_data()
+    assert client.get_user_info.await_count == 2
+
+
+async def test_failed_topology_call_cancels_its_sibling(
+    hass: HomeAssistant,
+) -> None:
+    """Test a failing relations call cancels the authorized users call."""
+    client = _mock_client()
+    cancelled = asyncio.Event()
+
+    async def _get_authorized_users() -> dict:
+        try:
+            await asyncio.Event().wait()
+        except asyncio.CancelledError:
+            cancelled.set()
+            raise
+        return {}
+
+    client.get_authorized_users = AsyncMock(side_effect=_get_authorized_users)
+    client.get_relations = AsyncMock(side_effect=MultisportError("boom"))
+    coordinator = _coordinator(hass, client)
+
+    with pytest.raises(MultisportError):
+        await coordinator._async_fetch_topology(client)
+    await asyncio.sleep(0)
+
+    assert cancelled.is_set()
+
+
+async def test_card_fingerprints_track_changes(
+    hass: HomeAssistant, freezer: FrozenDateTimeFactory
+) -> None:
+    """Test only cards whose data changed get a new fingerprint."""
+    client = _mock_client(companions=1)
+    coordinator = _coordinator(hass, client)
+    await coordinator.async_refresh()
+    first_updated = coordinator.last_updated_time
+    main = coordinator.card_fingerprint("main")
+    companion = coordinator.card_fingerprint("companion-0")
+    assert main is not None and companion is not None
+
+    freezer.tick(timedelta(hours=1))
+    await coordinator.async_refresh()
+    assert coordinator.card_fingerprint("main") == main
+    assert coordinator.card_changed_at("main") == first_updated
+
+    client.get_card_limits = AsyncMock(
+        side_effect=lambda card_id: {"remainingVisits": 4 if card_id == "main" else 5}
+    )
+    freezer.tick(timedelta(hours=1))
+    await coordinator.async_refresh()
+    assert coordinator.card_fingerprint("main") != main
+    assert coordinator.card_changed_at("main") == coordinator.last_updated_time
+    assert coordinator.card_fingerprint("companion-0") == companion
+    assert coordinator.card_changed_at("companion-0") == first_updated
+
+
+async def test_staggered_entries_poll_in_their_own_slot(
+    hass: HomeAssistant, freezer: FrozenDateTimeFactory
+) -> None:
+    """Test a staggered entry schedules its next refresh in its phase slot."""
+    freezer.move_to("2026-03-10 12:10:00+00:00")
+    coordinator = _coordinator(hass, _mock_client(companions=0))
+    coordinator.phase = 0.5
+
+    await coordinator._async_update_data()
+
+    # The slots of the second of two hourly entries are at half past
+    assert coordinator.update_interval == timedelta(minutes=80)
+    assert coordinator.polling_interval == timedelta(hours=1)
+
+    coordinator.phase = None
+    await coordinator._async_update_data()
+    assert coordinator.update_interval == timedelta(hours=1)
+
+
+async def test_rejected_session_relogs_in_and_retries_once(
+    hass: HomeAssistant,
+) -> None:
+    """Test an auth failure triggers one re-login before escalating."""
+    client = _mock_client(companions=0)
+    client.get_card_limits = AsyncMock(
+        side_effect=[AuthenticationError("expired"), {"remainingVisits": 2}]
+    )
+    coordinator = _coordinator(hass, client)
+
+    data = await coordinator._async_update_data()
+
+    coordinator.api.async_reauthenticate.assert_awaited_once()
+    assert data["main"].remaining_visits == 2
+
+    client.get_card_limits = AsyncMock(side_effect=AuthenticationError("rejected"))
+    with pytest.raises(ConfigEntryAuthFailed):
+        await coordinator._async_update_data()
+    assert coordinator.api.async_reauthenticate.await_count == 2
+
+
+async def test_unchanged_responses_reuse_card_data(hass: HomeAssistant) -> None:
+    """Test a card is not rebuilt when its responses did not change."""
+    client = _mock_client(companions=0)
+    coordinator = _coordinator(hass, client)
+    await coordinator.async_refresh()
+    card = coordinator.data["main"]
+
+    await coordinator.async_refresh()
+    assert coordinator.data["main"] is card
+
+    client.get_card_limits = AsyncMock(return_value={"remainingVisits": 3})
+    await coordinator.async_refresh()
+    assert coordinator.data["main"].remaining_visits == 3
+
+
+async def test_new_visits_fire_events_once(
+    hass: HomeAssistant, freezer: FrozenDateTimeFactory
+) -> None:
+    """Test each new visit fires one event, also across restarts."""
+    await hass.config.async_set_time_zone("UTC")
+    freezer.move_to("2026-03-10 12:00:00+00:00")
+    visits = [{"date": "10-03-2026", "time": "07:00", "facilityName": "Gym"}]
+    client = _mock_client(companions=0)
+    client.get_card_history = AsyncMock(
+        side_effect=lambda *args, **kwargs: [{"visits": list(visits)}]
+    )
+    events = async_capture_events(hass, EVENT_VISIT)
+
+    coordinator = _coordinator(hass, client)
+    await coordinator.async_refresh()
+    # The visits found on the first sync are history, not check-ins
+    assert events == []
+
+    visits.append(
+        {
+            "date": "10-03-2026",
+            "time": "11:30",
+            "facilityName": "Pool",
+            "registrationMethod": "NFC",
+        }
+    )
+    await coordinator.async_refresh()
+    await coordinator.async_refresh()
+    await hass.async_block_till_done()
+
+    assert [event.data for event in events] == [
+        {
+            "entry_id": "entry",
+            "card_id": "main",
+            "holder": "Jan Kowalski",
+            "facility": "Pool",
+            "timestamp": "2026-03-10T11:30:00+00:00",
+            "registration_method": "NFC",
+        }
+    ]
+
+    # Persisted visits are not reported again after a restart
+    async_fire_time_changed(hass, dt_util.utcnow() + timedelta(minutes=1))
+    await hass.async_block_till_done()
+    visits.append({"date": "10-03-2026", "time": "11:45", "facilityName": "Sauna"})
+    restarted = MultisportDataUpdateCoordinator(
+        hass,
+        api=coordinator.api,
+        entry=coordinator.entry,
+        update_interval=timedelta(hours=1),
+    )
+    await restarted.async_refresh()
+    await hass.async_block_till_done()
+    assert [event.data["facility"] for event in events] == ["Pool", "Sauna"]
+
+
+async def test_day_rolls_over_without_polling(
+    hass: HomeAssistant, freezer: FrozenDateTimeFactory
+) -> None:
+    """Test values relative to the day change at local midnight from stored visits."""
+    freezer.move_to(
+        datetime(2026, 3, 15, 23, 30, tzinfo=dt_util.get_default_time_zone())
+    )
+    client = _mock_client(companions=0)
+    client.get_card_history = AsyncMock(
+        return_value=[
+            {"visits": [{"date": "15-03-2026", "time": "18:00", "facilityName": "Gym"}]}
+        ]
+    )
+    coordinator = _coordinator(hass, client)
+    await coordinator.async_refresh()
+    card = coordinator.data["main"]
+    assert card.used_today
+    assert card.analytics["visits_this_week"] == 1
+    calls = client.get_card_history.await_count + client.get_card_limits.await_count
+
+    # Sunday night, the next day starts a new week
+    freezer.move_to(datetime(2026, 3, 16, 0, 0, tzinfo=dt_util.get_default_time_zone()))
+    coordinator.async_roll_over_day()
+
+    card = coordinator.data["main"]
+    assert not card.used_today
+    assert card.analytics["visits_this_week"] == 0
+    assert card.analytics["visits_this_month"] == 1
+    assert card.remaining_visits == 5
+    assert coordinator.card_changed_at("main") == dt_util.utcnow()
+    assert (
+        client.get_card_history.await_count + client.get_card_limits.await_count
+        == calls
+    )
+
+
+async def test_deferred_import_retries_once(
+    hass: HomeAssistant, freezer: FrozenDateTimeFactory
+) -> None:
+    """Test repeated deferrals of a history import keep a single retry."""
+    coordinator = _coordinator(hass, _mock_client(companions=0))
+    coordinator.api.scheduler.check = MagicMock(
+        side_effect=RequestDeferredError("budget exhausted")
+    )
+    coordinator.history.async_queue_backfill(
+        "main", dt_util.now().date() - timedelta(days=60), dt_util.now().date()
+    )
+
+    await coordinator._async_import_history()
+    await coordinator._async_import_history()
+    assert coordinator.backfill_error == "budget exhausted"
+
+    coordinator.async_resume_history_import = MagicMock()
+    freezer.tick(timedelta(hours=1))
+    async_fire_time_changed(hass)
+    await hass.async_block_till_done()
+
+    coordinator.async_resume_history_import.assert_called_once()
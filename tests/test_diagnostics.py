@@ -0,0 +1,50 @@
+"""Test the MultiSport diagnostics."""
+
+from datetime import timedelta
+from unittest.mock import AsyncMock, MagicMock
+
+from homeassistant.core import HomeAssistant
+from pytest_homeassistant_custom_component.common import MockConfigEntry
+
+from custom_components.multisport.const import DOMAIN
+from custom_components.multisport.coordinator import MultisportDataUpdateCoordinator
+from custom_components.multisport.diagnostics import (
+    async_get_config_entry_diagnostics,
+)
+from custom_components.multisport.metrics import ApiStats
+
+
+async def test_diagnostics_redacted(hass: HomeAssistant) -> None:
+    """Test the download holds the figures but no personal data."""
+    entry = MockConfigEntry(
+        domain=DOMAIN,
+        title="jan@example.com",
+        data={"username": "jan@example.com", "password": "secret"},
+    )
+    entry.add_to_hass(hass)
+    client = MagicMock()
+    client.get_user_info = AsyncMock(return_value={"ms_products": ["main"]})
+    client.get_authorized_users = AsyncMock(
+        return_value={
+            "products": [
+                {"id": "main", "holder": {"firstName": "Jan", "lastName": "Kowalski"}}
+            ]
+        }
+    )
+    client.get_relations = AsyncMock(return_value={"items": []})
+    client.get_card_limits = AsyncMock(return_value={"remainingVisits": 5})
+    client.get_card_history = AsyncMock(return_value=[])
+    api = MagicMock(client=client, stats=ApiStats())
+    coordinator = MultisportDataUpdateCoordinator(
+        hass, api=api, entry=entry, update_interval=timedelta(hours=1)
+    )
+    await coordinator.async_refresh()
+    hass.data.setdefault(DOMAIN, {})[entry.entry_id] = coordinator
+
+    diagnostics = await async_get_config_entry_diagnostics(hass, entry)
+
+    assert diagnostics["api"]["refreshes"] == 1
+    assert diagnostics["coordinator"]["cards"][0]["remaining_visits"] == 5
+    dump = repr(diagnostics)
+    for secret in ("jan@example.com", "secret", "Kowalski", "'main'"):
+        assert secret not in dump
@@ -0,0 +1,300 @@
+"""Test the MultiSport integration end to end against the fake API."""
+
+import asyncio
+import pstats
+from collections.abc import AsyncGenerator
+from datetime import date, timedelta
+from unittest.mock import patch
+
+import pytest
+from freezegun.api import FrozenDateTimeFactory
+from homeassistant.config_entries import ConfigEntryState
+from homeassistant.const import CONF_PASSWORD, CONF_USERNAME
+from homeassistant.core import HomeAssistant
+from homeassistant.exceptions import ServiceValidationError
+from homeassistant.helpers import device_registry as dr
+from homeassistant.helpers import entity_registry as er
+from pytest_homeassistant_custom_component.common import (
+    MockConfigEntry,
+    async_fire_time_changed,
+)
+
+from custom_components.multisport.const import (
+    ATTR_CARD_ID,
+    ATTR_ENTRY_ID,
+    ATTR_PSTATS,
+    ATTR_START_DATE,
+    DEFAULT_HISTORY_DAYS,
+    DOMAIN,
+    SERVICE_FORCE_UPDATE,
+    SERVICE_IMPORT_HISTORY,
+    SERVICE_PROFILE_REFRESH,
+)
+from custom_components.multisport.coordinator import CARD_RETIRE_REFRESHES
+from custom_components.multisport.history import iter_month_keys
+from custom_components.multisport.devtools import (
+    DATA_CASSETTE,
+    ENV_BASE_URL,
+    ENV_RECORD,
+    ENV_REPLAY,
+)
+
+from fake_server import PASSWORD, FakeMultisportServer, FakeServerConfig
+
+
+@pytest.fixture
+async def server(
+    socket_enabled: None, monkeypatch: pytest.MonkeyPatch
+) -> AsyncGenerator[FakeMultisportServer]:
+    """Serve the fake API for three accounts with two cards each."""
+    server = FakeMultisportServer(FakeServerConfig(accounts=3, cards_per_account=2))
+    monkeypatch.setenv(ENV_BASE_URL, await server.async_start())
+    yield server
+    await server.async_stop()
+
+
+async def _setup_entries(
+    hass: HomeAssistant, server: FakeMultisportServer
+) -> list[MockConfigEntry]:
+    entries = []
+    for index in range(server.config.accounts):
+        username = server.username(index)
+        entry = MockConfigEntry(
+            domain=DOMAIN,
+            title=username,
+            unique_id=username,
+            data={CONF_USERNAME: username, CONF_PASSWORD: PASSWORD},
+        )
+        entry.add_to_hass(hass)
+        entries.append(entry)
+    for entry in entries:
+        # Setting up the integration also sets up the entries added before
+        if entry.state is ConfigEntryState.NOT_LOADED:
+            assert await hass.config_entries.async_setup(entry.entry_id)
+    await hass.async_block_till_done()
+    assert all(entry.state is ConfigEntryState.LOADED for entry in entries)
+    return entries
+
+
+def _history_requests(server: FakeMultisportServer) -> int:
+    return sum(
+        count for path, count in server.stats.requests.items() if "history" in path
+    )
+
+
+def _remaining_visits(hass: HomeAssistant) -> list[str]:
+    return [
+        state.state
+        for state in hass.states.async_all("sensor")
+        if state.entity_id.endswith("remaining_visits_this_month")
+    ]
+
+
+async def test_entries_set_up_against_fake_api(
+    hass: HomeAssistant, server: FakeMultisportServer
+) -> None:
+    """Test several accounts log in once each and share connections."""
+    await _setup_entries(hass, server)
+
+    assert _remaining_visits(hass) == ["10"] * 6
+    assert server.stats.logins == 3
+    # The shared session keeps its connections alive across accounts
+    assert server.stats.connections < sum(server.stats.requests.values())
+
+
+async def test_expired_token_refreshed(
+    hass: HomeAssistant, server: FakeMultisportServer
+) -> None:
+    """Test a rejected token is refreshed without a new password login."""
+    entries = await _setup_entries(hass, server)
+    server.expire_tokens()
+
+    coordinator = hass.data[DOMAIN][entries[0].entry_id]
+    await coordinator.async_refresh()
+
+    assert coordinator.last_update_success
+    assert server.stats.token_refreshes == 1
+    assert server.stats.logins == 3
+
+
+async def test_record_then_replay(
+    hass: HomeAssistant,
+    server: FakeMultisportServer,
+    monkeypatch: pytest.MonkeyPatch,
+    tmp_path,
+) -> None:
+    """Test recorded responses set the entries up without the API."""
+    cassette = tmp_path / "multisport.json"
+    monkeypatch.setenv(ENV_RECORD, str(cassette))
+    entries = await _setup_entries(hass, server)
+    for entry in entries:
+        assert await hass.config_entries.async_unload(entry.entry_id)
+        assert await hass.config_entries.async_remove(entry.entry_id)
+    await server.async_stop()
+    requests = sum(server.stats.requests.values())
+
+    hass.data.pop(DATA_CASSETTE)
+    monkeypatch.delenv(ENV_RECORD)
+    monkeypatch.setenv(ENV_REPLAY, str(cassette))
+    await _setup_entries(hass, server)
+
+    assert _remaining_visits(hass) == ["10"] * 6
+    assert sum(server.stats.requests.values()) == requests
+
+
+async def test_force_update_of_one_card(
+    hass: HomeAssistant, server: FakeMultisportServer
+) -> None:
+    """Test refreshing one card costs its limits and current month only."""
+    entries = await _setup_entries(hass, server)
+    requests = sum(server.stats.requests.values())
+
+    # A burst of calls shares one in-flight refresh
+    await asyncio.gather(
+        *(
+            hass.services.async_call(
+                DOMAIN,
+                SERVICE_FORCE_UPDATE,
+                {ATTR_ENTRY_ID: entries[1].entry_id, ATTR_CARD_ID: "user1-main"},
+                blocking=True,
+            )
+            for _ in range(3)
+        )
+    )
+
+    assert sum(server.stats.requests.values()) == requests + 2
+
+    with pytest.raises(ServiceValidationError):
+        await hass.services.async_call(
+            DOMAIN,
+            SERVICE_FORCE_UPDATE,
+            {ATTR_ENTRY_ID: entries[0].entry_id, ATTR_CARD_ID: "user1-main"},
+            blocking=True,
+        )
+
+
+async def _update_account(
+    hass: HomeAssistant, freezer: FrozenDateTimeFactory, entry: MockConfigEntry
+) -> None:
+    await hass.services.async_call(
+        DOMAIN, SERVICE_FORCE_UPDATE, {ATTR_ENTRY_ID: entry.entry_id}, blocking=True
+    )
+    # Past the cooldown of the refresh debouncer
+    freezer.tick(timedelta(minutes=1))
+    async_fire_time_changed(hass)
+    await hass.async_block_till_done()
+
+
+async def test_cards_added_and_removed_with_the_account(
+    hass: HomeAssistant, server: FakeMultisportServer, freezer: FrozenDateTimeFactory
+) -> None:
+    """Test a new card gets entities and a vanished card loses its device."""
+    entries = await _setup_entries(hass, server)
+    device_registry = dr.async_get(hass)
+    entity_registry = er.async_get(hass)
+
+    server.config.cards_per_account = 3
+    await _update_account(hass, freezer, entries[0])
+
+    assert _remaining_visits(hass) == ["10"] * 7
+    new_card = device_registry.async_get_device({(DOMAIN, "user0-companion-1")})
+    assert new_card is not None
+    assert er.async_entries_for_device(entity_registry, new_card.id)
+
+    # A card missing from one card list may be a glitch of the API
+    server.config.cards_per_account = 1
+    await _update_account(hass, freezer, entries[0])
+    assert device_registry.async_get_device({(DOMAIN, "user0-companion-0")})
+    assert _remaining_visits(hass) == ["10"] * 7
+
+    for _ in range(CARD_RETIRE_REFRESHES - 1):
+        await _update_account(hass, freezer, entries[0])
+
+    for card_id in ("user0-companion-0", "user0-companion-1"):
+        assert device_registry.async_get_device({(DOMAIN, card_id)}) is None
+    assert not er.async_entries_for_device(entity_registry, new_card.id)
+    assert _remaining_visits(hass) == ["10"] * 5
+
+
+async def test_import_history_in_background(
+    hass: HomeAssistant, server: FakeMultisportServer
+) -> None:
+    """Test a history import fetches each closed month of the range once."""
+    entries = await _setup_entries(hass, server)
+    coordinator = hass.data[DOMAIN][entries[0].entry_id]
+    today = date.today()
+    start = today.replace(year=today.year - 2, day=1)
+    history_requests = _history_requests(server)
+    average = "sensor.multisport_jan_user0_average_visits_per_week"
+    average_before = hass.states.get(average).state
+
+    await hass.services.async_call(
+        DOMAIN,
+        SERVICE_IMPORT_HISTORY,
+        {ATTR_ENTRY_ID: entries[0].entry_id, ATTR_START_DATE: start.isoformat()},
+        blocking=True,
+    )
+    await hass.async_block_till_done(wait_background_tasks=True)
+
+    state = hass.states.get("sensor.multisport_user0_history_import")
+    assert state.state == "100"
+    assert state.attributes["status"] == "complete"
+    # 24 closed months per card, less the last one, synced routinely
+    synced = len(iter_month_keys(today - timedelta(days=DEFAULT_HISTORY_DAYS), today))
+    assert state.attributes["months_requested"] == 48
+    assert _history_requests(server) - history_requests == 2 * (25 - synced)
+
+    # The analytics cover the imported visits, on the sensors too
+    card = coordinator.data["user0-main"]
+    assert hass.states.get(average).state != average_before
+    assert hass.states.get(average).state == str(
+        card.analytic("average_visits_per_week")
+    )
+
+
+async def test_request_budget_defers_history(
+    hass: HomeAssistant, server: FakeMultisportServer, freezer: FrozenDateTimeFactory
+) -> None:
+    """Test a spent budget keeps the limits updating and defers the history."""
+    entries = await _setup_entries(hass, server)
+    coordinator = hass.data[DOMAIN][entries[0].entry_id]
+    budget = coordinator.api.scheduler.account
+    history_requests = _history_requests(server)
+
+    # Room for the limits of both cards, not for their history
+    budget.limit = budget.limit - budget.remaining + 2
+    await _update_account(hass, freezer, entries[0])
+
+    assert coordinator.last_update_success
+    assert _history_requests(server) == history_requests
+    assert budget.remaining == 0
+    assert budget.deferred >= 2
+    state = hass.states.get("sensor.multisport_user0_request_budget")
+    assert state.state == "0"
+
+
+async def test_profile_refresh(
+    hass: HomeAssistant, server: FakeMultisportServer, tmp_path
+) -> None:
+    """Test a profiled refresh leaves a report and a notification."""
+    entries = await _setup_entries(hass, server)
+    hass.config.config_dir = str(tmp_path)
+
+    with patch(
+        "custom_components.multisport.profiler.persistent_notification.async_create"
+    ) as notify:
+        await hass.services.async_call(
+            DOMAIN,
+            SERVICE_PROFILE_REFRESH,
+            {ATTR_ENTRY_ID: entries[1].entry_id, ATTR_PSTATS: True},
+            blocking=True,
+        )
+
+    (report,) = tmp_path.glob("*.txt")
+    (dump,) = tmp_path.glob("*.pstats")
+    assert entries[1].entry_id in report.name
+    assert "API calls: " in report.read_text()
+    assert "Card fetches: 2 concurrent tasks" in report.read_text()
+    assert pstats.Stats(str(dump)).total_calls
+    message = notify.call_args.args[1]
+    assert "Refresh: " in message and str(report) in message
@@ -0,0 +1,159 @@
+"""Test the MultiSport incremental history sync."""
+
+import datetime
+from unittest.mock import AsyncMock, patch
+
+import pytest
+from homeassistant.const import EVENT_HOMEASSISTANT_FINAL_WRITE
+from homeassistant.core import HomeAssistant
+from multisport_py import MultisportError
+
+from custom_components.multisport.history import HistorySync, iter_month_keys
+from custom_components.multisport.visits import VisitIngest
+
+
+def _summary(*visits: tuple[str, str]) -> list[dict]:
+    return [
+        {
+            "visits": [
+                {"date": date, "time": time, "facilityName": "Gym"}
+                for date, time in visits
+            ]
+        }
+    ]
+
+
+def test_iter_month_keys_spans_years() -> None:
+    """Test month keys roll over the year boundary."""
+    assert iter_month_keys(datetime.date(2025, 11, 20), datetime.date(2026, 2, 1)) == [
+        "2025-11",
+        "2025-12",
+        "2026-01",
+        "2026-02",
+    ]
+
+
+async def test_closed_months_fetched_once(hass: HomeAssistant) -> None:
+    """Test closed months are cached and only the current month is re-fetched."""
+    fetch = AsyncMock(
+        side_effect=lambda card_id, date_from, date_to: _summary(
+            ("05-" + date_from[5:7] + "-" + date_from[:4], "10:00")
+        )
+    )
+    history = HistorySync(hass, "entry")
+    today = datetime.date(2026, 3, 15)
+
+    first = await history.async_sync("card", fetch, today, 75)
+    assert len(first.new_visits) == 4
+    assert fetch.await_count == 4
+
+    fetch.reset_mock()
+    second = await history.async_sync("card", fetch, today, 75)
+
+    fetch.assert_awaited_once_with("card", "2026-03-05", "2026-03-15")
+    # The re-fetched visit is de-duplicated against the stored one
+    assert not second.new_visits
+    assert len(second.store) == 4
+    assert second.latest.timestamp == datetime.datetime(2026, 3, 5, 10, 0)
+
+
+async def test_unchanged_current_month_not_reprocessed(hass: HomeAssistant) -> None:
+    """Test an identical current month response is not ingested again."""
+    fetch = AsyncMock(return_value=_summary(("02-03-2026", "18:00")))
+    history = HistorySync(hass, "entry")
+    today = datetime.date(2026, 3, 15)
+    await history.async_sync("card", fetch, today, 1)
+
+    with patch.object(VisitIngest, "feed") as feed:
+        await history.async_sync("card", fetch, today, 1)
+    feed.assert_not_called()
+
+    fetch.return_value = _summary(("02-03-2026", "18:00"), ("14-03-2026", "07:30"))
+    ingest = await history.async_sync("card", fetch, today, 1)
+    assert [visit.timestamp.day for visit in ingest.new_visits] == [14]
+
+
+async def test_open_month_completed_after_it_closes(hass: HomeAssistant) -> None:
+    """Test a month seen while current is fetched in full once it has closed."""
+    fetch = AsyncMock(return_value=[])
+    history = HistorySync(hass, "entry")
+
+    await history.async_sync("card", fetch, datetime.date(2026, 3, 31), 1)
+    fetch.reset_mock()
+    await history.async_sync("card", fetch, datetime.date(2026, 4, 1), 1)
+
+    assert [call.args[1:] for call in fetch.await_args_list] == [
+        ("2026-03-01", "2026-03-31"),
+        ("2026-04-01", "2026-04-01"),
+    ]
+
+
+async def test_migrates_raw_shards(hass: HomeAssistant, hass_storage: dict) -> None:
+    """Test the first storage format with raw visit dicts is migrated."""
+    hass_storage["multisport.entry.history"] = {
+        "version": 1,
+        "key": "multisport.entry.history",
+        "data": {
+            "cards": {
+                "card": {
+                    "2026-02": {
+                        "visits": _summary(("03-02-2026", "18:00"))[0]["visits"],
+                        "complete": True,
+                    }
+                }
+            }
+        },
+    }
+    fetch = AsyncMock(return_value=[])
+    history = HistorySync(hass, "entry")
+
+    ingest = await history.async_sync("card", fetch, datetime.date(2026, 3, 2), 10)
+
+    fetch.assert_awaited_once_with("card", "2026-03-01", "2026-03-02")
+    assert ingest.latest.timestamp == datetime.datetime(2026, 2, 3, 18, 0)
+
+
+async def test_backfill_resumes_after_failure(
+    hass: HomeAssistant, hass_storage: dict
+) -> None:
+    """Test an interrupted import keeps its months and only fetches the rest."""
+
+    async def _fetch(card_id: str, date_from: str, date_to: str) -> list[dict]:
+        if date_from == "2025-06-01":
+            raise MultisportError("down")
+        return _summary(("05-" + date_from[5:7] + "-" + date_from[:4], "10:00"))
+
+    fetch = AsyncMock(side_effect=_fetch)
+    history = HistorySync(hass, "entry")
+    today = datetime.date(2026, 3, 15)
+    history.async_queue_backfill(
+        "card", datetime.date(2025, 1, 10), datetime.date(2026, 3, 10)
+    )
+    pending = history.pending_backfills(today)
+    # Closed months only, the current one is left to the routine sync
+    assert pending == {"card": iter_month_keys(today.replace(2025, 1), today)[:-1]}
+
+    with pytest.raises(MultisportError):
+        await history.async_backfill(
+            "card", pending["card"], fetch, today, lambda: None
+        )
+    assert history.backfill_progress(today) == (13, 14)
+    assert history.aggregates("card").total == 13
+
+    # Resumed from what was written on shutdown by a new instance
+    hass.bus.async_fire(EVENT_HOMEASSISTANT_FINAL_WRITE)
+    await hass.async_block_till_done()
+    resumed = HistorySync(hass, "entry")
+    await resumed.async_load()
+    fetch.reset_mock()
+    fetch.side_effect = None
+    fetch.return_value = _summary(("05-06-2025", "10:00"))
+    pending = resumed.pending_backfills(today)
+    assert pending == {"card": ["2025-06"]}
+
+    await resumed.async_backfill("card", pending["card"], fetch, today, lambda: None)
+
+    fetch.assert_awaited_once_with("card", "2025-06-01", "2025-06-30")
+    assert resumed.backfill_progress(today) == (14, 14)
+    assert resumed.aggregates("card").total == 14
+    assert not resumed.pending_backfills(today)
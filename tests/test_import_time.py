@@ -0,0 +1,63 @@
+"""Test the import cost of the MultiSport integration on startup."""
+
+import subprocess
+import sys
+from pathlib import Path
+
+# What importing the package, its config flow and diagnostics may add to a
+# Home Assistant startup, with the core modules they use already loaded
+IMPORT_TIME_BUDGET_MS = 50
+
+# Only imported once an entry sets up or a flow logs in
+DEFERRED_MODULES = (
+    "multisport_py",
+    "custom_components.multisport.api",
+    "custom_components.multisport.coordinator",
+    "custom_components.multisport.history",
+    "custom_components.multisport.statistics",
+    "homeassistant.components.recorder",
+)
+
+_MARKER = "-- multisport --"
+
+_SCRIPT = f"""
+import sys
+import homeassistant.components.diagnostics
+import homeassistant.config_entries
+import homeassistant.helpers.config_validation
+import homeassistant.helpers.importlib
+sys.stderr.write("{_MARKER}\\n")
+sys.stderr.flush()
+import custom_components.multisport
+import custom_components.multisport.config_flow
+import custom_components.multisport.diagnostics
+"""
+
+
+def _import_times() -> dict[str, int]:
+    """Return the self import time of each module the integration loads, in us."""
+    result = subprocess.run(
+        [sys.executable, "-X", "importtime", "-c", _SCRIPT],
+        cwd=Path(__file__).parents[1],
+        capture_output=True,
+        text=True,
+        check=True,
+    )
+    lines = result.stderr.split(_MARKER, 1)[1].splitlines()
+    times = {}
+    for line in lines:
+        if not line.startswith("import time:"):
+            continue
+        self_us, _, module = line.removeprefix("import time:").split("|")
+        times[module.strip()] = int(self_us)
+    return times
+
+
+def test_import_time_within_budget() -> None:
+    """Test the package loads quickly and defers its heavy dependencies."""
+    times = _import_times()
+
+    assert "custom_components.multisport" in times
+    for module in DEFERRED_MODULES:
+        assert module not in times
+    assert sum(times.values()) / 1000 < IMPORT_TIME_BUDGET_MS, times
@@ -0,0 +1,79 @@
+"""Test the retries and circuit breakers around the MultiSport client."""
+
+from unittest.mock import AsyncMock, patch
+
+import httpx
+import pytest
+from multisport_py import MultisportError
+
+from custom_components.multisport.resilience import (
+    BREAKER_FAILURE_THRESHOLD,
+    BREAKER_RECOVERY_TIME,
+    STATE_CLOSED,
+    STATE_HALF_OPEN,
+    STATE_OPEN,
+    CircuitBreakers,
+    EndpointUnavailableError,
+)
+
+
+@pytest.fixture(autouse=True)
+def no_backoff():
+    """Retry right away."""
+    with patch("custom_components.multisport.resilience.RETRY_BASE_DELAY", 0):
+        yield
+
+
+def _status_error(status: int) -> httpx.HTTPStatusError:
+    request = httpx.Request("GET", "https://example.com")
+    return httpx.HTTPStatusError(
+        "error", request=request, response=httpx.Response(status, request=request)
+    )
+
+
+async def test_transient_errors_retried() -> None:
+    """Test a call failing transiently is retried until it succeeds."""
+    call = AsyncMock(side_effect=[httpx.ConnectError("down"), _status_error(503), 1])
+    guarded = CircuitBreakers().guard("get_card_limits", call)
+
+    assert await guarded("card") == 1
+    assert call.await_count == 3
+
+
+async def test_client_errors_not_retried() -> None:
+    """Test a rejected request fails right away."""
+    call = AsyncMock(side_effect=_status_error(404))
+    breakers = CircuitBreakers()
+    guarded = breakers.guard("get_card_limits", call)
+
+    with pytest.raises(httpx.HTTPStatusError):
+        await guarded("card")
+    assert call.await_count == 1
+    assert breakers.state == STATE_CLOSED
+
+
+async def test_breaker_opens_and_probes() -> None:
+    """Test a failing endpoint is left alone, then probed once."""
+    call = AsyncMock(side_effect=MultisportError("down"))
+    breakers = CircuitBreakers()
+    guarded = breakers.guard("get_card_limits", call)
+
+    for _ in range(BREAKER_FAILURE_THRESHOLD):
+        with pytest.raises(MultisportError):
+            await guarded("card")
+    assert breakers.state == STATE_OPEN
+    calls = call.await_count
+
+    with pytest.raises(EndpointUnavailableError):
+        await guarded("card")
+    assert call.await_count == calls
+
+    breaker = breakers.breakers["get_card_limits"]
+    breaker.opened_at -= BREAKER_RECOVERY_TIME
+    assert breakers.state == STATE_HALF_OPEN
+    call.side_effect = None
+    call.return_value = 1
+
+    assert await guarded("card") == 1
+    assert call.await_count == calls + 1
+    assert breakers.state == STATE_CLOSED
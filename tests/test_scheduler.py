@@ -0,0 +1,63 @@
+"""Test the MultiSport adaptive polling scheduler."""
+
+import datetime
+
+from custom_components.multisport.scheduler import AdaptivePollScheduler
+
+MIN = datetime.timedelta(minutes=15)
+MAX = datetime.timedelta(hours=3)
+
+
+def _scheduler_with_monday_evenings() -> AdaptivePollScheduler:
+    scheduler = AdaptivePollScheduler(MIN, MAX)
+    # Four Mondays at 18:00
+    scheduler.learn(
+        datetime.datetime(2026, 9, 7, 18, 0) + datetime.timedelta(weeks=week)
+        for week in range(4)
+    )
+    return scheduler
+
+
+def test_no_history_backs_off() -> None:
+    """Test polling stays at the maximum without any learned visits."""
+    scheduler = AdaptivePollScheduler(MIN, MAX)
+    scheduler.learn([])
+
+    assert scheduler.next_interval(datetime.datetime(2026, 10, 5, 18, 30)) == MAX
+
+
+def test_usual_gym_window_polls_fast() -> None:
+    """Test the usual visit hour and the hour after it poll at the minimum."""
+    scheduler = _scheduler_with_monday_evenings()
+
+    assert scheduler.next_interval(datetime.datetime(2026, 10, 12, 18, 10)) == MIN
+    assert scheduler.next_interval(datetime.datetime(2026, 10, 12, 19, 40)) == MIN
+
+
+def test_quiet_hours_wake_up_for_next_window() -> None:
+    """Test a quiet hour backs off but never past the next usual window."""
+    scheduler = _scheduler_with_monday_evenings()
+
+    # Tuesday night, nothing expected for days
+    assert scheduler.next_interval(datetime.datetime(2026, 10, 13, 2, 0)) == MAX
+    # Monday 16:30, the usual window opens at 18:00
+    assert scheduler.next_interval(
+        datetime.datetime(2026, 10, 12, 16, 30)
+    ) == datetime.timedelta(minutes=90)
+
+
+def test_recent_visit_polls_fast() -> None:
+    """Test polling stays fast shortly after a visit outside usual hours."""
+    scheduler = _scheduler_with_monday_evenings()
+    scheduler.learn([datetime.datetime(2026, 10, 14, 7, 0)])
+
+    assert scheduler.next_interval(datetime.datetime(2026, 10, 14, 8, 0)) == MIN
+
+
+def test_set_bounds_clamps_inverted_range() -> None:
+    """Test a maximum below the minimum is raised to the minimum."""
+    scheduler = AdaptivePollScheduler(MIN, MAX)
+    scheduler.set_bounds(MAX, MIN)
+
+    assert scheduler.min_interval == MAX
+    assert scheduler.max_interval == MAX
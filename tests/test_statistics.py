@@ -0,0 +1,100 @@
+"""Test the MultiSport visit statistics import."""
+
+import datetime
+
+import pytest
+from freezegun.api import FrozenDateTimeFactory
+from homeassistant.components.recorder import get_instance
+from homeassistant.components.recorder.statistics import statistics_during_period
+from homeassistant.core import HomeAssistant
+from homeassistant.util import dt as dt_util
+from pytest_homeassistant_custom_component.components.recorder.common import (
+    async_wait_recording_done,
+)
+
+from custom_components.multisport.statistics import (
+    VisitStatistics,
+    visits_statistic_id,
+)
+from custom_components.multisport.visits import Visit, VisitStore
+
+
+@pytest.fixture(autouse=True)
+def auto_enable_custom_integrations(recorder_mock, enable_custom_integrations):
+    """Enable custom integrations, after the recorder database is prepared."""
+    yield
+
+
+async def _sums(hass: HomeAssistant) -> list[tuple[datetime.datetime, float]]:
+    statistic_id = visits_statistic_id("card")
+    rows = await get_instance(hass).async_add_executor_job(
+        statistics_during_period,
+        hass,
+        dt_util.utc_from_timestamp(0),
+        None,
+        {statistic_id},
+        "hour",
+        None,
+        {"state", "sum"},
+    )
+    return [
+        (dt_util.utc_from_timestamp(row["start"]), row["sum"])
+        for row in rows.get(statistic_id, [])
+    ]
+
+
+async def test_backfill_then_append(
+    hass: HomeAssistant, freezer: FrozenDateTimeFactory
+) -> None:
+    """Test stored visits are backfilled once and new hours appended later."""
+    await hass.config.async_set_time_zone("UTC")
+    freezer.move_to("2026-03-10 20:30:00+00:00")
+    visits = VisitStore()
+    for day, hour in ((1, 18), (1, 18), (3, 7), (10, 20)):
+        visits.add(Visit(datetime.datetime(2026, 3, day, hour, day), "Gym", None))
+    statistics = VisitStatistics(hass)
+
+    await statistics.async_update("card", "Jan Kowalski", visits)
+    await async_wait_recording_done(hass)
+
+    # The visit of the still open hour is left for a later run
+    assert (await _sums(hass)) == [
+        (datetime.datetime(2026, 3, 1, 18, tzinfo=datetime.UTC), 1.0),
+        (datetime.datetime(2026, 3, 3, 7, tzinfo=datetime.UTC), 2.0),
+    ]
+
+    freezer.move_to("2026-03-10 21:05:00+00:00")
+    await VisitStatistics(hass).async_update("card", "Jan Kowalski", visits)
+    await async_wait_recording_done(hass)
+
+    assert (await _sums(hass))[-1] == (
+        datetime.datetime(2026, 3, 10, 20, tzinfo=datetime.UTC),
+        3.0,
+    )
+
+
+async def test_reimport_after_backfill(
+    hass: HomeAssistant, freezer: FrozenDateTimeFactory
+) -> None:
+    """Test visits imported into the past shift the sums of later hours."""
+    await hass.config.async_set_time_zone("UTC")
+    freezer.move_to("2026-03-10 20:30:00+00:00")
+    visits = VisitStore()
+    for day in (1, 5, 8):
+        visits.add(Visit(datetime.datetime(2026, 3, day, 18), "Gym", None))
+    statistics = VisitStatistics(hass)
+    await statistics.async_update("card", "Jan Kowalski", visits)
+    await async_wait_recording_done(hass)
+
+    visits.add(Visit(datetime.datetime(2026, 3, 4, 9), "Pool", None))
+    await statistics.async_reimport(
+        "card", "Jan Kowalski", visits, datetime.date(2026, 3, 2)
+    )
+    await async_wait_recording_done(hass)
+
+    assert (await _sums(hass)) == [
+        (datetime.datetime(2026, 3, 1, 18, tzinfo=datetime.UTC), 1.0),
+        (datetime.datetime(2026, 3, 4, 9, tzinfo=datetime.UTC), 2.0),
+        (datetime.datetime(2026, 3, 5, 18, tzinfo=datetime.UTC), 3.0),
+        (datetime.datetime(2026, 3, 8, 18, tzinfo=datetime.UTC), 4.0),
+    ]
@@ -0,0 +1,123 @@
+"""Test the MultiSport compact visit store."""
+
+import datetime
+
+from custom_components.multisport.visits import (
+    Visit,
+    VisitAggregates,
+    VisitIngest,
+    VisitStore,
+)
+
+
+def _visit(day: int, hour: int = 18, facility: str = "Gym") -> Visit:
+    return Visit(datetime.datetime(2026, 3, day, hour, 0), facility, "CARD")
+
+
+def test_out_of_order_visits_are_sorted_and_deduplicated() -> None:
+    """Test visits are kept in time order and duplicates are rejected."""
+    store = VisitStore()
+    for day in (10, 2, 7):
+        assert store.add(_visit(day))
+    assert not store.add(_visit(7))
+    # Same time in another facility is a different visit
+    assert store.add(_visit(7, facility="Pool"))
+
+    assert len(store) == 4
+    assert store.latest() == _visit(10)
+    assert [
+        visit.timestamp.day
+        for visit in store.visits_between(
+            datetime.datetime(2026, 3, 1), datetime.datetime(2026, 3, 8)
+        )
+    ] == [2, 7, 7]
+
+
+def test_range_counts() -> None:
+    """Test window counts are half-open."""
+    store = VisitStore()
+    for day in range(1, 32):
+        store.add(_visit(day))
+
+    assert (
+        store.count_between(
+            datetime.datetime(2026, 3, 10, 18, 0), datetime.datetime(2026, 3, 12, 18, 0)
+        )
+        == 2
+    )
+
+
+def test_bounded_and_round_trips() -> None:
+    """Test the oldest visits are dropped and the store survives storage."""
+    store = VisitStore(max_visits=3)
+    for day in range(1, 6):
+        store.add(_visit(day, facility=f"Gym {day % 2}"))
+
+    restored = VisitStore.from_dict(store.as_dict(), max_visits=3)
+
+    assert len(restored) == 3
+    assert [
+        visit.timestamp.day
+        for visit in restored.visits_between(
+            datetime.datetime(2026, 1, 1), datetime.datetime(2027, 1, 1)
+        )
+    ] == [3, 4, 5]
+    assert restored.latest().facility == "Gym 1"
+    # Dropped visits delivered again are not new
+    assert not restored.add(_visit(1, facility="Gym 1"))
+    assert len(restored) == 3
+
+
+def test_ingest_single_pass_aggregates() -> None:
+    """Test ingestion de-duplicates visits and aggregates them in one pass."""
+    store = VisitStore()
+    store.add(_visit(1))
+    ingest = VisitIngest(store, datetime.date(2026, 3, 2))
+
+    ingest.feed(
+        [
+            {
+                "visits": [
+                    {"date": "01-03-2026", "time": "18:00", "facilityName": "Gym"},
+                    {"date": "02-03-2026", "time": "07:30", "facilityName": "Pool"},
+                    {"date": "2026-03-02", "time": "07:30", "facilityName": "Bad"},
+                ]
+            },
+            {"visits": [{"date": "27-02-2026", "time": "09:15"}]},
+        ]
+    )
+
+    assert [visit.facility for visit in ingest.new_visits] == ["Pool", None]
+    assert ingest.month_counts == {"2026-03": 1, "2026-02": 1}
+    assert ingest.latest.facility == "Pool"
+    assert ingest.used_today
+    assert len(store) == 3
+
+
+def test_running_aggregates() -> None:
+    """Test analytics follow the visits added and survive a round trip."""
+    aggregates = VisitAggregates()
+    aggregates.add([_visit(2), _visit(10, facility="Pool")])
+    aggregates.add([_visit(11, facility="Pool"), _visit(18)])
+
+    assert aggregates.summary(datetime.date(2026, 3, 19)) == {
+        "visits_this_week": 1,
+        "visits_this_month": 4,
+        "weekly_streak": 3,
+        "average_visits_per_week": 1.33,
+        "favorite_facility": "Pool",
+        "favorite_facility_visits": 2,
+    }
+    # An empty week only breaks the streak once it is over
+    assert aggregates.summary(datetime.date(2026, 3, 23))["weekly_streak"] == 3
+    assert aggregates.summary(datetime.date(2026, 3, 30))["weekly_streak"] == 0
+
+    store = VisitStore()
+    for day, facility in ((2, "Gym"), (10, "Pool"), (11, "Pool"), (18, "Gym")):
+        store.add(_visit(day, facility=facility))
+    today = datetime.date(2026, 3, 19)
+    assert (
+        VisitAggregates.from_dict(aggregates.as_dict()).summary(today)
+        == VisitAggregates.from_store(store).summary(today)
+        == aggregates.summary(today)
+    )